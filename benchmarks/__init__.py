@@ -0,0 +1,5 @@
+'''
+benchmarks - sentlex performance benchmark suite
+
+Run from the repository root with "python -m benchmarks.run" (see run module).
+'''
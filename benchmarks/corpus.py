@@ -0,0 +1,123 @@
+'''
+corpus.py - Deterministic synthetic corpus
+
+Generates POS-tagged documents from fixed vocabularies and sentence patterns, with a seeded random generator, so that
+every run (and every machine) benchmarks the same input. Words are drawn with Zipf-like frequencies; vocabularies mix
+sentiment words found in the shipped lexicons, inflected verbs, negation markers and made-up words missing from them.
+
+    docs = corpus.generate(100, 300, seed=1)     # 100 tagged documents of ~300 tokens
+    raw = [corpus.untag(doc) for doc in docs]    # same documents as plain text
+'''
+
+from __future__ import absolute_import
+import bisect
+import random
+
+# vocabulary by Penn Treebank tag
+VOCABULARY = {
+    'JJ': ['good', 'bad', 'great', 'awful', 'nice', 'terrible', 'boring', 'happy', 'sad', 'excellent', 'poor',
+           'beautiful', 'ugly', 'fine', 'horrible', 'pleasant', 'dull', 'brilliant', 'weak', 'strong', 'funny',
+           'stupid', 'clever', 'slow', 'wonderful', 'annoying', 'perfect', 'mediocre', 'lovely', 'dreadful'],
+    'JJR': ['better', 'worse', 'stronger', 'weaker'],
+    'JJS': ['best', 'worst', 'finest'],
+    'NN': ['movie', 'plot', 'actor', 'scene', 'story', 'ending', 'music', 'director', 'script', 'camera',
+           'character', 'dialogue', 'film', 'performance', 'sequel'],
+    'NNS': ['movies', 'actors', 'scenes', 'effects', 'jokes'],
+    'VB': ['love', 'hate', 'enjoy', 'like', 'recommend', 'watch', 'dislike', 'admire'],
+    'VBD': ['loved', 'hated', 'enjoyed', 'liked', 'watched', 'ruined', 'disappointed', 'impressed'],
+    'VBZ': ['is', 'seems', 'looks', 'feels', 'makes'],
+    'VBG': ['boring', 'amazing', 'thrilling', 'confusing', 'disappointing'],
+    'RB': ['very', 'really', 'quite', 'too', 'so', 'rather', 'badly', 'well', 'never', 'always'],
+    'DT': ['the', 'a', 'this', 'that', 'every'],
+    'PRP': ['I', 'it', 'we', 'they', 'he', 'she'],
+    'IN': ['of', 'in', 'with', 'for', 'about'],
+    'CC': ['and', 'but', 'or', 'yet'],
+}
+
+# words missing from lexicons, per tag
+UNKNOWN_WORDS = 25
+
+# sentence patterns - NEG is a negation marker
+PATTERNS = [
+    ['DT', 'NN', 'VBZ', 'RB', 'JJ'],
+    ['DT', 'NN', 'VBZ', 'NEG', 'JJ'],
+    ['PRP', 'VBD', 'DT', 'JJ', 'NN'],
+    ['PRP', 'NEG', 'VB', 'DT', 'NNS'],
+    ['DT', 'JJ', 'NN', 'CC', 'DT', 'JJR', 'NN'],
+    ['DT', 'NNS', 'VBZ', 'VBG', 'CC', 'JJ'],
+    ['IN', 'DT', 'NN', ',', 'PRP', 'VBZ', 'DT', 'JJS', 'NN'],
+    ['PRP', 'VBD', 'DT', 'NN', 'IN', 'DT', 'NN', 'CC', 'NEG', 'DT', 'NN'],
+]
+NEGATIONS = [('not', 'RB'), ("n't", 'RB'), ('never', 'RB'), ('no', 'DT'), ('without', 'IN')]
+PUNCTUATION = [('.', '.'), ('!', '.'), ('?', '.'), (';', ':')]
+
+
+class _ZipfChoice(object):
+    '''
+      Picks items with probability proportional to 1 / rank.
+    '''
+
+    def __init__(self, items):
+        self.items = items
+        self.cumulative = []
+        total = 0.0
+        for rank in range(1, len(items) + 1):
+            total += 1.0 / rank
+            self.cumulative.append(total)
+
+    def __call__(self, rng):
+        return self.items[bisect.bisect_left(self.cumulative, rng.random() * self.cumulative[-1])]
+
+
+def _vocabulary():
+    choices = {}
+    for (tag, words) in VOCABULARY.items():
+        unknown = ['%s%sx%02d' % (words[0][:3], tag.lower(), i) for i in range(UNKNOWN_WORDS)]
+        choices[tag] = _ZipfChoice(words + unknown)
+    return choices
+
+
+def sentence(rng, vocabulary):
+    '''
+      Returns list of (word, tag) tuples of a random sentence.
+    '''
+    tokens = []
+    for tag in rng.choice(PATTERNS):
+        if tag == 'NEG':
+            tokens.append(rng.choice(NEGATIONS))
+        elif tag == ',':
+            tokens.append((',', ','))
+        else:
+            tokens.append((vocabulary[tag](rng), tag))
+    tokens.append(rng.choice(PUNCTUATION))
+    return tokens
+
+
+def generate(ndocs, doclen, seed=0):
+    '''
+      Returns list of ndocs POS-tagged documents (word/TAG strings) of about doclen tokens (whole sentences, at
+      least doclen tokens). The same seed always yields the same documents.
+    '''
+    rng = random.Random(seed)
+    vocabulary = _vocabulary()
+    docs = []
+    for _ in range(ndocs):
+        tokens = []
+        while len(tokens) < doclen:
+            tokens.extend(sentence(rng, vocabulary))
+        docs.append(' '.join('%s/%s' % token for token in tokens))
+    return docs
+
+
+def untag(doc):
+    '''
+      Returns plain text of tagged document doc.
+    '''
+    return ' '.join(token.rsplit('/', 1)[0] for token in doc.split())
+
+
+def terms(docs):
+    '''
+      Returns list of words in documents docs, in order.
+    '''
+    return [token.rsplit('/', 1)[0].lower() for doc in docs for token in doc.split()]
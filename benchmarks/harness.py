@@ -0,0 +1,214 @@
+'''
+harness.py - Benchmark measurement and comparison
+
+A benchmark Case has a setup function, returning (fn, items), and is measured by calling fn(item) on every item.
+Each case runs in a child process of its own, so that lexicons and caches built by one case do not leak into
+others, and so that the peak resident set size (RSS) reported for a case is that of the case alone.
+
+Results are plain dictionaries, suitable for JSON:
+
+    {'status': 'ok', 'unit': 'doc', 'ops': 200, 'rounds': 3, 'total_s': 1.23, 'throughput': 487.8,
+     'latency_us': {'mean': 2050.0, 'p50': 1980.0, 'p90': 2400.0, 'p99': 3100.0, 'max': 3300.0}, 'peak_rss_kb': 81234}
+
+Cases that cannot run here (missing data files, NLTK models or optional packages) are recorded as
+{'status': 'skipped', 'reason': ...}; any other exception is recorded as {'status': 'error', 'reason': traceback}.
+'''
+
+from __future__ import absolute_import
+import errno
+import gc
+import multiprocessing
+import sys
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+if hasattr(time, 'perf_counter'):
+    clock = time.perf_counter
+else:
+    clock = time.time
+
+
+class Case(object):
+    '''
+     A named benchmark. setup() returns (fn, items); batch is the number of items timed together, for operations
+     too fast to time one by one; unit names what one item is.
+    '''
+
+    def __init__(self, name, setup, unit='op', batch=1, warmup=1):
+        self.name = name
+        self.setup = setup
+        self.unit = unit
+        self.batch = batch
+        self.warmup = warmup
+
+
+def peak_rss_kb():
+    '''
+      Returns peak resident set size of this process in kilobytes, or None if unavailable.
+    '''
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    if sys.platform == 'darwin':
+        rss = rss // 1024
+    return rss
+
+
+def missing_requirement(e):
+    '''
+      True if exception e means a case cannot run in this environment: a missing NLTK resource, optional package or
+      data file.
+    '''
+    if isinstance(e, EnvironmentError):
+        # IOError/OSError from a data file that is not installed, not from failing I/O
+        return e.errno == errno.ENOENT
+    # NLTK raises LookupError itself for missing models, whereas KeyError and IndexError (LookupError subclasses) are bugs
+    return type(e) is LookupError or isinstance(e, ImportError)
+
+
+def percentile(values, p):
+    '''
+      Nearest-rank percentile p (0-100) of sorted list values.
+    '''
+    if not values:
+        return None
+    rank = max(int(round(p / 100.0 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def measure(fn, items, batch=1, warmup=1, rounds=1):
+    '''
+      Calls fn(item) on all items, rounds times, timing items in batches of batch items. Returns dictionary of timing
+      results: throughput is that of the fastest round (the least disturbed by other activity on the host), and
+      latencies are per item (batch time divided by batch size) over all rounds.
+    '''
+    for item in items[:warmup]:
+        fn(item)
+
+    latencies = []
+    times = []
+    gc.collect()
+    gcenabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            elapsed = 0.0
+            for i in range(0, len(items), batch):
+                chunk = items[i:i + batch]
+                start = clock()
+                for item in chunk:
+                    fn(item)
+                t = clock() - start
+                elapsed += t
+                latencies.extend([t / len(chunk)] * len(chunk))
+            times.append(elapsed)
+    finally:
+        if gcenabled:
+            gc.enable()
+
+    best = min(times)
+    latencies.sort()
+    return {'ops': len(items),
+            'rounds': rounds,
+            'total_s': sum(times),
+            'throughput': len(items) / best if best > 0 else None,
+            'latency_us': {'mean': 1e6 * sum(latencies) / max(len(latencies), 1),
+                           'p50': 1e6 * percentile(latencies, 50),
+                           'p90': 1e6 * percentile(latencies, 90),
+                           'p99': 1e6 * percentile(latencies, 99),
+                           'max': 1e6 * latencies[-1]}}
+
+
+def run_case(case, rounds=1):
+    '''
+      Sets up and measures case in the current process. Returns result dictionary.
+    '''
+    try:
+        (fn, items) = case.setup()
+        result = measure(fn, items, case.batch, case.warmup, rounds)
+    except Exception as e:
+        if missing_requirement(e):
+            return {'status': 'skipped', 'reason': '%s: %s' % (type(e).__name__, _first_line(str(e)))}
+        return {'status': 'error', 'reason': traceback.format_exc()}
+    result['status'] = 'ok'
+    result['unit'] = case.unit
+    result['peak_rss_kb'] = peak_rss_kb()
+    return result
+
+
+def _first_line(message):
+    # NLTK resource errors start with a banner of asterisks
+    lines = [line.strip() for line in message.split('\n') if line.strip().strip('*')]
+    return lines[0] if lines else ''
+
+
+def _child(case, rounds, conn):
+    conn.send(run_case(case, rounds))
+    conn.close()
+
+
+def run_isolated(case, rounds=1):
+    '''
+      Runs case in a child process. Falls back to running in this process where fork is not available.
+    '''
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        return run_case(case, rounds)
+    context = multiprocessing.get_context('fork')
+    (parent, child) = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(case, rounds, child))
+    process.start()
+    child.close()
+    try:
+        result = parent.recv()
+    except EOFError:
+        result = {'status': 'error', 'reason': 'benchmark process died (exit code %s)' % process.exitcode}
+    process.join()
+    return result
+
+
+def run(cases, rounds=1, isolate=True, report=None):
+    '''
+      Runs list of cases, rounds times each, returning dictionary of results by case name. report(name, result) is
+      called after each case, if given.
+    '''
+    results = {}
+    for case in cases:
+        results[case.name] = run_isolated(case, rounds) if isolate else run_case(case, rounds)
+        if report:
+            report(case.name, results[case.name])
+    return results
+
+
+def compare(baseline, current, threshold=0.15, rss_threshold=0.25):
+    '''
+      Compares current results against baseline results (dictionaries of results by case name).
+
+      A case regresses if its throughput drops, or its p90 latency grows, by more than threshold (a fraction of the
+      baseline value), or if its peak RSS grows by more than rss_threshold. A case that ran in the baseline but is
+      skipped or fails in the current run also regresses. Returns list of
+      (name, metric, baseline value, current value, change, regressed) tuples, with change relative to baseline
+      (None for the status metric, whose values are the baseline and current status).
+    '''
+    rows = []
+    for name in sorted(set(baseline) & set(current)):
+        (base, cur) = (baseline[name], current[name])
+        if base.get('status') != 'ok':
+            continue
+        if cur.get('status') != 'ok':
+            rows.append((name, 'status', base['status'], cur.get('status'), None, True))
+            continue
+        metrics = [('throughput', base['throughput'], cur['throughput'], -1, threshold),
+                   ('p90_us', base['latency_us']['p90'], cur['latency_us']['p90'], 1, threshold),
+                   ('peak_rss_kb', base.get('peak_rss_kb'), cur.get('peak_rss_kb'), 1, rss_threshold)]
+        for (metric, old, new, direction, limit) in metrics:
+            if not old or new is None:
+                continue
+            change = (new - old) / float(old)
+            rows.append((name, metric, old, new, change, direction * change > limit))
+    return rows
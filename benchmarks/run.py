@@ -0,0 +1,118 @@
+'''
+run.py - Run sentlex benchmarks
+
+    python -m benchmarks.run --output results.json                  # run all cases
+    python -m benchmarks.run --quick --filter classify              # smaller inputs, classifier cases only
+    python -m benchmarks.run --output new.json --compare base.json  # flag regressions against a baseline
+
+Results are written as JSON, with run metadata (Python, platform, package versions, seed) under "meta" and results
+by case name under "results" (see harness module). With --compare, each case present in both runs is checked
+against the baseline and the exit status is 1 if any regressed, including cases that ran in the baseline but are
+skipped or fail now.
+'''
+
+from __future__ import absolute_import
+from __future__ import print_function
+from optparse import OptionParser
+import json
+import platform
+import sys
+import time
+
+from . import harness
+from . import suite
+
+
+def metadata(options):
+    meta = {'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'seed': options.seed,
+            'quick': options.quick,
+            'rounds': options.rounds,
+            'lexicon': options.lexicon,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    for package in ('nltk', 'numpy'):
+        try:
+            meta[package] = __import__(package).__version__
+        except ImportError:
+            meta[package] = None
+    return meta
+
+
+def report(name, result):
+    if result['status'] == 'ok':
+        print('%-48s %12.1f %-9s p50 %10.2f us   p90 %10.2f us   rss %s KB' % (
+            name, result['throughput'], result['unit'] + '/s', result['latency_us']['p50'], result['latency_us']['p90'],
+            result['peak_rss_kb']))
+    else:
+        print('%-48s %s: %s' % (name, result['status'], result['reason'].strip().split('\n')[-1]))
+    sys.stdout.flush()
+
+
+def print_comparison(rows):
+    print('\n%-48s %-12s %14s %14s %9s' % ('case', 'metric', 'baseline', 'current', 'change'))
+    for (name, metric, old, new, change, regressed) in rows:
+        flag = '  REGRESSION' if regressed else ''
+        if change is None:
+            # status change, eg. ok -> error
+            print('%-48s %-12s %14s %14s %9s%s' % (name, metric, old, new, '', flag))
+        else:
+            print('%-48s %-12s %14.3f %14.3f %+8.1f%%%s' % (name, metric, old, new, 100.0 * change, flag))
+
+
+def main():
+    # grab parameters
+    mainparser = OptionParser()
+    mainparser.add_option("--output", action="store", type="string", default=None, dest="output",
+                          help="Write results to this JSON file.")
+    mainparser.add_option("--compare", action="store", type="string", default=None, dest="baseline",
+                          help="Compare results with this baseline JSON file, exit status 1 on regressions.")
+    mainparser.add_option("--threshold", action="store", type="float", default=0.15, dest="threshold",
+                          help="Relative throughput drop or p90 latency increase flagged as regression.")
+    mainparser.add_option("--rss-threshold", action="store", type="float", default=0.25, dest="rss_threshold",
+                          help="Relative peak RSS increase flagged as regression.")
+    mainparser.add_option("--quick", action="store_true", default=False, dest="quick",
+                          help="Use smaller inputs and fewer repetitions.")
+    mainparser.add_option("--rounds", action="store", type="int", default=3, dest="rounds",
+                          help="Number of times each case is measured; throughput is that of the fastest round.")
+    mainparser.add_option("--filter", action="store", type="string", default=None, dest="filter",
+                          help="Run only cases with this substring in their name.")
+    mainparser.add_option("--seed", action="store", type="int", default=0, dest="seed",
+                          help="Random seed of the synthetic corpus.")
+    mainparser.add_option("--lexicon", action="store", type="choice", default="moby", dest="lexicon",
+                          choices=sorted(suite.LEXICONS) + ['composite'],
+                          help="Lexicon used by lookup and classifier cases.")
+    mainparser.add_option("--no-isolate", action="store_false", default=True, dest="isolate",
+                          help="Run all cases in this process (peak RSS is then cumulative).")
+    (options, args) = mainparser.parse_args()
+
+    baseline = None
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+
+    cases = suite.cases(options.lexicon, options.seed, options.quick)
+    if options.filter:
+        cases = [case for case in cases if options.filter in case.name]
+
+    results = harness.run(cases, options.rounds, options.isolate, report)
+    output = {'meta': metadata(options), 'results': results}
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(output, f, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        if baseline['meta'].get('quick') != options.quick or baseline['meta'].get('seed') != options.seed:
+            print('\nWarning: baseline was run with different --quick or --seed settings.')
+        rows = harness.compare(baseline['results'], results, options.threshold, options.rss_threshold)
+        print_comparison(rows)
+        regressions = sorted(set(row[0] for row in rows if row[5]))
+        if regressions:
+            print('\n%d case(s) regressed: %s' % (len(regressions), ', '.join(regressions)))
+            sys.exit(1)
+        print('\nNo regressions.')
+
+
+if __name__ == "__main__":
+    main()
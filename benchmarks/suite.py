@@ -0,0 +1,160 @@
+'''
+suite.py - sentlex benchmark cases
+
+Cases, by name:
+
+    lexicon.<name>              - building lexicon <name> from its data file (moby, uic, swn3), or a composite of
+                                  Moby and UIC from loaded lexicons (composite)
+    compile_frequency           - reading the SUBTLEXus frequency table into the in-memory dictionary
+    lookup.<lexicon>            - single term lookups (getadjective, getverb, getadverb, getnoun)
+    negation.<n>                - getNegationArray on documents of n tokens
+    classify.<class>.<input>    - classify_document of each preset classifier, on tagged or untagged documents
+
+Inputs come from the synthetic corpus (corpus module) and are the same for a given seed. Classifier and lookup cases
+use the lexicon selected with the lexicon argument (moby by default). Lexicon and frequency cases time cold loads:
+frequency tables kept for the process are dropped before each call, as are lexicon artifacts (SENTLEX_CACHE_DIR).
+'''
+
+from __future__ import absolute_import
+import os
+
+import sentlex
+import sentlex.caching as caching
+import sentlex.negdetect as negdetect
+import sentlex.sentanalysis as sentanalysis
+import sentlex.sentanalysis_potts as sentanalysis_potts
+import sentlex.sentlex as lexicons
+import sentlex.termtable as termtable
+
+from . import corpus
+from .harness import Case
+
+LEXICONS = {'moby': sentlex.MobyLexicon,
+            'uic': sentlex.UICLexicon,
+            'swn3': sentlex.SWN3Lexicon}
+
+PRESETS = [sentanalysis.AV_AllWordsDocSentiScore,
+           sentanalysis.A_AllWordsDocSentiScore,
+           sentanalysis.A_OnceWordsDocSentiScore,
+           sentanalysis.AV_OnceWordsDocSentiScore,
+           sentanalysis_potts.AV_LightPottsSentiScore,
+           sentanalysis_potts.A_LightPottsSentiScore,
+           sentanalysis_potts.AV_AggressivePottsSentiScore,
+           sentanalysis_potts.A_AggressivePottsSentiScore]
+
+NEGATION_SIZES = [10, 100, 1000, 10000]
+NEGATION_WINDOW = 5
+
+# (full, quick) sizes
+LEXICON_REPEAT = (5, 1)
+FREQUENCY_REPEAT = (5, 1)
+LOOKUPS = (50000, 5000)
+NEGATION_TOKENS = (200000, 20000)
+CLASSIFY_DOCS = (100, 10)
+UNTAGGED_DOCS = (20, 5)
+DOCLEN = 300
+
+
+def _no_artifact_cache():
+    # lexicon construction is measured from data files, not from cached artifacts
+    os.environ.pop('SENTLEX_CACHE_DIR', None)
+
+
+def _cold(fn):
+    # frequency tables are read once per process and then shared, so they are dropped before each timed call
+    def cold(item):
+        lexicons._FREQUENCY_DICTS.clear()
+        termtable._SHARED_TABLES.clear()
+        return fn(item)
+    return cold
+
+
+def make_lexicon(name):
+    '''
+      Returns lexicon by name: one of LEXICONS, or composite (Moby and UIC).
+    '''
+    if name == 'composite':
+        L = sentlex.CompositeLexicon()
+        L.add_lexicon(sentlex.MobyLexicon())
+        L.add_lexicon(sentlex.UICLexicon())
+        L.compile_frequency()
+        return L
+    return LEXICONS[name]()
+
+
+def lexicon_cases(quick=False):
+    repeat = LEXICON_REPEAT[quick]
+    cases = []
+    for name in sorted(LEXICONS):
+        def setup(name=name):
+            _no_artifact_cache()
+            return (_cold(lambda i: LEXICONS[name]()), list(range(repeat)))
+        cases.append(Case('lexicon.%s' % name, setup, unit='lexicon', warmup=0))
+
+    def setup_composite():
+        _no_artifact_cache()
+        members = [sentlex.MobyLexicon(), sentlex.UICLexicon()]
+
+        def build(i):
+            L = sentlex.CompositeLexicon()
+            for member in members:
+                L.add_lexicon(member)
+            L.compile_frequency()
+            L.compile_index()
+            return L
+        return (_cold(build), list(range(repeat)))
+    cases.append(Case('lexicon.composite', setup_composite, unit='lexicon', warmup=0))
+
+    def setup_frequency():
+        return (_cold(lambda i: sentlex.Lexicon().compile_frequency()), list(range(FREQUENCY_REPEAT[quick])))
+    cases.append(Case('compile_frequency', setup_frequency, unit='call', warmup=0))
+    return cases
+
+
+def lookup_cases(lexicon, seed, quick=False):
+    def setup():
+        L = make_lexicon(lexicon)
+        getters = [L.getadjective, L.getverb, L.getadverb, L.getnoun]
+        terms = corpus.terms(corpus.generate(LOOKUPS[quick] // DOCLEN + 1, DOCLEN, seed))[:LOOKUPS[quick]]
+        items = [(getters[i % len(getters)], term) for (i, term) in enumerate(terms)]
+        return (lambda item: item[0](item[1]), items)
+    return [Case('lookup.%s' % lexicon, setup, unit='term', batch=1000)]
+
+
+def negation_cases(seed, quick=False):
+    cases = []
+    for size in NEGATION_SIZES:
+        def setup(size=size):
+            ndocs = max(NEGATION_TOKENS[quick] // size, 3)
+            docs = [doc.split()[:size] for doc in corpus.generate(ndocs, size, seed)]
+            return (lambda doc: negdetect.getNegationArray(doc, NEGATION_WINDOW), docs)
+        cases.append(Case('negation.%d' % size, setup, unit='doc', batch=max(1000 // size, 1)))
+    return cases
+
+
+def classify_cases(lexicon, seed, quick=False):
+    cases = []
+    for cls in PRESETS:
+        def setup_tagged(cls=cls):
+            classifier = cls(make_lexicon(lexicon))
+            docs = corpus.generate(CLASSIFY_DOCS[quick], DOCLEN, seed)
+            return (lambda doc: classifier.classify_document(doc, tagged=True, verbose=False), docs)
+
+        def setup_untagged(cls=cls):
+            classifier = cls(make_lexicon(lexicon))
+            # an empty tag cache, so that every document is tagged
+            classifier.set_tag_cache(caching.TagCache(maxsize=0))
+            docs = [corpus.untag(doc) for doc in corpus.generate(UNTAGGED_DOCS[quick], DOCLEN, seed)]
+            return (lambda doc: classifier.classify_document(doc, tagged=False, verbose=False), docs)
+
+        cases.append(Case('classify.%s.tagged' % cls.__name__, setup_tagged, unit='doc'))
+        cases.append(Case('classify.%s.untagged' % cls.__name__, setup_untagged, unit='doc'))
+    return cases
+
+
+def cases(lexicon='moby', seed=0, quick=False):
+    '''
+      Returns list of all benchmark cases.
+    '''
+    return (lexicon_cases(quick) + lookup_cases(lexicon, seed, quick) + negation_cases(seed, quick) +
+            classify_cases(lexicon, seed, quick))
@@ -0,0 +1,120 @@
+'''
+annotations.py - Compact per-token scan records
+
+During a scan, classifiers record found tokens as numeric arrays indexed by token position, rather than strings.
+Results built from TokenRecords render the found list, the unscored list and the annotated document only when they
+are read, and annotations can be streamed to a file without building the annotated document in memory:
+
+    result = classifier.score_document(doc, annotations=True)
+    with open('audit.txt', 'w') as f:
+        result.write_annotations(f)
+
+An annotated document has one entry per (non-corrupt) token, with the negation flag and score contribution of
+tokens found in the lexicon parts of speech being scanned:
+
+    this/DT good/JJ##NEGAT:0##POS:1.0##NEG:0.0 movie/NN
+'''
+
+from __future__ import absolute_import
+import collections
+from array import array
+
+import six
+
+# value type flags for annotated scores, to render them as the scan computed them (eg. 0 vs 0.0)
+INT_POS = 1
+INT_NEG = 2
+
+
+class TokenRecords(object):
+    '''
+     Per-token records of a document scan.
+
+       tagged_doc - POS-tagged document text (tokens are recovered by splitting it), or tagging.TaggedDocument
+       tagsep     - POS tag separator
+       found      - positions (1-based) of tokens found in scanned parts of speech
+       unscored   - positions of found tokens with no lexicon score
+       skipped    - positions of corrupt tokens, left out of annotations
+       posvals, negvals, intflags - score contribution of each found token, if annotations are recorded
+       negation   - negation map of the document, if negation is enabled and annotations are recorded
+    '''
+    __slots__ = ('tagged_doc', 'tagsep', 'annotations', 'found', 'unscored', 'skipped', 'posvals', 'negvals',
+                 'intflags', 'negation')
+
+    def __init__(self, tagged_doc, tagsep, annotations=False, negation=None):
+        self.tagged_doc = tagged_doc
+        self.tagsep = tagsep
+        self.annotations = annotations
+        self.found = array('i')
+        self.unscored = array('i')
+        self.skipped = array('i')
+        self.posvals = array('d')
+        self.negvals = array('d')
+        self.intflags = bytearray()
+        self.negation = negation
+
+    def add_found(self, i, posval=0.0, negval=0.0):
+        '''
+         Records i-th token as found, with its score contribution (kept only if recording annotations).
+        '''
+        self.found.append(i)
+        if self.annotations:
+            self.posvals.append(posval)
+            self.negvals.append(negval)
+            self.intflags.append((INT_POS if isinstance(posval, int) else 0) |
+                                 (INT_NEG if isinstance(negval, int) else 0))
+
+    def tokens(self):
+        if isinstance(self.tagged_doc, six.string_types):
+            return self.tagged_doc.split()
+        return self.tagged_doc.tokens()
+
+    def found_list(self):
+        '''
+         Returns Counter of found tagged tokens.
+        '''
+        tokens = self.tokens()
+        return collections.Counter(tokens[i - 1] for i in self.found)
+
+    def unscored_list(self):
+        '''
+         Returns list of found tagged tokens with no lexicon score.
+        '''
+        if not len(self.unscored):
+            return []
+        tokens = self.tokens()
+        return [tokens[i - 1] for i in self.unscored]
+
+    def iter_annotations(self):
+        '''
+         Yields annotated tokens of the document, in order. Requires records made with annotations enabled.
+        '''
+        assert self.annotations, 'Annotations were not recorded for this document.'
+        found = self.found
+        nfound = len(found)
+        skipped = set(self.skipped)
+        k = 0
+        for (i, tagword) in enumerate(self.tokens(), 1):
+            if k < nfound and found[k] == i:
+                flags = self.intflags[k]
+                posval = int(self.posvals[k]) if flags & INT_POS else self.posvals[k]
+                negval = int(self.negvals[k]) if flags & INT_NEG else self.negvals[k]
+                negtag = str(self.negation[i - 1]) if self.negation is not None else 'NONEG'
+                k += 1
+                yield (tagword + '##NEGAT:' + negtag + '##POS:' + str(posval) + '##NEG:' + str(negval))
+            elif i not in skipped:
+                yield tagword
+
+    def annotated_doc(self):
+        return ' '.join(self.iter_annotations())
+
+    def write_annotations(self, f, sep=' '):
+        '''
+         Writes annotated tokens to file-like object f, separated by sep, without building the annotated document.
+        '''
+        first = True
+        for token in self.iter_annotations():
+            if not first:
+                f.write(sep)
+            f.write(token)
+            first = False
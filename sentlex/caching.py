@@ -0,0 +1,206 @@
+'''
+caching.py - Cache components
+
+LRUCache is a size-bounded, thread-safe mapping evicting least recently used entries, with hit/miss counters
+and optional persistence to a JSON file.
+
+LemmaCache holds verb lemmas computed by classifiers (see BasicDocSentiScore._lemmatize_verb). By default every
+classifier has its own cache; calling share_lemma_cache() makes classifiers created afterwards in this process
+use a single shared cache, which can also be loaded from (and saved to) disk to ship a warm cache with deployments.
+
+TagCache holds POS-tagged tokens of raw documents, keyed by content hash (see tagging module), with an optional
+on-disk tier consulted on in-memory misses.
+'''
+
+from __future__ import absolute_import
+import os
+import json
+import shelve
+import tempfile
+import threading
+import collections
+
+
+class LRUCache(object):
+    '''
+     Size-bounded mapping with least-recently-used eviction. maxsize=None means unbounded.
+     Lookups through get() update hits/misses counters.
+    '''
+
+    def __init__(self, maxsize=10000, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __getstate__(self):
+        # locks can not be pickled - copies get their own
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        '''
+         Returns dict with cache statistics: hits, misses, hit_rate, size and maxsize.
+        '''
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': (self.hits / float(lookups)) if lookups else 0.0,
+                'size': len(self._data), 'maxsize': self.maxsize}
+
+    def save(self, path=None):
+        '''
+         Saves cache entries to JSON file at path (defaults to the path given at construction), in LRU order.
+        '''
+        path = path or self.path
+        assert path, 'No path given to save cache.'
+        with self._lock:
+            items = list(self._data.items())
+
+        dirname = os.path.dirname(os.path.abspath(path))
+        fd, tmppath = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(items, f)
+        os.replace(tmppath, path)
+
+    def load(self, path=None):
+        '''
+         Loads cache entries from JSON file at path, as written by save().
+        '''
+        path = path or self.path
+        with open(path) as f:
+            items = json.load(f)
+        for (key, value) in items:
+            self.put(key, value)
+
+
+class LemmaCache(LRUCache):
+    '''
+     Cache of word -> lemma mappings.
+    '''
+    DEFAULT_MAXSIZE = 100000
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, path=None):
+        super(LemmaCache, self).__init__(maxsize, path)
+
+
+class TagCache(LRUCache):
+    '''
+     Cache of document content hash -> tagged tokens (tuple of (word, tag) tuples).
+
+     If disk_path is given, entries are also written to a shelve database at that path, and looked up there on
+     in-memory misses (counted as disk_hits). Copies of the cache sent to other processes keep the in-memory tier only.
+    '''
+    DEFAULT_MAXSIZE = 1000
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, path=None, disk_path=None):
+        self.disk_path = disk_path
+        self.disk_hits = 0
+        self._disk = shelve.open(disk_path) if disk_path else None
+        super(TagCache, self).__init__(maxsize, path)
+
+    def __getstate__(self):
+        state = super(TagCache, self).__getstate__()
+        state['_disk'] = None
+        return state
+
+    def get(self, key, default=None):
+        value = super(TagCache, self).get(key)
+        if value is not None or self._disk is None:
+            return default if value is None else value
+
+        with self._lock:
+            value = self._disk.get(key)
+        if value is None:
+            return default
+        self.disk_hits += 1
+        super(TagCache, self).put(key, value)
+        return value
+
+    def put(self, key, value):
+        super(TagCache, self).put(key, value)
+        if self._disk is not None:
+            with self._lock:
+                self._disk[key] = value
+
+    def stats(self):
+        stats = super(TagCache, self).stats()
+        stats['disk_hits'] = self.disk_hits
+        return stats
+
+    def close(self):
+        '''
+         Closes the on-disk tier, if any.
+        '''
+        if self._disk is not None:
+            with self._lock:
+                self._disk.close()
+                self._disk = None
+
+
+_shared_lemma_cache = None
+
+
+def share_lemma_cache(enabled=True, maxsize=LemmaCache.DEFAULT_MAXSIZE, path=None):
+    '''
+     Enables (or disables) a process-wide lemma cache, used by classifiers created from now on.
+     Returns the shared cache, or None when disabled.
+    '''
+    global _shared_lemma_cache
+    if not enabled:
+        _shared_lemma_cache = None
+    elif _shared_lemma_cache is None:
+        _shared_lemma_cache = LemmaCache(maxsize, path)
+    return _shared_lemma_cache
+
+
+def get_lemma_cache():
+    '''
+     Returns the shared lemma cache if enabled, or a new private cache otherwise.
+    '''
+    if _shared_lemma_cache is not None:
+        return _shared_lemma_cache
+    return LemmaCache()
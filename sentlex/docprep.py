@@ -0,0 +1,111 @@
+'''
+docprep.py - Preprocessed documents
+
+A PreparedDocument holds the stages of document scoring that do not depend on classifier parameters: POS tagging,
+token parsing, verb lemmatization, lexicon lookups for every part of speech a token tag matches, frequency
+adjustment multipliers (cached per freq_weight) and negation maps (cached per window size). Scoring a prepared
+document with BasicDocSentiScore.score_prepared() only runs the parameter-dependent arithmetic, which makes repeated
+scoring under many configurations cheap (see sweep module).
+
+Prepared documents hold lookups from one lexicon, and should be scored by classifiers using that lexicon.
+'''
+
+from __future__ import absolute_import
+
+from .docscoreutil import tag_categories
+from .tagging import TaggedDocument
+
+# lexicon getters by part of speech category
+_GETTERS = {'a': 'getadjective', 'v': 'getverb', 'r': 'getadverb', 'n': 'getnoun'}
+
+
+class PreparedDocument(object):
+    '''
+      Parameter-independent data of a POS-tagged document.
+
+        tagged_doc - POS-tagged document string, or the parsed document
+        document   - parsed document (a tagging.TaggedDocument)
+        words      - lowercase word of each token, or None for corrupt tokens
+        categories - tuple of part of speech categories matched by each token tag, in scanning order
+        lookups    - tuple of lexicon scoretuples of each token, one for each of its categories
+    '''
+    __slots__ = ('tagged_doc', 'document', 'words', 'categories', 'lookups', '_negation', '_f_negation',
+                 '_freq_factors')
+
+    def __init__(self, tagged_doc, document, words, categories, lookups, f_negation):
+        self.tagged_doc = tagged_doc
+        self.document = document
+        self.words = words
+        self.categories = categories
+        self.lookups = lookups
+        self._f_negation = f_negation
+        self._negation = {}
+        self._freq_factors = {}
+
+    def __getstate__(self):
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for (name, value) in state.items():
+            setattr(self, name, value)
+
+    def __len__(self):
+        return len(self.document)
+
+    @classmethod
+    def from_document(cls, classifier, doc, tagged=True, tagged_tokens=None):
+        '''
+          Prepares document doc for scoring with classifier: a string, a list of (word, tag) tuples or a
+          tagging.TaggedDocument (see BasicDocSentiScore.score_document).
+        '''
+        if not classifier.L.is_loaded:
+            raise RuntimeError('Lexicon has not been assigned, or not loaded')
+
+        (tagged_doc, document) = classifier._parse(doc, tagged, tagged_tokens)
+        L = classifier.L
+        words = []
+        categories = []
+        lookups = []
+        for (thisword, thistag) in zip(document.words, document.tags):
+            if (not thistag) or (not thisword):
+                words.append(None)
+                categories.append(())
+                lookups.append(())
+                continue
+            thisword = thisword.lower()
+            tagcategories = tag_categories(thistag)
+            scoretuples = []
+            for category in tagcategories:
+                term = classifier._lemmatize_verb(thisword) if category == 'v' else thisword
+                scoretuples.append(getattr(L, _GETTERS[category])(term))
+            words.append(thisword)
+            categories.append(tagcategories)
+            lookups.append(tuple(scoretuples))
+
+        return cls(tagged_doc, document, words, categories, lookups, classifier._detector_map['NEGATION']['function'])
+
+    @classmethod
+    def from_arrays(cls, classifier, words, tags):
+        '''
+          Prepares document given as parallel lists of words and (uppercase) POS tags for scoring with classifier.
+        '''
+        return cls.from_document(classifier, TaggedDocument(words, tags))
+
+    def freq_factors(self, L, freq_weight=1.0):
+        '''
+          Returns list of frequency adjustment multipliers of tokens (see Lexicon.get_freq_factor), from lexicon L.
+          Computed once per freq_weight.
+        '''
+        if freq_weight not in self._freq_factors:
+            factors = dict((word, L.get_freq_factor(word, freq_weight)) for word in set(self.words) if word is not None)
+            self._freq_factors[freq_weight] = [factors.get(word) for word in self.words]
+        return self._freq_factors[freq_weight]
+
+    def negation(self, window):
+        '''
+          Returns negation map of document for window size, computed once per size.
+        '''
+        window = int(window)
+        if window not in self._negation:
+            self._negation[window] = self._f_negation(self.document, window)
+        return self._negation[window]
@@ -11,8 +11,75 @@ from . import sentlex
 import re
 import math
 import os
+import nltk.stem
 from . import negdetect
 from . import stopwords
+from .caching import LRUCache
+from .weights import PositionWeight
+
+# Part of speech dispatch
+#
+# Classifiers route each token to a lexicon part of speech ('a', 'v', 'r', 'n') by matching its tag against the
+# patterns below. Rather than running every pattern on every token, matches are resolved once per tag and looked up
+# from a table precomputed for the Penn Treebank tagset. Other tags (which come from user input) are memoized in a
+# bounded LRU cache.
+# A tag may match more than one category; categories are returned in scanning order.
+
+TAG_PATTERNS = (('a', '(JJ|JJ.)$'), ('v', '(VB|VB.)$'), ('r', 'RB$'), ('n', 'NN$'))
+
+PENN_TAGS = ('CC', 'CD', 'DT', 'EX', 'FW', 'IN', 'JJ', 'JJR', 'JJS', 'LS', 'MD', 'NN', 'NNS', 'NNP', 'NNPS',
+             'PDT', 'POS', 'PRP', 'PRP$', 'RB', 'RBR', 'RBS', 'RP', 'SYM', 'TO', 'UH', 'VB', 'VBD', 'VBG', 'VBN',
+             'VBP', 'VBZ', 'WDT', 'WP', 'WP$', 'WRB', '.', ',', ':', '``', "''", '(', ')', '$', '#', '-NONE-')
+
+
+def _match_tag(tag):
+    return tuple(category for (category, pattern) in TAG_PATTERNS if re.search(pattern, tag))
+
+
+TAG_CATEGORIES = dict((tag, _match_tag(tag)) for tag in PENN_TAGS)
+
+# number of non-Penn tags (and legacy token suffixes) memoized
+TAG_MEMO_SIZE = 4096
+_OTHER_TAG_CATEGORIES = LRUCache(TAG_MEMO_SIZE)
+
+
+def tag_categories(tag):
+    '''
+     Returns tuple of part of speech categories ('a', 'v', 'r', 'n') matching POS tag.
+    '''
+    try:
+        return TAG_CATEGORIES[tag]
+    except KeyError:
+        categories = _OTHER_TAG_CATEGORIES.get(tag)
+        if categories is None:
+            categories = _match_tag(tag)
+            _OTHER_TAG_CATEGORIES.put(tag, categories)
+        return categories
+
+
+# legacy docSentiScore() matches patterns against the whole tagged token, separator included
+_LEGACY_TAG_PATTERNS = (('a', '[_/](JJ|JJ.)$'), ('v', '[_/](VB|VB.)$'), ('r', '[_/]RB$'), ('n', '[_/]NN$'))
+_LEGACY_SUFFIX = 4
+_LEGACY_CATEGORIES = LRUCache(TAG_MEMO_SIZE)
+
+
+def legacy_tag_categories(tagword):
+    '''
+     Returns dict mapping part of speech categories matched by tagged token tagword (eg. good/JJ) to the (negative)
+     index of the tag separator. Patterns are anchored at the end and at most 4 chars long, so matches depend only
+     on the last 4 chars of the token, which are used as memoization key (in a bounded LRU cache).
+    '''
+    suffix = tagword[-_LEGACY_SUFFIX:]
+    categories = _LEGACY_CATEGORIES.get(suffix)
+    if categories is None:
+        categories = {}
+        for (category, pattern) in _LEGACY_TAG_PATTERNS:
+            match = re.search(pattern, suffix)
+            if match:
+                categories[category] = match.start() - len(suffix)
+        _LEGACY_CATEGORIES.put(suffix, categories)
+    return categories
+
 
 # Score adjustment functions
 
@@ -143,7 +210,8 @@ def docSentiScore(L, Doc, aflag, vflag, rflag, nflag, negflag, negwindow=5,
       - rflag (adverbs)
       - nflag
      In addition, negflag is a boolean indicating whether to use negation detection, with window scope negwindow.
-     w(x,i,N) is a weight adjustment function based on word position within the document.
+     w(x,i,N) is a weight adjustment function based on word position within the document, or a
+     weights.PositionWeight.
      scoringmethod is a list of non-exlcusive parameters used to switch on/off scoring features.
 
      Returns tuple (posscore, negscore, doc) containing final document scores and annotated document.
@@ -163,6 +231,9 @@ def docSentiScore(L, Doc, aflag, vflag, rflag, nflag, negflag, negwindow=5,
     # Setup stem preprocessing for verbs
     wnl = nltk.stem.WordNetLemmatizer()
 
+    # position weights are applied from a weight vector computed once per document length
+    weights = w.vector(doclen) if isinstance(w, PositionWeight) else None
+
     # 1. Negation detection pre-processing - return an array w/ position of negated terms
     vNEG = negdetect.getNegationArray(tags, negwindow)
 
@@ -180,32 +251,34 @@ def docSentiScore(L, Doc, aflag, vflag, rflag, nflag, negflag, negwindow=5,
         tagfound = False
         tagseparator = ''
 
+        tagcategories = legacy_tag_categories(tagword)
+
         # Adjectives
-        if aflag == True and re.search('[_/](JJ|JJ.)$', tagword):
+        if aflag == True and 'a' in tagcategories:
             tagfound = True
-            tagseparator = tagword[re.search('[_/](JJ|JJ.)$', tagword).start()]
+            tagseparator = tagword[tagcategories['a']]
             thisterm = tagword.split(tagseparator)[0]
             scoretuple = L.getadjective(thisterm)
 
         # Verbs (VBP / VBD/ etc...)
-        if vflag == True and re.search('[_/](VB|VB.)$', tagword):
+        if vflag == True and 'v' in tagcategories:
             tagfound = True
-            tagseparator = tagword[re.search('[_/](VB|VB.)$', tagword).start()]
+            tagseparator = tagword[tagcategories['v']]
             thisterm = tagword.split(tagseparator)[0]
             thisterm = wnl.lemmatize(thisterm, pos='v')
             scoretuple = L.getverb(thisterm)
 
         # Adverbs
-        if rflag == True and re.search('[_/]RB$', tagword):
+        if rflag == True and 'r' in tagcategories:
             tagfound = True
-            tagseparator = tagword[re.search('[_/]RB$', tagword).start()]
+            tagseparator = tagword[tagcategories['r']]
             thisterm = tagword.split(tagseparator)[0]
             scoretuple = L.getadverb(thisterm)
 
         # Nouns
-        if nflag == True and re.search('[_/]NN$', tagword):
+        if nflag == True and 'n' in tagcategories:
             tagfound = True
-            tagseparator = tagword[re.search('[_/]NN$', tagword).start()]
+            tagseparator = tagword[tagcategories['n']]
             thisterm = tagword.split(tagseparator)[0]
             scoretuple = L.getnoun(thisterm)
 
@@ -227,19 +300,24 @@ def docSentiScore(L, Doc, aflag, vflag, rflag, nflag, negflag, negwindow=5,
                (scoringmethod == SCOREWITHSTOP and (not objectiveWords.is_stop(thisterm)))
            ):
 
+            if weights is not None:
+                wposval = scoretuple[posindex] * weights[i - 1]
+                wnegval = scoretuple[negindex] * weights[i - 1]
+            else:
+                wposval = w(scoretuple[posindex], i, doclen)
+                wnegval = w(scoretuple[negindex], i, doclen)
+
             if (scoringmethod in [SCOREWITHFREQ, SCOREWITHSTOP]):
                 # Scoring with frequency information
                 # Frequency is a real valued at 0.0-1.0. We calculate sqrt function so
                 # that the value grows faster even for numbers close to 0
-                posval += w(scoretuple[posindex], i, doclen) * \
-                    (1.0 - math.sqrt(L.get_freq(thisterm)))
-                negval += w(scoretuple[negindex], i, doclen) * \
-                    (1.0 - math.sqrt(L.get_freq(thisterm)))
+                posval += wposval * (1.0 - math.sqrt(L.get_freq(thisterm)))
+                negval += wnegval * (1.0 - math.sqrt(L.get_freq(thisterm)))
 
             else:
                 # Just plain scoring from lexicon - add
-                posval += w(scoretuple[posindex], i, doclen)
-                negval += w(scoretuple[negindex], i, doclen)
+                posval += wposval
+                negval += wnegval
 
         postotal += posval
         negtotal += negval
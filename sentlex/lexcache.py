@@ -0,0 +1,135 @@
+'''
+lexcache.py - Precompiled lexicon artifacts
+
+Parsing lexicon resources from text is costly: every entry is split and converted to float on each load.
+This module saves the parsed dictionaries of a lexicon (A/V/R/N and frequency table) to a versioned binary
+artifact, and loads them back.
+
+Artifacts are keyed by a fingerprint of the source data file and of the loader function used to parse it,
+so a stale artifact is detected (and rebuilt by the caller) whenever either changes. Other inputs of the
+artifact, such as the frequency data file, are added to the fingerprint by the caller (see file_digest).
+
+A default cache directory can be set with the SENTLEX_CACHE_DIR environment variable.
+'''
+
+from __future__ import absolute_import
+import os
+import re
+import hashlib
+import inspect
+import tempfile
+from six.moves import cPickle as pickle
+
+# bump when the artifact payload layout changes
+ARTIFACT_VERSION = 3
+ARTIFACT_MAGIC = b'SENTLEX-ARTIFACT'
+ARTIFACT_EXT = '.lexc'
+
+CACHE_DIR_ENV = 'SENTLEX_CACHE_DIR'
+
+
+def get_cache_dir(cache_dir=None):
+    '''
+      Returns cache_dir if given, otherwise the directory set on SENTLEX_CACHE_DIR (None if not set).
+    '''
+    return cache_dir or os.environ.get(CACHE_DIR_ENV) or None
+
+
+def loader_fingerprint(f_loader):
+    '''
+      Returns a digest identifying loader function f_loader, based on its name and source code.
+      Adapted loaders (see sentlexutil.per_pos_adapter) are identified by the function they wrap.
+    '''
+    h = hashlib.sha1()
+    while f_loader is not None:
+        h.update(('%s.%s' % (getattr(f_loader, '__module__', ''), getattr(f_loader, '__name__', ''))).encode('utf-8'))
+        try:
+            h.update(inspect.getsource(f_loader).encode('utf-8'))
+        except (IOError, OSError, TypeError):
+            code = getattr(f_loader, '__code__', None)
+            if code is not None:
+                h.update(code.co_code)
+        f_loader = getattr(f_loader, '__wrapped__', None)
+    return h.hexdigest()
+
+
+def file_digest(path):
+    '''
+      Returns a digest of the contents of file at path.
+    '''
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024000), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def fingerprint(datafile, f_loader, extra=None):
+    '''
+      Returns a digest of data file contents and loader function. Optional extra is a string of
+      additional load options that affect the parsed result.
+    '''
+    h = hashlib.sha1()
+    h.update(str(ARTIFACT_VERSION).encode('utf-8'))
+    h.update(loader_fingerprint(f_loader).encode('utf-8'))
+    if extra:
+        h.update(extra.encode('utf-8'))
+    with open(datafile, 'rb') as f:
+        for block in iter(lambda: f.read(1024000), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def artifact_path(cache_dir, name, fp):
+    '''
+      Returns path of artifact file for lexicon name and fingerprint fp within cache_dir.
+    '''
+    safename = re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+    return os.path.join(cache_dir, '%s-%s%s' % (safename, fp[:20], ARTIFACT_EXT))
+
+
+def save_artifact(path, payload, fp=''):
+    '''
+      Writes payload (a dict of lexicon data) to artifact file at path, tagged with fingerprint fp.
+      The file is written to a temporary name first, so concurrent readers never see a partial artifact.
+    '''
+    dirname = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+
+    fd, tmppath = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(ARTIFACT_MAGIC)
+            pickle.dump({'version': ARTIFACT_VERSION, 'fingerprint': fp}, f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(payload, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmppath, path)
+    except Exception:
+        if os.path.exists(tmppath):
+            os.remove(tmppath)
+        raise
+
+
+def load_artifact(path, fp=None):
+    '''
+      Reads lexicon payload from artifact file at path.
+      Returns None if the file does not exist, is not a readable artifact (eg. truncated or corrupt), was written by a
+      different artifact version, or (when fp is given) does not match fingerprint fp. Callers treat None as a cache
+      miss, rebuilding and rewriting the artifact.
+    '''
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(ARTIFACT_MAGIC)) != ARTIFACT_MAGIC:
+                raise ValueError('%s is not a sentlex lexicon artifact' % path)
+            header = pickle.load(f)
+            if header.get('version') != ARTIFACT_VERSION:
+                return None
+            if fp is not None and header.get('fingerprint') != fp:
+                return None
+            payload = pickle.load(f)
+    except (pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+        return None
+    return payload if isinstance(payload, dict) else None
@@ -24,7 +24,8 @@
 from __future__ import absolute_import
 from __future__ import print_function
 import re
-from six.moves import range
+
+from .tagging import TaggedDocument
 
 # Pseudo-negations - to be ignored by the algorithm
 NEG_PSEUDO = set([
@@ -117,78 +118,87 @@ NEG_ENDOFWINDOW = set([
 ])
 
 
-def getNegationArray(doc, windowsize, debugmode=False, postag=True):
+def _guess_separator(tokens):
     '''
-      NegEx-based negation detection algorithm for text.
-      Receives a POS-tagged document in list form and size of negating window. A POS-tagged document takes the form:
+     given a list of tokens "guesses" the part of speech separator based on first tokens.
+     Returns None if first tokens have no separator.
+    '''
+    for token in tokens[:2]:
+        if '_' in token:
+            return '_'
+        elif '/' in token:
+            return '/'
+    return None
 
-         Do_VBP n't_RB tell_VB her_PRP who_WP I_PRP am_VBP seeing_VBG
 
-      Returns array A where A[i] indicates whether this position in the document has been negated by an expression (1), or not (0).
+class NegationScanner(object):
+    '''
+      Incremental version of getNegationArray(), for documents received as a stream of token chunks.
 
-      Arguments
-      ---------
-         doc        - input doc as *list* of tokens, with or w/out part of speech
-         windowsize - the default cut off window size that limits the scope of a negation.
-         debugmode  - prints more stuff
-         postag     - True/False, whether input document has been POS-tagged
+      The scanner carries negation window state between chunks. Because bigrams are matched, the negation flag of a
+      token is decided once the following token is seen: feed() returns flags for all tokens received so far but
+      the last one, and close() returns the flag for the last token of the document.
+
+         scanner = NegationScanner(5)
+         flags = scanner.feed(chunk1) + scanner.feed(chunk2) + scanner.close()
     '''
 
-    def debug(msg):
-        if debugmode:
+    def __init__(self, windowsize, debugmode=False, postag=True, separator=None):
+        self.windowsize = windowsize
+        self.debugmode = debugmode
+        self.postag = postag
+        self.separator = separator
+        self.inwindow = 0
+        self.found_neg_fwd = False
+        self.found_neg_bck = False
+        self.position = 0
+        self._undecided = []    # tokens received before the tag separator could be guessed
+        self._pending = None    # last unigram, waiting for the next token
+
+    def debug(self, msg):
+        if self.debugmode:
             print('[getNegationArray] - %s' % msg)
 
-    def get_pos_separator(doc):
+    def feed(self, tokens):
         '''
-         given a list of tokens "guesses" the part of speech separator based on first tokens
+          Scans list of tokens, returning negation flags (0/1) for tokens that can be decided.
         '''
-        for i in range(min(2, len(doc))):
-            if '_' in doc[i]:
-                return '_'
-            elif '/' in doc[i]:
-                return '/'
-        return '_'
-
-    def get_next_ngram(doc, docsize, position, n, postag, separator):
+        flags = []
+        if self.postag and self.separator is None:
+            self._undecided.extend(tokens)
+            separator = _guess_separator(self._undecided)
+            if separator is None and len(self._undecided) < 2:
+                return flags
+            self.separator = separator or '_'
+            (tokens, self._undecided) = (self._undecided, [])
+
+        for token in tokens:
+            unigram = token.split(self.separator)[0] if self.postag else token
+            if self._pending is not None:
+                flags.append(self._step(self._pending, self._pending + ' ' + unigram))
+            self._pending = unigram
+        return flags
+
+    def close(self):
         '''
-         Returns next n-gram from document, stripping part of speech.
-         If position+n is larger than doc lenght, returns smallest n-gram that fits end of document.
+          Ends the document, returning negation flags for remaining tokens.
         '''
-        grams = []
-        for igram in range(n):
-            if position < (docsize - igram):
-                if postag:
-                    grams.append(doc[position + igram].split(separator)[0])
-                else:
-                    grams.append(doc[position + igram])
-        return ' '.join(grams).lower()
-
-    # check input is a list
-    assert type(doc) is list, 'Input document must be a list of POS-tagged tokens'
-
-    # Initialise array
-    vNEG = [0 for t in range(len(doc))]
-    # Initialise window counters
-    winstart = 0
-    i = 0
-    found_pseudo = False
-    found_neg_fwd = False
-    found_neg_bck = False
-    inwindow = 0
-    separator = '_'
-    if postag:
-        separator = get_pos_separator(doc)
-        untagged_doc = [w.split(separator)[0] for w in doc]
-    else:
-        untagged_doc = doc
+        flags = []
+        if self._undecided:
+            self.separator = _guess_separator(self._undecided) or '_'
+            (tokens, self._undecided) = (self._undecided, [])
+            flags = self.feed(tokens)
+        if self._pending is not None:
+            flags.append(self._step(self._pending, self._pending))
+            self._pending = None
+        return flags
 
-    docsize = len(untagged_doc)
-    for i in range(docsize):
-        unigram = untagged_doc[i]
-        if i < (docsize - 1):
-            bigram = unigram + ' ' + untagged_doc[i + 1]
-        else:
-            bigram = unigram
+    def _step(self, unigram, bigram):
+        '''
+          Scans one token, given its unigram and bigram (unigram itself for the last token). Returns negation flag.
+        '''
+        negated = 0
+        found_pseudo = False
 
         # Search for pseudo negations
         if bigram in NEG_PSEUDO:
@@ -197,32 +207,100 @@ def getNegationArray(doc, windowsize, debugmode=False, postag=True):
         # Look for pre negations
         if not found_pseudo:
             if (unigram in NEG_PRENEGATION) or (bigram in NEG_PRENEGATION):
-                found_neg_fwd = True
-                debug('Found fwd negation at vicinity of: %s ' % bigram)
+                self.found_neg_fwd = True
+                self.debug('Found fwd negation at vicinity of: %s ' % bigram)
             if (unigram in NEG_POSNEGATION) or (bigram in NEG_POSNEGATION):
-                found_neg_bck = True
-                debug('Found back negation at vicinity of: %s' % bigram)
+                self.found_neg_bck = True
+                self.debug('Found back negation at vicinity of: %s' % bigram)
 
         # If found fwd/backw negation, then negate window
-        if found_neg_fwd:
+        if self.found_neg_fwd:
             # negate terms forward up to window
-            if inwindow < windowsize:
-                vNEG[i] = 1
-                inwindow += 1
+            if self.inwindow < self.windowsize:
+                negated = 1
+                self.inwindow += 1
             else:
                 # out of window space. Reset fwd negation and window
-                found_neg_fwd = False
-                inwindow = 0
+                self.found_neg_fwd = False
+                self.inwindow = 0
 
         # now move window
         if (unigram in NEG_ENDOFWINDOW) or (bigram in NEG_ENDOFWINDOW):
             # found end of negation, must reset window and negation state
-            debug('End of negating window at %d, %s.' % (i, unigram))
-            inwindow = 0
-            found_neg_fwd = False
-            winstart = i
+            self.debug('End of negating window at %d, %s.' % (self.position, unigram))
+            self.inwindow = 0
+            self.found_neg_fwd = False
 
-        # Always reset pseudo
-        found_pseudo = False
+        self.position += 1
+        return negated
+
+
+class NegationTally(object):
+    '''
+      Running summary of a negation map (see getNegationArray), for streams too long to keep one flag per token:
+      the number of flags seen, the last flag, and the number of negated instances (see negated_instances).
+      Supports len() and lookup of the last flag only.
+    '''
+    __slots__ = ('length', 'last', 'transitions')
+
+    def __init__(self):
+        self.length = 0
+        self.last = 0
+        self.transitions = 0
+
+    def append(self, flag):
+        if flag and self.length and not self.last:
+            self.transitions += 1
+        self.last = flag
+        self.length += 1
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if index not in (-1, self.length - 1) or not self.length:
+            raise IndexError('Only the last negation flag is kept')
+        return self.last
+
+
+def negated_instances(flags):
+    '''
+      Returns number of negated instances in negation map flags: tokens flagged as negated following one that is not.
+    '''
+    if isinstance(flags, NegationTally):
+        return flags.transitions
+    return len([i for i in range(len(flags) - 1) if flags[i] == 0 and flags[i + 1] == 1])
+
+
+def getNegationArray(doc, windowsize, debugmode=False, postag=True):
+    '''
+      NegEx-based negation detection algorithm for text.
+      Receives a POS-tagged document in list form and size of negating window. A POS-tagged document takes the form:
+
+         Do_VBP n't_RB tell_VB her_PRP who_WP I_PRP am_VBP seeing_VBG
+
+      Returns array A where A[i] indicates whether this position in the document has been negated by an expression (1), or not (0).
+
+      The document may also be given as a list of (word, tag) tuples, or a tagging.TaggedDocument; words are then
+      scanned as they are.
+
+      Arguments
+      ---------
+         doc        - input doc as *list* of tokens, with or w/out part of speech
+         windowsize - the default cut off window size that limits the scope of a negation.
+         debugmode  - prints more stuff
+         postag     - True/False, whether input document has been POS-tagged
+    '''
+    if isinstance(doc, TaggedDocument):
+        words = doc.words
+    else:
+        # check input is a list
+        assert type(doc) is list, 'Input document must be a list of POS-tagged tokens'
+        words = [word for (word, tag) in doc] if (doc and isinstance(doc[0], tuple)) else None
+
+    if words is not None:
+        scanner = NegationScanner(windowsize, debugmode, postag=False)
+        return scanner.feed(words) + scanner.close()
 
-    return vNEG
+    scanner = NegationScanner(windowsize, debugmode, postag, separator=(_guess_separator(doc) or '_') if postag else None)
+    return scanner.feed(doc) + scanner.close()
@@ -0,0 +1,115 @@
+'''
+parallel.py - Process pool classification
+
+Classifies a stream of documents over a pool of worker processes. Each worker receives a copy of the classifier once,
+when it starts (or builds its lexicon with a factory function, see classify_documents()), then scores chunks of
+documents sent by the parent process. Documents are submitted in a bounded window, so arbitrarily long iterables
+(eg. lines of a file) can be classified without holding them in memory.
+
+Use BasicDocSentiScore.classify_documents() rather than calling this module directly.
+'''
+
+from __future__ import absolute_import
+import copy
+import itertools
+import collections
+import multiprocessing
+from six.moves import queue
+
+# chunks submitted ahead of results, per worker
+PENDING_PER_WORKER = 4
+
+# classifier used by this worker process, set by _init_worker()
+_worker = None
+
+
+def _init_worker(classifier, lexicon_factory, tagged):
+    global _worker
+    if lexicon_factory is not None:
+        classifier.set_lexicon(lexicon_factory())
+    _worker = (classifier, tagged)
+
+
+def _classify_chunk(chunk):
+    (classifier, tagged) = _worker
+    results = classifier.score_documents([doc for (index, doc) in chunk], tagged=tagged)
+    return [(index, result.scores) for ((index, doc), result) in zip(chunk, results)]
+
+
+def _chunks(docs, chunksize):
+    '''
+      Yields lists of up to chunksize (index, doc) tuples from iterable docs.
+    '''
+    items = enumerate(docs)
+    while True:
+        chunk = list(itertools.islice(items, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def cpu_jobs(n_jobs):
+    '''
+      Returns number of worker processes for n_jobs: None or values below 1 mean one per CPU (-1) or all but (-n + 1).
+    '''
+    if n_jobs is None:
+        n_jobs = -1
+    if n_jobs < 1:
+        n_jobs = max(1, multiprocessing.cpu_count() + 1 + n_jobs)
+    return n_jobs
+
+
+def classify_documents(classifier, docs, n_jobs, chunksize=1, tagged=True, ordered=True, lexicon_factory=None):
+    '''
+      Generator classifying documents in iterable docs with classifier over n_jobs worker processes.
+
+      Yields (pos, neg) result tuples in input order, or (index, (pos, neg)) tuples as chunks complete if ordered
+      is False. If given, lexicon_factory is called once in each worker to build the lexicon (eg. a lexicon class),
+      instead of sending a copy of the classifier lexicon to workers.
+    '''
+    assert chunksize >= 1, 'chunksize must be a positive integer'
+    n_jobs = cpu_jobs(n_jobs)
+    if lexicon_factory is not None:
+        # workers build their own lexicon, so the classifier is sent without it
+        classifier = copy.copy(classifier)
+        classifier.L = None
+    initargs = (classifier, lexicon_factory, tagged)
+
+    maxpending = n_jobs * PENDING_PER_WORKER
+    pool = multiprocessing.Pool(n_jobs, initializer=_init_worker, initargs=initargs)
+    try:
+        if ordered:
+            pending = collections.deque()
+            for chunk in _chunks(docs, chunksize):
+                pending.append(pool.apply_async(_classify_chunk, (chunk,)))
+                while len(pending) >= maxpending:
+                    for (index, result) in pending.popleft().get():
+                        yield result
+            while pending:
+                for (index, result) in pending.popleft().get():
+                    yield result
+        else:
+            done = queue.Queue()
+            npending = 0
+            for chunk in _chunks(docs, chunksize):
+                pool.apply_async(_classify_chunk, (chunk,), callback=done.put, error_callback=done.put)
+                npending += 1
+                while npending >= maxpending:
+                    npending -= 1
+                    for item in _completed(done.get()):
+                        yield item
+            while npending:
+                npending -= 1
+                for item in _completed(done.get()):
+                    yield item
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _completed(results):
+    # error_callback places worker exceptions in the results queue
+    if isinstance(results, BaseException):
+        raise results
+    return results
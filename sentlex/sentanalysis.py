@@ -9,15 +9,168 @@
 
 from __future__ import absolute_import
 from __future__ import print_function
-import re
 import math
 import nltk.stem
 import collections
+import six
 
 # library imports
 from . import negdetect
 from . import stopwords
+from . import caching
+from . import parallel
+from . import tagging
+from . import vecscore
+from . import weights
+from .annotations import TokenRecords
 from .docscoreutil import *
+from .docscoreutil import tag_categories
+from .sentlex import freq_factor
+
+
+# namedtuple types for classifier configs, by field names
+_CONFIG_TYPES = {}
+
+# repeat counts with precomputed backoff multipliers, and tables by backoff_alpha (see backoff_table)
+BACKOFF_TABLE_SIZE = 1024
+_BACKOFF_TABLES = {}
+
+# Immutable scoring plan compiled from a classifier config (see BasicDocSentiScore.plan)
+ScoringPlan = collections.namedtuple('ScoringPlan', [
+    'config',           # config namedtuple the plan was compiled from
+    'score_enabled',    # score_mode is a known mode - words are not scored otherwise
+    'score_once',       # score_mode is SCOREONCE
+    'score_backoff',    # score_mode is SCOREBACKOFF
+    'score_stop',       # skip stop words
+    'score_freq',       # frequency-adjust word scores
+    'flip_negation',    # swap pos/neg scores of negated words (negation without atenuation)
+    'score_function',   # resolved position weight function, or None for no-op (or position weights)
+    'position_weight',  # weights.PositionWeight applied by weight vector, or None
+    'backoff_alpha',
+    'backoff_table',    # backoff multipliers by repeat count (SCOREBACKOFF), see backoff_table()
+    'freq_weight',
+    'detectors',        # tuple of (map_type, pos_factor, neg_factor) for active atenuation maps
+    'engine',           # scan implementation: 'python' (token loop) or 'numpy' (see vecscore module)
+])
+
+
+def _backoff_factor(alpha, repeatcount):
+    try:
+        return 1.0 / math.pow(2, alpha * (repeatcount - 1))
+    except OverflowError:
+        return 0.0
+
+
+def backoff_table(alpha):
+    """
+     Returns tuple of exponential backoff multipliers 1 / 2^(alpha * (n - 1)) by repeat count n, for repeat counts
+     below BACKOFF_TABLE_SIZE (0.0 for n = 0). Computed once per alpha.
+    """
+    table = _BACKOFF_TABLES.get(alpha)
+    if table is None:
+        table = _BACKOFF_TABLES[alpha] = (0.0,) + tuple(_backoff_factor(alpha, n) for n in range(1, BACKOFF_TABLE_SIZE))
+    return table
+
+
+def backoff_factor(alpha, repeatcount):
+    """
+     Returns exponential backoff multiplier for repeat count repeatcount and alpha.
+    """
+    try:
+        return backoff_table(alpha)[repeatcount]
+    except (IndexError, TypeError):
+        return _backoff_factor(alpha, repeatcount) if repeatcount else 0.0
+
+
+class ScoreResult(object):
+    """
+     Immutable result of scoring a document (see BasicDocSentiScore.score_document).
+     Fields are the same as the classifier resultdata dictionary; doc and annotated_doc are None unless requested.
+
+     Results are built from compact per-token records of the scan (see annotations.TokenRecords): found_list,
+     unscored_list and annotated_doc are rendered on first access.
+    """
+    FIELDS = ('annotated_doc', 'doc', 'resultpos', 'resultneg', 'tokens_found', 'tokens_negated',
+              'found_list', 'unscored_list')
+    _RENDERED = ('annotated_doc', 'found_list', 'unscored_list')
+
+    __slots__ = ('doc', 'resultpos', 'resultneg', 'tokens_found', 'tokens_negated',
+                 '_records', '_annotated_doc', '_found_list', '_unscored_list')
+
+    def __init__(self, records=None, **fields):
+        object.__setattr__(self, '_records', records)
+        for name in self.FIELDS:
+            attr = ('_' + name) if name in self._RENDERED else name
+            object.__setattr__(self, attr, fields.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ScoreResult is immutable')
+
+    def __reduce__(self):
+        return (_score_result, (self.as_dict(),))
+
+    def __repr__(self):
+        return 'ScoreResult(resultpos=%r, resultneg=%r, tokens_found=%r)' % (
+            self.resultpos, self.resultneg, self.tokens_found)
+
+    def _rendered(self, name, f_render):
+        value = getattr(self, '_' + name)
+        if value is None and self._records is not None:
+            value = f_render(self._records)
+            object.__setattr__(self, '_' + name, value)
+        return value
+
+    @property
+    def annotated_doc(self):
+        if self._records is not None and not self._records.annotations:
+            return self._annotated_doc
+        return self._rendered('annotated_doc', lambda records: records.annotated_doc())
+
+    @property
+    def found_list(self):
+        return self._rendered('found_list', lambda records: records.found_list())
+
+    @property
+    def unscored_list(self):
+        return self._rendered('unscored_list', lambda records: records.unscored_list())
+
+    @property
+    def scores(self):
+        """(pos_score, neg_score) tuple."""
+        return (self.resultpos, self.resultneg)
+
+    def write_annotations(self, f):
+        """Writes annotated document to file-like object f, rendering it token by token when not yet rendered."""
+        if self._annotated_doc is None and self._records is not None and self._records.annotations:
+            self._records.write_annotations(f)
+        elif self.annotated_doc is not None:
+            f.write(self.annotated_doc)
+
+    def as_dict(self):
+        """Result fields as a resultdata dictionary."""
+        return dict((name, getattr(self, name)) for name in self.FIELDS)
+
+
+def _score_result(fields):
+    return ScoreResult(**fields)
+
+
+class DocumentState(object):
+    """
+     Per-document state of a scan: repeated term counts, detector maps (eg. negation), position weight vector
+     and debug flag. Kept apart from the classifier so one classifier can score documents concurrently.
+    """
+    __slots__ = ('tag_counter', 'document_maps', 'verbose', 'weights')
+
+    def __init__(self, tag_counter=None, document_maps=None, verbose=False):
+        self.tag_counter = tag_counter if tag_counter is not None else collections.Counter()
+        self.document_maps = document_maps if document_maps is not None else {}
+        self.verbose = verbose
+        self.weights = None
+
+    def debug(self, msg):
+        if self.verbose:
+            print(msg)
 
 
 class DocSentiScore(object):
@@ -36,6 +189,8 @@ class DocSentiScore(object):
         self.verbose = False
         self._resultdata = {}
         self._detector_map = {}
+        self._frozen_config = None
+        self.set_tag_cache()
 
         # register detector functions (negation detection etc)
         self._register_detector('NEGATION', negdetect.getNegationArray, 'negation', 'negation_window', 'at',
@@ -43,16 +198,40 @@ class DocSentiScore(object):
 
         self._init_config()
 
+    def __getstate__(self):
+        # config views are rebuilt on unpickling, as config namedtuple types are created at runtime
+        state = self.__dict__.copy()
+        state['_frozen_config'] = None
+        state.pop('_plan', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._config_changed()
+
     def _register_detector(self, name, f_detector, enabled_param, window_param, atenuation_prefix, parameters_defaults):
         self._detector_map[name] = {'function': f_detector, 'enabled': enabled_param, 'prefix': atenuation_prefix,
                                     'window': window_param, 'parameters': parameters_defaults}
 
-    def _run_detectors(self, tags):
-        """Compute influence maps from input tags according to registered algorithms."""
+    def _run_detectors(self, tags, config=None, map_cache=None):
+        """
+         Compute influence maps from input tags (a tagging.TaggedDocument, or list of tagged tokens) according to
+         registered algorithms. Returns dict of maps by type.
+         If given, maps are looked up in (and added to) dict map_cache, by detector function and window size.
+        """
+        config = config or self.config
+        document_maps = {}
         for map_type in self._detector_map:
             f_map = self._detector_map[map_type]['function']
-            window = self._config[self._detector_map[map_type]['window']]
-            self._document_maps[map_type] = f_map(tags, int(window))
+            window = int(getattr(config, self._detector_map[map_type]['window']))
+            if map_cache is None:
+                document_maps[map_type] = f_map(tags, window)
+                continue
+            key = (f_map, window)
+            if key not in map_cache:
+                map_cache[key] = f_map(tags, window)
+            document_maps[map_type] = map_cache[key]
+        return document_maps
 
     def _default_config(self):
         """Implement class-specific initial config here."""
@@ -60,10 +239,23 @@ class DocSentiScore(object):
 
     @property
     def config(self):
-        return collections.namedtuple('config', field_names=self._config.keys())(**self._config)
+        """
+         Current configuration as an immutable namedtuple. Built once and cached until parameters change.
+        """
+        if self._frozen_config is None:
+            fields = tuple(self._config.keys())
+            if fields not in _CONFIG_TYPES:
+                _CONFIG_TYPES[fields] = collections.namedtuple('config', field_names=fields)
+            self._frozen_config = _CONFIG_TYPES[fields](**self._config)
+        return self._frozen_config
 
     def set_config(self, k, v):
         self._config[k] = v
+        self._config_changed()
+
+    def _config_changed(self):
+        """Discard cached views of the configuration - called whenever self._config is updated."""
+        self._frozen_config = None
 
     def _init_config(self):
         res = self._BASE_INIT_CONFIG.copy()
@@ -72,6 +264,7 @@ class DocSentiScore(object):
             res.update(self._detector_map[map_type]['parameters'])
 
         self._config = res
+        self._config_changed()
 
     def classify_document(self, doc, tagged=True, verbose=True, **kwargs):
         """
@@ -126,11 +319,47 @@ class DocSentiScore(object):
 
         return None
 
+    def set_tag_cache(self, tag_cache=None):
+        """
+         Sets cache of tagged documents (a caching.TagCache) used by this classifier, or a new private one if None.
+        """
+        self.tag_cache = tag_cache if tag_cache is not None else caching.TagCache()
+
     def pos_tag(self, doc):
         """
          Returns POS-tagged document using NLTK's recommended tagger.
         """
-        return ' '.join([x[0] + '/' + x[1] for x in nltk.pos_tag(nltk.word_tokenize(doc))])
+        return ' '.join(tagging.tag_strings(self.tag_documents([doc])[0]))
+
+    def _parse(self, doc, tagged=True, tagged_tokens=None):
+        """
+         Parses input document once into a tagging.TaggedDocument. doc is a POS-tagged string (raw text if tagged is
+         False, tagged here unless its tagged_tokens are given), a list of (word, tag) tuples, or a TaggedDocument.
+
+         Returns tuple (tagged_doc, document), tagged_doc being the tagged string if given one, or the document.
+        """
+        if isinstance(doc, tagging.TaggedDocument):
+            return (doc, doc)
+        if not isinstance(doc, six.string_types):
+            document = tagging.TaggedDocument.from_tuples(doc)
+            return (document, document)
+        if not tagged:
+            if tagged_tokens is None:
+                tagged_tokens = self.tag_documents([doc])[0]
+            document = tagging.TaggedDocument.from_tuples(tagged_tokens)
+            return (document, document)
+
+        tagsep = self._detect_tag(doc)
+        if not tagsep:
+            raise RuntimeError('Unable to detect tag separator in {}'.format(' '.join(doc[:100])))
+        return (doc, tagging.TaggedDocument.from_tokens(doc.split(), tagsep))
+
+    def tag_documents(self, docs):
+        """
+         Returns list with tagged tokens ((word, tag) tuples) of each raw document in docs, tagged in one batch.
+         Tagged documents are kept in the classifier tag cache.
+        """
+        return tagging.tag_documents(docs, self.tag_cache)
 
     def _debug(self, msg):
         if self.verbose:
@@ -160,13 +389,75 @@ class BasicDocSentiScore(DocSentiScore):
     SCOREONCE = 1
     SCOREBACKOFF = 2
 
-    def __init__(self):
+    def __init__(self, lemma_cache=None):
         # calls superclass
         super(BasicDocSentiScore, self).__init__()
 
         # Setup stem preprocessing for verbs
         self.wnl = nltk.stem.WordNetLemmatizer()
-        self.lemma_cache = {}
+        self.set_lemma_cache(lemma_cache)
+
+    def set_lemma_cache(self, lemma_cache=None):
+        """
+         Sets cache of verb lemmas (a caching.LemmaCache) used by this classifier.
+         If None, the process-wide cache is used when enabled (see caching.share_lemma_cache), or a private one.
+        """
+        self.lemma_cache = lemma_cache if lemma_cache is not None else caching.get_lemma_cache()
+
+    def _config_changed(self):
+        super(BasicDocSentiScore, self)._config_changed()
+        self._plan = None
+
+    @property
+    def plan(self):
+        """
+         Scoring plan (a ScoringPlan namedtuple) compiled from current config. Cached until parameters change.
+        """
+        if self._plan is None:
+            self._plan = self._compile_plan(self.config)
+        return self._plan
+
+    def _resolve_score_function(self, f):
+        """
+         Returns position weight function for config value f - a callable, the name of a _score_<name> method or
+         of built-in position weights (see weights.WEIGHTS). Returns None for the no-op function.
+        """
+        if not callable(f):
+            f = weights.WEIGHTS[f] if f in weights.WEIGHTS else getattr(self, '_score_' + f)
+        if getattr(f, '__func__', None) is BasicDocSentiScore._score_noop:
+            return None
+        return f
+
+    def _compile_plan(self, config):
+        """
+         Resolves config into a ScoringPlan: branch decisions, functions and active detectors are fixed up front.
+        """
+        detectors = []
+        if config.atenuation:
+            for map_type in self._detector_map:
+                detector = self._detector_map[map_type]
+                if getattr(config, detector['enabled']):
+                    detectors.append((map_type, getattr(config, detector['prefix'] + '_pos'),
+                                      getattr(config, detector['prefix'] + '_neg')))
+        score_function = self._resolve_score_function(config.score_function)
+
+        return ScoringPlan(config=config,
+                           score_enabled=(config.score_mode in (self.SCOREALL, self.SCOREONCE, self.SCOREBACKOFF)),
+                           score_once=(config.score_mode == self.SCOREONCE),
+                           score_backoff=(config.score_mode == self.SCOREBACKOFF),
+                           score_stop=bool(config.score_stop),
+                           score_freq=bool(config.score_freq),
+                           flip_negation=bool(config.negation and not config.atenuation),
+                           score_function=(None if isinstance(score_function, weights.PositionWeight)
+                                           else score_function),
+                           position_weight=(score_function if isinstance(score_function, weights.PositionWeight)
+                                            else None),
+                           backoff_alpha=config.backoff_alpha,
+                           backoff_table=(backoff_table(config.backoff_alpha)
+                                          if config.score_mode == self.SCOREBACKOFF else None),
+                           freq_weight=config.freq_weight,
+                           detectors=tuple(detectors),
+                           engine=config.engine)
 
     def _default_config(self):
         return {'score_mode': self.SCOREALL,
@@ -177,64 +468,76 @@ class BasicDocSentiScore(DocSentiScore):
                 'freq_weight': 1.0,
                 'backoff_alpha': 0.0,
                 'a_adjust': 1.0,
-                'v_adjust': 1.0}
+                'v_adjust': 1.0,
+                'engine': 'python'}
 
-    def _get_word_contribution(self, thisword, tagword, scoretuple, i, doclen, config=None):
+    def _get_word_contribution(self, thisword, tagword, scoretuple, i, doclen, plan=None, state=None,
+                               freq_factor=None):
         """
          Returns tuple (posval, negval) containing score contribution for i-th word in document, based
-         on algorithm setup and scoretuple retrieved from lexicon.
+         on scoring plan, document state and scoretuple retrieved from lexicon.
+         freq_factor is the frequency adjustment multiplier of the word, if already known (from lexicon otherwise).
         """
-        config = config or self.config
+        plan = plan or self.plan
+        if state is None:
+            state = DocumentState(self.tag_counter, self._document_maps, self.verbose)
         posval = 0.0
         negval = 0.0
 
         # determine if this word should be scored
-        if (
-            (
-                (config.score_mode == self.SCOREALL) or (config.score_mode == self.SCOREBACKOFF) or
-                (config.score_mode == self.SCOREONCE and (self.tag_counter[tagword] == 1))
-            )
-            and
-            (
-                (config.score_stop and (not self.objectiveWords.is_stop(thisword))) or
-                (not config.score_stop)
-            )
-        ):
-            # flip indexes for pos/neg values if atenuation is disabled (negation maps only)
-            if config.negation and not config.atenuation:
-                vMAP = self._document_maps['NEGATION']
-                posindex = vMAP[i - 1]
-                negindex = (1 + vMAP[i - 1]) % 2
+        if not plan.score_enabled:
+            return (posval, negval)
+        if plan.score_once and state.tag_counter[tagword] != 1:
+            return (posval, negval)
+        if plan.score_stop and self.objectiveWords.is_stop(thisword):
+            return (posval, negval)
+
+        # flip indexes for pos/neg values if atenuation is disabled (negation maps only)
+        if plan.flip_negation:
+            posindex = state.document_maps['NEGATION'][i - 1]
+            negindex = (1 + posindex) % 2
+        else:
+            posindex = 0
+            negindex = 1
+
+        if plan.position_weight is not None:
+            # weight vector is fetched once per document
+            if state.weights is None:
+                state.weights = plan.position_weight.vector(doclen)
+            posval = scoretuple[posindex] * state.weights[i - 1]
+            negval = scoretuple[negindex] * state.weights[i - 1]
+        elif plan.score_function:
+            posval = plan.score_function(scoretuple[posindex], i, doclen)
+            negval = plan.score_function(scoretuple[negindex], i, doclen)
+        else:
+            posval = scoretuple[posindex]
+            negval = scoretuple[negindex]
+
+        if plan.score_freq:
+            # Scoring with frequency information - multipliers are computed once per term (see Lexicon.get_freq_factor)
+            if freq_factor is None:
+                freq_factor = self.L.get_freq_factor(thisword, plan.freq_weight)
+            posval = posval * freq_factor
+            negval = negval * freq_factor
+
+        if plan.score_backoff:
+            # when backoff is enabled we apply exponential backoff to the word contribution
+            repeatcount = state.tag_counter[tagword]
+            if repeatcount < BACKOFF_TABLE_SIZE:
+                factor = plan.backoff_table[repeatcount]
             else:
-                posindex = 0
-                negindex = 1
-
-            posval = config.score_function(scoretuple[posindex], i, doclen)
-            negval = config.score_function(scoretuple[negindex], i, doclen)
-
-            if config.score_freq:
-                # Scoring with frequency information
-                posval = self._freq_adjust(posval, self.L.get_freq(thisword))
-                negval = self._freq_adjust(negval, self.L.get_freq(thisword))
-
-            if config.score_mode == self.SCOREBACKOFF:
-                # when backoff is enabled we apply exponential backoff to the word contribution
-                posval = self._repeated_backoff(posval, self.tag_counter[tagword], self.backoff_alpha)
-                negval = self._repeated_backoff(negval, self.tag_counter[tagword], self.backoff_alpha)
-
-            for map_type in self._document_maps:
-                # loop every active map
-                vMAP = self._document_maps[map_type]
-                at_prefix = self._detector_map[map_type]['prefix']
-                map_enabled = getattr(config, self._detector_map[map_type]['enabled'])
-                map_enabled &= config.atenuation or (not config.atenuation and map_type == 'NEGATION')
-
-                if map_enabled and config.atenuation and vMAP[i - 1]:
-                    # adjust score val when inside an active window and atenuation is enabled
-                    posval *= getattr(config, at_prefix + '_pos')
-                    negval *= getattr(config, at_prefix + '_neg')
-
-            self._debug('[_get_word_contribution] word %s (%s) at %d-th place on docsize %d is eligible (%2.2f, %2.2f).' %
+                factor = backoff_factor(plan.backoff_alpha, repeatcount)
+            posval = posval * factor
+            negval = negval * factor
+
+        for (map_type, at_pos, at_neg) in plan.detectors:
+            # adjust score val when inside an active window and atenuation is enabled
+            if state.document_maps[map_type][i - 1]:
+                posval *= at_pos
+                negval *= at_neg
+
+        if state.verbose:
+            state.debug('[_get_word_contribution] word %s (%s) at %d-th place on docsize %s is eligible (%2.2f, %2.2f).' %
                         (thisword, str(scoretuple), i, doclen, posval, negval))
 
         return (posval, negval)
@@ -247,9 +550,9 @@ class BasicDocSentiScore(DocSentiScore):
             # should not be scoring a word that never ocurred
             return 0.0
 
-        return val * (1.0 / math.pow(2, alpha * (repeatcount - 1)))
+        return val * backoff_factor(alpha, repeatcount)
 
-    def _doc_score_adjust(self, posval, negval, config=None):
+    def _doc_score_adjust(self, posval, negval, config=None, state=None):
         """
          Final adjustments to doc scoring once scan completes
         """
@@ -266,11 +569,7 @@ class BasicDocSentiScore(DocSentiScore):
 
         """
         # unknown words get a mid-range value
-        if p == 0.0:
-            p = 0.0005
-
-        I = -1 * math.log(p, 2)
-        return score * ((1 - freq_weight) + (I * (freq_weight)))
+        return score * freq_factor(p, freq_weight)
 
     def _reset_runtime_vars(self):
         self._resultdata = {}
@@ -281,14 +580,56 @@ class BasicDocSentiScore(DocSentiScore):
         """
          Returns lemma of a given word, if verb
         """
-        # first query local cache in case this lemma already exists
-        if word in self.lemma_cache:
-            return self.lemma_cache[word]
-        else:
+        # inflected forms of lexicon verbs are resolved from the lexicon's verb table (see Lexicon.compile_verb_forms)
+        verb_forms = getattr(self.L, 'verb_forms', None)
+        if verb_forms and word in verb_forms:
+            return verb_forms[word]
+
+        # then query local cache in case this lemma already exists
+        lemma = self.lemma_cache.get(word)
+        if lemma is None:
             lemma = self.wnl.lemmatize(word, pos='v')
             if lemma:
-                self.lemma_cache[word] = lemma
-            return lemma
+                self.lemma_cache.put(word, lemma)
+        return lemma
+
+    def score_document(self, doc, tagged=True, annotations=False, keep_doc=False, verbose=False, tagged_tokens=None):
+        """
+         Performs lexicon-based sentiment classification of input document with current parameters.
+
+         Per-document state is kept local to the call, so one classifier may score documents from several threads
+         at once (as long as its parameters are not changed meanwhile).
+
+         Parameters
+         ----------
+         doc : str, list or tagging.TaggedDocument
+            Input document: a string, or tokens tagged upstream as a list of (word, tag) tuples or a TaggedDocument.
+         tagged : bool
+            boolean indicating document is already POS-tagged.
+         annotations : bool
+            generate annotated document (annotated_doc field).
+         keep_doc : bool
+            keep input document in result (doc field).
+         verbose : bool
+            output verbose logging.
+         tagged_tokens : list
+            optional, (word, tag) tuples of raw document doc, tagged ahead (see tag_documents).
+
+         Returns: ScoreResult
+        """
+        return self._score(doc, tagged, DocumentState(verbose=verbose), annotations, keep_doc, tagged_tokens)
+
+    def score_documents(self, docs, tagged=True, annotations=False, keep_doc=False, verbose=False):
+        """
+         Scores a list of documents with current parameters (see score_document). Untagged documents are POS-tagged
+         in one batch.
+
+         Returns: list of ScoreResult
+        """
+        if tagged:
+            return [self.score_document(doc, True, annotations, keep_doc, verbose) for doc in docs]
+        return [self.score_document(doc, False, annotations, keep_doc, verbose, tagged_tokens)
+                for (doc, tagged_tokens) in zip(docs, self.tag_documents(docs))]
 
     def classify_document(self, doc, tagged=True, verbose=False, annotations=False, **kwargs):
         """
@@ -308,121 +649,269 @@ class BasicDocSentiScore(DocSentiScore):
             optional keyword arguments to configure the classifier.
 
          Returns: (pos_score, neg_score) - total scores obtained from the scan.
+
+         Results are also kept in the classifier (see resultdata), so this method is not thread-safe;
+         see score_document().
         """
         # Process input parameters, if any
         self.set_parameters(**kwargs)
         self.verbose = verbose
+
+        self._reset_runtime_vars()
+        state = DocumentState(verbose=verbose)
+        result = self._score(doc, tagged, state, annotations, keep_doc=True)
+
+        # updates class data structures containing results
+        self.tag_counter = result.found_list
+        self._document_maps = state.document_maps
+        self._resultdata = result.as_dict()
+        if result.annotated_doc is None:
+            self._resultdata['annotated_doc'] = ''
+        return result.scores
+
+    def _score(self, doc, tagged, state, annotations, keep_doc, tagged_tokens=None):
+        """
+         Scans document doc, keeping per-document data in state (a DocumentState). Returns ScoreResult.
+         Untagged documents are scored from their tagged tokens ((word, tag) tuples), tagged here unless given.
+        """
         if not self.L.is_loaded:
             raise RuntimeError('Lexicon has not been assigned, or not loaded')
 
-        config = self.config
+        # POS-taging, tag detection and parsing - detectors and scan read the parsed document
+        (tagged_doc, document) = self._parse(doc, tagged, tagged_tokens)
+        return self._score_parsed(doc, tagged_doc, document, state, annotations, keep_doc)
 
-        # POS-taging and tag detection
-        if not tagged:
-            tagged_doc = self.pos_tag(doc)
+    def _score_parsed(self, doc, tagged_doc, document, state, annotations=False, keep_doc=False, map_cache=None):
+        """
+         Scores document parsed by _parse(), keeping per-document data in state. Returns ScoreResult.
+         Detector maps are shared through map_cache, if given (see _run_detectors).
+        """
+        plan = self.plan
+        config = plan.config
+        tagsep = document.separator
+        state.debug('[classify_document] - tag separator is %s' % tagsep)
+
+        # Negation detection pre-processing - return an array w/ position of negated terms
+        state.document_maps = self._run_detectors(document, config, map_cache)
+        vNEG = state.document_maps['NEGATION']
+
+        records = TokenRecords(tagged_doc, tagsep, annotations, vNEG if (annotations and config.negation) else None)
+        if plan.engine == 'numpy':
+            (postotal, negtotal, foundcounter) = vecscore.scan(self, document, plan, state, records)
         else:
-            tagged_doc = doc
+            (postotal, negtotal, foundcounter) = self._scan(document, plan, state, records)
 
-        tagsep = self._detect_tag(tagged_doc)
-        if not tagsep:
-            raise RuntimeError('Unable to detect tag separator in {}'.format(' '.join(doc[:100])))
+        # Completed scan - execute final score adjustments
+        (resultpos, resultneg) = self._doc_score_adjust(postotal, negtotal, config, state)
+
+        # found list is rendered from records unless the scan already counted found tokens
+        result = ScoreResult(records,
+                             doc=(doc if keep_doc else None),
+                             resultpos=resultpos,
+                             resultneg=resultneg,
+                             tokens_found=foundcounter,
+                             tokens_negated=sum(vNEG),
+                             found_list=(state.tag_counter or None))
+
+        if state.verbose:
+            state.debug('Result data: %s' % str(result.as_dict()))
+        return result
+
+    def score_prepared(self, prepared, annotations=False, verbose=False):
+        """
+         Scores a document preprocessed by docprep.PreparedDocument with current parameters. Only the parameter
+         dependent stages of scoring are run; results are the same as score_document() on the original document.
 
-        # ready to start - reset runtime vars
-        self._reset_runtime_vars()
-        self._debug('[classify_document] - tag separator is %s' % tagsep)
-        tags = tagged_doc.split()
-        annotatedTags = []
-        doclen = len(tags)
-        i = 0
+         Returns: ScoreResult
+        """
+        if set(self._detector_map) != set(['NEGATION']):
+            raise RuntimeError('Prepared documents support negation detection only.')
+
+        plan = self.plan
+        config = plan.config
+        state = DocumentState(verbose=verbose)
+        state.document_maps = {'NEGATION': prepared.negation(config.negation_window)}
+        vNEG = state.document_maps['NEGATION']
+        document = prepared.document
+        records = TokenRecords(prepared.tagged_doc, document.separator, annotations,
+                               vNEG if (annotations and config.negation) else None)
+
+        enabled = {'a': config.a, 'v': config.v, 'r': config.r, 'n': config.n}
+        adjust = {'a': config.a_adjust, 'v': config.v_adjust}
+        freqs = prepared.freq_factors(self.L, plan.freq_weight) if plan.score_freq else None
+        doclen = len(document)
+        tag_counter = state.tag_counter
         postotal = 0.0
         negtotal = 0.0
         foundcounter = 0
-        negcount = 0
-        self.tag_counter = collections.Counter()
-        tagUnscored = []
+        for (k, thisword) in enumerate(prepared.words):
+            i = k + 1
+            if thisword is None:
+                records.skipped.append(i)
+                continue  # discard corrupt data
 
-        # Negation detection pre-processing - return an array w/ position of negated terms
-        self._run_detectors(tags)
-        vNEG = self._document_maps['NEGATION']
+            # same branch order as _token_scores(): the last enabled category wins
+            scoretuple = None
+            for (category, lookup) in zip(prepared.categories[k], prepared.lookups[k]):
+                if enabled[category]:
+                    scoretuple = [adjust[category] * x for x in lookup] if category in adjust else lookup
+            if scoretuple is None:
+                continue
+
+            tagword = document.token(k)
+            tag_counter.update([tagword])
+            (posval, negval) = self._get_word_contribution(thisword, tagword, scoretuple, i, doclen, plan, state,
+                                                           freqs[k] if freqs else None)
+            postotal += posval
+            negtotal += negval
+            if scoretuple == (0, 0):
+                records.unscored.append(i)
+            foundcounter += 1
+            records.add_found(i, posval, negval)
+
+        (resultpos, resultneg) = self._doc_score_adjust(postotal, negtotal, config, state)
+        return ScoreResult(records,
+                           resultpos=resultpos,
+                           resultneg=resultneg,
+                           tokens_found=foundcounter,
+                           tokens_negated=sum(vNEG),
+                           found_list=(tag_counter or None))
+
+    def stream(self, doclen=None, tagsep=None, verbose=False, keep_unscored=False):
+        """
+         Returns a streaming.DocumentStream, scoring a document fed in chunks of tagged tokens with current parameters.
+         doclen (document length in tokens) is required when a position weight function is set; unscored tokens are
+         only listed in the result (unscored_list) with keep_unscored.
+        """
+        from .streaming import DocumentStream
+        return DocumentStream(self, doclen, tagsep, verbose, keep_unscored)
 
-        # Scan for scores for each POS
-        # After POS-tagging a term will appear as either term/POS or term_POS
-        # We assume such weirdnesses will not naturally occur on plain text.
-        for tagword in tags:
-            i += 1
-            scoretuple = (0, 0)
-            tagfound = False
-            # retrieves tuple (word, POS tag) from current word+tag string
-            (thisword, thistag) = nltk.tag.str2tuple(tagword, sep=tagsep)
-            if (not thistag) or (not thisword):
-                continue  # discard corrupt data
-            thisword = thisword.lower()
+    def _token_scores(self, tagword, tagsep, config):
+        """
+         Looks up tagged token tagword (eg. good/JJ) in lexicon, for parts of speech enabled in config.
+         Returns tuple (word, scoretuple): word is None for corrupt tokens, scoretuple is None for tokens not
+         in scanned parts of speech.
+        """
+        # retrieves tuple (word, POS tag) from current word+tag string
+        (thisword, thistag) = nltk.tag.str2tuple(tagword, sep=tagsep)
+        return self._word_scores(thisword, thistag, config)
+
+    def _word_scores(self, thisword, thistag, config):
+        """
+         Looks up word thisword with (uppercase) POS tag thistag in lexicon. Returns tuple (word, scoretuple),
+         see _token_scores().
+        """
+        scoretuple = None
+        if (not thistag) or (not thisword):
+            return (None, None)
+        thisword = thisword.lower()
+        tagcategories = tag_categories(thistag)
 
-            # Adjectives
-            if config.a and re.search('(JJ|JJ.)$', thistag):
-                tagfound = True
-                scoretuple = [config.a_adjust * x for x in self.L.getadjective(thisword)]
+        # Adjectives
+        if config.a and 'a' in tagcategories:
+            scoretuple = [config.a_adjust * x for x in self.L.getadjective(thisword)]
 
-            # Verbs (VBP / VBD/ etc...)
-            if config.v and re.search('(VB|VB.)$', thistag):
-                tagfound = True
-                thislemma = self._lemmatize_verb(thisword)
-                scoretuple = [config.v_adjust * x for x in self.L.getverb(thislemma)]
+        # Verbs (VBP / VBD/ etc...)
+        if config.v and 'v' in tagcategories:
+            thislemma = self._lemmatize_verb(thisword)
+            scoretuple = [config.v_adjust * x for x in self.L.getverb(thislemma)]
 
-            # Adverbs
-            if config.r and re.search('RB$', thistag):
-                tagfound = True
-                scoretuple = self.L.getadverb(thisword)
+        # Adverbs
+        if config.r and 'r' in tagcategories:
+            scoretuple = self.L.getadverb(thisword)
 
-            # Nouns
-            if config.n and re.search('NN$', thistag):
-                tagfound = True
-                scoretuple = self.L.getnoun(thisword)
+        # Nouns
+        if config.n and 'n' in tagcategories:
+            scoretuple = self.L.getnoun(thisword)
+
+        return (thisword, scoretuple)
+
+    def _scan(self, document, plan, state, records):
+        """
+         Scans parsed document (a tagging.TaggedDocument) for scores, per scoring plan, adding per-token data to
+         records (a TokenRecords). Detector maps must already be in state. Returns tuple (postotal, negtotal, foundcounter).
+        """
+        config = plan.config
+        words = document.words
+        tags = document.tags
+        doclen = len(document)
+        postotal = 0.0
+        negtotal = 0.0
+        foundcounter = 0
+        negcount = 0
+        tag_counter = state.tag_counter
+        vNEG = state.document_maps['NEGATION']
+
+        # Scan for scores for each POS
+        # After POS-tagging a term will appear as either term/POS or term_POS
+        # We assume such weirdnesses will not naturally occur on plain text.
+        for i in range(1, doclen + 1):
+            (thisword, scoretuple) = self._word_scores(words[i - 1], tags[i - 1], config)
+            if thisword is None:
+                records.skipped.append(i)
+                continue  # discard corrupt data
 
             #
             # Add this word contribution to total
             #
-            if tagfound:
-                self.tag_counter.update([tagword])
-                (posval, negval) = self._get_word_contribution(thisword, tagword, scoretuple, i, doclen, config)
+            if scoretuple is not None:
+                tagword = document.token(i - 1)
+                tag_counter.update([tagword])
+                (posval, negval) = self._get_word_contribution(thisword, tagword, scoretuple, i, doclen, plan, state)
                 postotal += posval
                 negtotal += negval
-                self._debug('Running total (pos,neg): %2.2f, %2.2f' % (postotal, negtotal))
+                state.debug('Running total (pos,neg): %2.2f, %2.2f' % (postotal, negtotal))
 
                 if scoretuple == (0, 0):
-                    tagUnscored.append(tagword)
+                    records.unscored.append(i)
                 foundcounter += 1
                 if config.negation and vNEG[i - 1] == 1:
                     negcount += 1
-                if config.negation:
-                    negtag = str(vNEG[i - 1])
-                else:
-                    negtag = 'NONEG'
-
-                if annotations:
-                    annotatedTags.append(tagword + '##NEGAT:' + negtag +
-                                         '##POS:' + str(posval) + '##NEG:' + str(negval))
-            else:
-                if annotations:
-                    annotatedTags.append(tagword)
+                records.add_found(i, posval, negval)
 
-        # Completed scan - execute final score adjustments
-        (resultpos, resultneg) = self._doc_score_adjust(postotal, negtotal, config)
+        return (postotal, negtotal, foundcounter)
 
-        # updates class data structures containing results
-        self._resultdata = {
-            'annotated_doc': ' '.join(annotatedTags),
-            'doc': doc,
-            'resultpos': resultpos,
-            'resultneg': resultneg,
-            'tokens_found': foundcounter,
-            'tokens_negated': sum(vNEG),
-            'found_list': self.tag_counter,
-            'unscored_list': tagUnscored
-        }
-
-        self._debug('Result data: %s' % str(self._resultdata))
-        return (resultpos, resultneg)
+    def classify_documents(self, docs, n_jobs=1, chunksize=1, tagged=True, ordered=True, lexicon_factory=None, **kwargs):
+        """
+         Classifies documents from an iterable, returning a generator of (pos_score, neg_score) tuples in input order.
+
+         Parameters
+         ----------
+         docs : iterable
+            Input documents (str).
+         n_jobs : int
+            number of worker processes. 1 classifies in this process; None or -1 uses one process per CPU.
+         chunksize : int
+            documents sent to a worker at a time.
+         tagged : bool
+            boolean indicating documents are already POS-tagged.
+         ordered : bool
+            if False, (index, (pos_score, neg_score)) tuples are yielded as soon as results are available.
+         lexicon_factory : callable
+            optional, called once in each worker to build its lexicon (eg. sentlex.SWN3Lexicon) instead of
+            sending a copy of this classifier's lexicon to every worker. See also sharedlex.publish().
+         **kwargs : dict
+            optional keyword arguments to configure the classifier.
+        """
+        self.set_parameters(**kwargs)
+        if lexicon_factory is None and not (self.L and self.L.is_loaded):
+            raise RuntimeError('Lexicon has not been assigned, or not loaded')
+
+        if n_jobs != 1:
+            return parallel.classify_documents(self, docs, n_jobs, chunksize, tagged, ordered, lexicon_factory)
+
+        if lexicon_factory is not None and self.L is None:
+            self.set_lexicon(lexicon_factory())
+
+        def results():
+            # raw documents are tagged in batches
+            batch_size = 1 if tagged else tagging.DEFAULT_BATCH_SIZE
+            scored = (result for batch in tagging.batches(docs, batch_size)
+                      for result in self.score_documents(batch, tagged=tagged))
+            for (index, result) in enumerate(scored):
+                yield result.scores if ordered else (index, result.scores)
+
+        return results()
 
     def set_parameters(self, **kwargs):
         """
@@ -431,24 +920,29 @@ class BasicDocSentiScore(DocSentiScore):
           a,n,v,r: POS tags to enable
           negation: True/False for negation detection
           negation_window: tokens to consider in negated window
-          score_function: score adjustment function (looks for self._score_<score_function>)
+          score_function: score adjustment function (looks for self._score_<score_function>), or position weights
+                          (a weights.PositionWeight, or name of built-in weights)
           score_mode: score each word once/always
           score_freq: frequency adjust word scores
           score_stop: discard stop words
+          engine: scan implementation, 'python' (default) or 'numpy' (see vecscore module)
         """
         # calls superclass set_parameters
         if 'L' in kwargs:
             self.set_lexicon(kwargs['L'])
 
         # update all known parameters
-        self._config.update({k: kwargs[k] for k in kwargs if k in self._config})
+        updates = {k: kwargs[k] for k in kwargs if k in self._config}
+        if updates:
+            self._config.update(updates)
+            self._config_changed()
 
         # Implicitly update negation
         if any([k in kwargs for k in ['negation_window', 'atenuation']]):
             self.negation = True
 
         if 'score_function' in kwargs:
-            self.score_function = getattr(self, '_score_' + kwargs['score_function'])
+            self.score_function = self._resolve_score_function(kwargs['score_function']) or self._score_noop
 
     #
     # score weight adjustment functions
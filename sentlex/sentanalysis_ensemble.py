@@ -0,0 +1,98 @@
+'''
+
+   Lexicon-Based Sentiment Analysis Library
+
+   sentanalysis_ensemble.py - implements ensembles of classifiers over several lexicons and configurations,
+   scoring a document in a single pass of preprocessing
+
+'''
+from __future__ import absolute_import
+from . import caching
+from . import tagging
+from .docscoreutil import majorityVote
+from .sentanalysis import BasicDocSentiScore, DocumentState
+
+
+class EnsembleDocSentiScore(object):
+    '''
+     Ensemble of classifiers (members) whose scores are combined by a voting function
+     (see docscoreutil.majorityVote, sumVote, maxVote).
+
+     A document is POS-tagged and parsed once, and detector maps (negation) are computed once per window size.
+     Each member then scans the shared parsed document with its own lexicon and parameters.
+
+     Members are classifiers (eg. PottsDocSentiScore instances), or (lexicon, parameters) tuples built as
+     BasicDocSentiScore classifiers sharing one verb lemma cache:
+
+        ensemble = EnsembleDocSentiScore([(moby, {'a': True, 'v': False}),
+                                          (uic, {'a': True, 'v': True, 'negation_window': 3})])
+        (posflag, negflag, posscore, negscore) = ensemble.classify_document(doc)
+    '''
+
+    def __init__(self, members, vote=majorityVote, shift=0.0, threshold=0.0, lemma_cache=None):
+        assert members, 'Ensemble requires at least one member'
+        self.lemma_cache = lemma_cache if lemma_cache is not None else caching.LemmaCache()
+        self.members = [self._member(member) for member in members]
+        self.vote = vote
+        self.shift = shift
+        self.threshold = threshold
+
+    def _member(self, member):
+        if isinstance(member, BasicDocSentiScore):
+            return member
+        (L, parameters) = member
+        classifier = BasicDocSentiScore(lemma_cache=self.lemma_cache)
+        classifier.set_parameters(L=L, **parameters)
+        return classifier
+
+    def score_document(self, doc, tagged=True, annotations=False, keep_doc=False, verbose=False, tagged_tokens=None):
+        '''
+         Scores input document (see BasicDocSentiScore.score_document) with every member.
+         Raw documents (tagged=False) are tagged with the tag cache of the first member, unless their tagged_tokens
+         are given.
+
+         Returns: list of ScoreResult, by member
+        '''
+        return self._score(doc, tagged, annotations, keep_doc, verbose, tagged_tokens)
+
+    def score_documents(self, docs, tagged=True, annotations=False, keep_doc=False, verbose=False):
+        '''
+         Scores a list of documents with every member. Untagged documents are POS-tagged in one batch.
+
+         Returns: list of member results (see score_document), by document
+        '''
+        if tagged:
+            return [self._score(doc, True, annotations, keep_doc, verbose) for doc in docs]
+        return [self._score(doc, False, annotations, keep_doc, verbose, tagged_tokens)
+                for (doc, tagged_tokens) in zip(docs, self.members[0].tag_documents(docs))]
+
+    def _score(self, doc, tagged, annotations, keep_doc, verbose, tagged_tokens=None):
+        for member in self.members:
+            if not (member.L and member.L.is_loaded):
+                raise RuntimeError('Lexicon has not been assigned, or not loaded')
+
+        (tagged_doc, document) = self.members[0]._parse(doc, tagged, tagged_tokens)
+        map_cache = {}
+        return [member._score_parsed(doc, tagged_doc, document, DocumentState(verbose=verbose), annotations, keep_doc,
+                                     map_cache)
+                for member in self.members]
+
+    def classify_document(self, doc, tagged=True):
+        '''
+         Classifies input document by voting over member scores.
+
+         Returns: (posflag, negflag, posscore, negscore), as returned by the voting function.
+        '''
+        return self._vote(self.score_document(doc, tagged))
+
+    def classify_documents(self, docs, tagged=True):
+        '''
+         Classifies documents from an iterable, returning a generator of voting results in input order.
+        '''
+        batch_size = 1 if tagged else tagging.DEFAULT_BATCH_SIZE
+        for batch in tagging.batches(docs, batch_size):
+            for results in self.score_documents(batch, tagged):
+                yield self._vote(results)
+
+    def _vote(self, results):
+        return self.vote([result.scores for result in results], self.shift, self.threshold)
@@ -7,8 +7,8 @@
 
 '''
 from __future__ import absolute_import
-from .sentanalysis import BasicDocSentiScore
-from six.moves import range
+from . import negdetect
+from .sentanalysis import BasicDocSentiScore, DocumentState
 
 
 class PottsDocSentiScore(BasicDocSentiScore):
@@ -24,24 +24,25 @@ class PottsDocSentiScore(BasicDocSentiScore):
         ddict.update({'negation_adjustment': 0.1})
         return ddict
 
-    def _doc_score_adjust(self, posval, negval, config=None):
+    def _doc_score_adjust(self, posval, negval, config=None, state=None):
         '''
          Implements negated term additions based on adjustment weight
         '''
         config = config or self.config
-        (postmp, negtmp) = super(PottsDocSentiScore, self)._doc_score_adjust(posval, negval)
-        vNEG = self._document_maps['NEGATION']
+        if state is None:
+            state = DocumentState(self.tag_counter, self._document_maps, self.verbose)
+        (postmp, negtmp) = super(PottsDocSentiScore, self)._doc_score_adjust(posval, negval, config, state)
+        vNEG = state.document_maps['NEGATION']
         if config.negation:
             # at this point we should have vNEG populated by the scoring algorithm
             if len(vNEG) >= 3:
-                negated_instances = len(
-                    [vNEG[i:i + 2] for i in range(len(vNEG) - 1) if vNEG[i:i + 2] == [0, 1]])
+                negated_instances = negdetect.negated_instances(vNEG)
             else:
                 negated_instances = 0
             # with the total of negated instances we can compute the adjustment
             # each negating term counts "negated_term_adj" in scoring weight
             negtmp = negtmp + (config.negation_adjustment * negated_instances)
-            self._debug('[PottsDocSentiScore] - Instances Found: %d. Negative score now adjusted from %2.2f to %2.2f' %
+            state.debug('[PottsDocSentiScore] - Instances Found: %d. Negative score now adjusted from %2.2f to %2.2f' %
                         (negated_instances, negval, negtmp))
         return (postmp, negtmp)
 
@@ -16,8 +16,39 @@ TODO:
 from __future__ import absolute_import
 from __future__ import print_function
 import os
+import math
+import functools
 import nltk
+from six.moves import cPickle as pickle
 from . import sentlexutil
+from . import lexcache
+from . import termtable
+from . import verbforms
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# probability assigned to words missing from the frequency list
+UNKNOWN_FREQ = 0.0005
+
+# SUBTLEXus word frequency data
+FREQUENCY_DATAFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'SUBTLEXus.txt')
+
+# in-memory SUBTLEXus dictionaries by data file, shared by all lexicons of the process
+_FREQUENCY_DICTS = {}
+
+
+def freq_factor(p, freq_weight=1.0):
+    '''
+      Frequency adjustment multiplier for a word of probability p, given by its self-information I = -log2(p),
+      weight-adjusted by freq_weight: (1 - freq_weight) + (freq_weight * I). Unknown words (p = 0) get a mid-range value.
+    '''
+    if p == 0.0:
+        p = UNKNOWN_FREQ
+    info = -1 * math.log(p, 2)
+    return (1 - freq_weight) + (info * (freq_weight))
 
 
 #
@@ -32,6 +63,12 @@ class Lexicon(object):
 
      Where tuple values are (sense_id, positive, negative), extracted from a knowledge source for that particular word/POS
     '''
+    # (pos, checker, getter) for each part of speech
+    _POS_FUNCS = (('a', 'hasadjective', 'getadjective'), ('v', 'hasverb', 'getverb'),
+                  ('r', 'hasadverb', 'getadverb'), ('n', 'hasnoun', 'getnoun'))
+
+    # frequency table storage used by compile_frequency(), see there
+    shared_frequency = False
 
     def __init__(self):
         # Initialize class vars
@@ -41,6 +78,9 @@ class Lexicon(object):
         self.N = {}
         self.LexName = 'Superclass'
         self.LexFreq = None
+        self.verb_forms = None
+        self._cache_dir = None
+        self._freq_factors = {}
         self._is_loaded = False
         self._is_compiled = False
         #  Baseline words used to QA a lexicon
@@ -119,6 +159,18 @@ class Lexicon(object):
 
         return infod
 
+    def _posdict(self, pos):
+        '''
+          Returns dictionary of terms for "pos" part of speech ('a','v','n','r')
+        '''
+        return {'a': self.A, 'v': self.V, 'r': self.R, 'n': self.N}[pos]
+
+    def _terms(self, pos):
+        '''
+          Returns iterable of all terms known to this lexicon for "pos" part of speech ('a','v','n','r')
+        '''
+        return self._posdict(pos).keys()
+
     def hasnoun(self, term):
         '''
           Returns True/False to query whether term is present in dict
@@ -224,34 +276,26 @@ class Lexicon(object):
         else:
             return ((foundpos / (foundpos + foundneg)) * (posval / max(items, 1)), (foundneg / (foundpos + foundneg)) * (negval / max(items, 1)))
 
-    def compile_frequency(self):
+    def compile_frequency(self, shared=None):
         '''
           Pre load frequency table data for using with get_freq() calls.
           Frequency data comes from the SUBTLEXus study, available from:
           http://expsy.ugent.be/subtlexus/
-        '''
-        # load frequency list
-        curpath = os.path.dirname(os.path.abspath(__file__))
-        datapath = os.path.join(curpath, 'data/SUBTLEXus.txt')
-        # build frequency table, ignoring upercase/lowercase differences
-        f = open(datapath, 'r')
-        self.LexFreq = {}
-        # first we read raw counts, then estimate prob. of ocurrences
-        for line in f.readlines():
-            rec = line.split('\t')
-            word = rec[0]
-            wordfreq = rec[1]
-            if word and wordfreq.isdigit():
-                if word in self.LexFreq:
-                    self.LexFreq[word] += float(wordfreq)
-                else:
-                    self.LexFreq[word] = float(wordfreq)
 
-        f.close()
-        # estimate probabilities
-        CORPUS_SIZE = 51000000.0
-        for w in self.LexFreq:
-            self.LexFreq[w] = self.LexFreq[w] / CORPUS_SIZE
+          By default the table is an in-memory dictionary, read once per process and shared by all its lexicons.
+          With shared=True (or the shared_frequency attribute set, eg. Lexicon.shared_frequency = True for all
+          lexicons) it is instead a memory-mapped index shared by all processes on the host (see termtable module),
+          which saves one copy of the table per process at the cost of much slower lookups: each get_freq() call
+          becomes a binary search, roughly 100x slower than a dictionary. Falls back to the dictionary if the index
+          cannot be built.
+        '''
+        if shared is None:
+            shared = self.shared_frequency
+        self.LexFreq = termtable.shared_frequency_table(FREQUENCY_DATAFILE) if shared else None
+        if self.LexFreq is None:
+            if FREQUENCY_DATAFILE not in _FREQUENCY_DICTS:
+                _FREQUENCY_DICTS[FREQUENCY_DATAFILE] = sentlexutil.readSUBTLEX(FREQUENCY_DATAFILE)
+            self.LexFreq = _FREQUENCY_DICTS[FREQUENCY_DATAFILE]
 
         self._is_compiled = True
 
@@ -261,10 +305,106 @@ class Lexicon(object):
           Word frequency is given by count(w)/corpus size
         '''
         assert self.LexFreq and self.is_compiled, "Please initialize frequency distributions with compile_frequency()"
-        if term in self.LexFreq:
-            return self.LexFreq[term]
-        else:
-            return 0.0
+        return self.LexFreq.get(term, 0.0)
+
+    def get_freq_factor(self, term, freq_weight=1.0):
+        '''
+          Returns frequency adjustment multiplier of term for freq_weight (see freq_factor).
+          Multipliers are computed once per term and freq_weight, and kept with the lexicon.
+        '''
+        factors = self._freq_factors.get(freq_weight)
+        if factors is None:
+            # unknown words share one multiplier, kept under key None
+            factors = self._freq_factors.setdefault(freq_weight, {None: freq_factor(0.0, freq_weight)})
+        factor = factors.get(term)
+        if factor is None:
+            p = self.get_freq(term)
+            if p == 0.0:
+                return factors[None]
+            factor = factors[term] = freq_factor(p, freq_weight)
+        return factor
+
+    def compile_verb_forms(self, cache_dir=None):
+        '''
+          Builds table mapping inflected surface forms of all verbs in this lexicon to their canonical form
+          (walks, walked, walking -> walk). Classifiers use this table to resolve inflected verbs before
+          falling back to WordNet lemmatization.
+
+          Entries are checked against WordNet, so the table never changes lemmatization results. Without WordNet
+          installed, only forms certain to lemmatize to themselves are included (see verbforms module).
+
+          If cache_dir is given (or the lexicon was loaded with one, or SENTLEX_CACHE_DIR is set), the table is saved
+          to an artifact in that directory, keyed by the lexicon verbs and installed WordNet data, and later calls
+          load it from there without loading WordNet.
+        '''
+        lemmas = self._terms('v')
+        cache_dir = lexcache.get_cache_dir(cache_dir or self._cache_dir)
+        version = verbforms.wordnet_version() if cache_dir else None
+        if version:
+            fp = verbforms.table_fingerprint(lemmas, version)
+            artifact = lexcache.artifact_path(cache_dir, self.LexName + '-verbforms', fp)
+            payload = lexcache.load_artifact(artifact, fp)
+            if payload:
+                self.verb_forms = payload['verb_forms']
+                return self.verb_forms
+
+        exceptions = verbforms.wordnet_verb_exceptions()
+        lemmatize = None
+        if exceptions is not None:
+            lemmatize = functools.partial(nltk.stem.WordNetLemmatizer().lemmatize, pos='v')
+        self.verb_forms = verbforms.build_inflection_table(lemmas, exceptions, lemmatize)
+
+        if version and lemmatize is not None:
+            try:
+                lexcache.save_artifact(artifact, {'verb_forms': self.verb_forms}, fp)
+            except (IOError, OSError):
+                # caching is best effort, as for lexicon artifacts
+                pass
+        return self.verb_forms
+
+    def get_many(self, terms, pos):
+        '''
+          Batch lookup of a sequence of terms on "pos" part of speech ('a','v','n','r'). Requires numpy.
+          Each distinct term is looked up once, and results scattered back to input order.
+
+          Returns tuple of numpy arrays (pos, neg, found), where found is a boolean mask of terms present in the lexicon.
+          Scores for terms not found are 0.0.
+        '''
+        if np is None:
+            raise ImportError('Batch lookups require numpy.')
+
+        (f_checker, f_getter) = [(c, g) for (p, c, g) in self._POS_FUNCS if p == pos][0]
+        f_checker = getattr(self, f_checker)
+        f_getter = getattr(self, f_getter)
+
+        # map each term to an index into the list of distinct terms
+        uniq = {}
+        inverse = np.fromiter([uniq.setdefault(term, len(uniq)) for term in terms], dtype=np.intp)
+
+        upos = np.zeros(len(uniq))
+        uneg = np.zeros(len(uniq))
+        ufound = np.zeros(len(uniq), dtype=bool)
+        for (term, j) in uniq.items():
+            if f_checker(term):
+                ufound[j] = True
+                (upos[j], uneg[j]) = f_getter(term)
+
+        return (upos[inverse], uneg[inverse], ufound[inverse])
+
+    def getadjective_many(self, terms):
+        '''
+          Batch version of getadjective(). Returns numpy arrays (pos, neg, found), see get_many().
+        '''
+        return self.get_many(terms, 'a')
+
+    def getverb_many(self, terms):
+        return self.get_many(terms, 'v')
+
+    def getadverb_many(self, terms):
+        return self.get_many(terms, 'r')
+
+    def getnoun_many(self, terms):
+        return self.get_many(terms, 'n')
 
     def printstdterms(self):
         '''
@@ -291,49 +431,153 @@ class ResourceLexicon(Lexicon):
 
      The loader functions take the form: 
 
-          f(pos, datafile)
+          f(datafile)
 
-     And return a dict mapping words to tuples of (pos,neg) pairs:
+     And return, for each part of speech ('a', 'v', 'r', 'n'), a dict mapping words to tuples of (pos,neg) pairs:
 
-          D[word] = [ (word, p,n), (word, p,n) ... ]
+          D['a'][word] = [ (word, p,n), (word, p,n) ... ]
 
      Representing all known (p,n) values for word in the given part of speech.
      Note that it is common for a word to map to more than a single sense, thus multiple data points are allowed.
+     All parts of speech are filled in a single pass over the data file. Loaders following this protocol are
+     flagged with the sentlexutil.multi_pos_reader decorator.
+
+     Legacy per-POS loaders taking the form f(pos, datafile) are still accepted, and are called once for each part of speech.
 
      Sample loader functions for various knowledge resources can be found in the sentlexutil module.
+
+     In compiled mode (compiled=True) the (pos, neg) result of getbestvalues() is computed once per term at load time,
+     and getadjective()/getverb()/getadverb()/getnoun() become a single table lookup. Raw sense lists remain available
+     via get_senses().
     '''
 
-    def __init__(self, name=None, loader=None):
+    def __init__(self, name=None, loader=None, compiled=False):
         super(ResourceLexicon, self).__init__()
         if name:
             self.LexName = name
         if loader:
             self.f_loader = loader
+        self.compiled = compiled
+        self._scores = None
 
-    def load(self, datafile):
+    def load(self, datafile, cache_dir=None, terms=None):
         '''
-           Loads lexicon from file into dictionaries
+           Loads lexicon from file into dictionaries. Data files may be gzip, bz2 or xz compressed.
+
+           If cache_dir is given (or set via the SENTLEX_CACHE_DIR environment variable), parsed data and the
+           frequency table are saved to a binary artifact in that directory, and loaded from it on subsequent calls.
+           The artifact is rebuilt whenever the data file, frequency data file or loader function change.
+
+           terms is an optional collection of terms to load (a whitelist) - other terms in the data file are skipped.
         '''
         assert self.f_loader, 'This lexicon does not have an associated loader function.'
 
-        self.A = self.f_loader('a', datafile)
-        self.V = self.f_loader('v', datafile)
-        self.R = self.f_loader('r', datafile)
-        self.N = self.f_loader('n', datafile)
+        if terms is not None:
+            terms = frozenset(terms)
+
+        cache_dir = self._cache_dir = lexcache.get_cache_dir(cache_dir)
+        if cache_dir:
+            extra = ['frequency:' + lexcache.file_digest(FREQUENCY_DATAFILE)]
+            if terms is not None:
+                extra.extend(sorted(terms))
+            fp = lexcache.fingerprint(datafile, self.f_loader, '\n'.join(extra))
+            artifact = lexcache.artifact_path(cache_dir, self.LexName, fp)
+            payload = lexcache.load_artifact(artifact, fp)
+            if payload:
+                self._restore_payload(payload)
+                return True
+
+        f_loader = sentlexutil.as_multi_pos(self.f_loader)
+        if terms is not None:
+            D = f_loader(datafile, terms=terms)
+        else:
+            D = f_loader(datafile)
+        self.A = D['a']
+        self.V = D['v']
+        self.R = D['r']
+        self.N = D['n']
+        self.compile_frequency()
+        self._is_loaded = True
+        if self.compiled:
+            self.compile_scores()
+
+        if cache_dir:
+            try:
+                lexcache.save_artifact(artifact, self._artifact_payload(), fp)
+            except (IOError, OSError):
+                # caching is best effort - an unwritable cache directory should not prevent loading
+                pass
+        return True
+
+    def _artifact_payload(self):
+        # the frequency dictionary is pickled on its own, so that loading an artifact only decodes it if the process
+        # has not read it yet. Memory-mapped tables (shared_frequency) are not copied into the artifact.
+        freq = None
+        if isinstance(self.LexFreq, dict):
+            freq = pickle.dumps(self.LexFreq, pickle.HIGHEST_PROTOCOL)
+        return {'name': self.LexName, 'A': self.A, 'V': self.V, 'R': self.R, 'N': self.N, 'LexFreq': freq}
+
+    def _restore_payload(self, payload):
+        self.A = payload['A']
+        self.V = payload['V']
+        self.R = payload['R']
+        self.N = payload['N']
+        freq = payload.get('LexFreq')
+        if freq is not None and not self.shared_frequency and FREQUENCY_DATAFILE not in _FREQUENCY_DICTS:
+            _FREQUENCY_DICTS[FREQUENCY_DATAFILE] = pickle.loads(freq)
         self.compile_frequency()
         self._is_loaded = True
+        if self.compiled:
+            self.compile_scores()
+
+    def save_artifact(self, path):
+        '''
+           Saves parsed lexicon data to a binary artifact at path, to be read back with load_artifact().
+        '''
+        assert self.is_loaded, 'Lexicon must be loaded before saving.'
+        lexcache.save_artifact(path, self._artifact_payload())
+
+    def load_artifact(self, path):
+        '''
+           Loads lexicon from a binary artifact created with save_artifact().
+        '''
+        payload = lexcache.load_artifact(path)
+        if not payload:
+            raise RuntimeError('Unable to load lexicon artifact from %s' % path)
+        self._restore_payload(payload)
         return True
 
+    def compile_scores(self):
+        '''
+          Precomputes (pos,neg) scores for every term and part of speech, switching lookups to compiled mode.
+        '''
+        self._scores = {}
+        for pos in sentlexutil.POS_TAGS:
+            D = self._posdict(pos)
+            self._scores[pos] = dict((term, self.getbestvalues(term, D)) for term in D)
+        self.compiled = True
+
+    def get_senses(self, term, pos):
+        '''
+          Returns raw list of sense tuples (id, pos, neg) for term on "pos" part of speech ('a','v','n','r'),
+          or an empty list if not found.
+        '''
+        return self._posdict(pos).get(term, [])
+
     def getadjective(self, term):
         '''
           Returns tuple (pos,neg) for sentiment scores for adjective. (0,0) if not found.
         '''
+        if self._scores is not None:
+            return self._scores['a'].get(term, (0, 0))
         return self.getbestvalues(term, self.A)
 
     def getadverb(self, term):
         '''
           Returns tuple (pos,neg) for sentiment scores for adverb. (0,0) if not found.
         '''
+        if self._scores is not None:
+            return self._scores['r'].get(term, (0, 0))
         return self.getbestvalues(term, self.R)
 
     def getverb(self, term):
@@ -341,12 +585,16 @@ class ResourceLexicon(Lexicon):
           Returns tuple (pos,neg) for sentiment scores for verb. (0,0) if not found.
           Verb must be in canonical form.
         '''
+        if self._scores is not None:
+            return self._scores['v'].get(term, (0, 0))
         return self.getbestvalues(term, self.V)
 
     def getnoun(self, term):
         '''
           Returns tuple (pos,neg) for sentiment scores for noun. (0,0) if not found.
         '''
+        if self._scores is not None:
+            return self._scores['n'].get(term, (0, 0))
         return self.getbestvalues(term, self.N)
 
 
@@ -371,25 +619,33 @@ class CompositeLexicon(Lexicon):
 
       this ensures if iformation about a word exists in L1, it will be used first. 
       Lexicons should be added from most accurate to least accurate.
-    '''
 
-    def __init__(self):
+      In compiled mode (compiled=True or compile_index()), lexicons in the list are merged into a single
+      resolved table per part of speech, with factor and biases already applied, so each lookup is a single
+      dictionary access. The tables are rebuilt on next lookup after add_lexicon(), set_factor() or set_bias().
+      Changes made directly to member lexicons after compiling are not picked up until compile_index() is called.
+    '''
+    def __init__(self, compiled=False):
         super(CompositeLexicon, self).__init__()
         self.LexName = 'Composite'
         self.LLIST = []
         self.factor = 1.0
         self.pos_bias = 1.0
         self.neg_bias = 1.0
+        self.compiled = compiled
+        self._index = None
 
     def add_lexicon(self, L):
         self.LLIST.append(L)
         self.LexName += ' ' + L.get_name()
+        self._index = None
 
     def set_factor(self, newval):
         '''
          updates confidence factor used when looking for values over the lexicon list
         '''
         self.factor = newval
+        self._index = None
 
     def set_bias(self, pos, neg):
         '''
@@ -398,6 +654,32 @@ class CompositeLexicon(Lexicon):
         '''
         self.pos_bias = pos
         self.neg_bias = neg
+        self._index = None
+
+    def _terms(self, pos):
+        terms = set()
+        for L in self.LLIST:
+            terms.update(L._terms(pos))
+        return terms
+
+    def compile_index(self):
+        '''
+         Builds resolved (pos,neg) tables merging all lexicons in the list, and switches lookups to compiled mode.
+        '''
+        index = {}
+        for (pos, f_checker, f_getter) in self._POS_FUNCS:
+            index[pos] = dict((term, self._scan_lexlist_val(self.LLIST, term, f_checker, f_getter, (0, 0)))
+                              for term in self._terms(pos))
+        self._index = index
+        self.compiled = True
+
+    def _resolved(self, pos):
+        '''
+         Returns resolved table for "pos", compiling the index if out of date.
+        '''
+        if self._index is None:
+            self.compile_index()
+        return self._index[pos]
 
     def compile_frequency(self):
         for L in self.LLIST:
@@ -441,27 +723,43 @@ class CompositeLexicon(Lexicon):
         return False
 
     def getnoun(self, term):
+        if self.compiled:
+            return self._resolved('n').get(term, (0, 0))
         return self._scan_lexlist_val(self.LLIST, term, "hasnoun", "getnoun", (0, 0))
 
     def getverb(self, term):
+        if self.compiled:
+            return self._resolved('v').get(term, (0, 0))
         return self._scan_lexlist_val(self.LLIST, term, "hasverb", "getverb", (0, 0))
 
     def getadverb(self, term):
+        if self.compiled:
+            return self._resolved('r').get(term, (0, 0))
         return self._scan_lexlist_val(self.LLIST, term, "hasadverb", "getadverb", (0, 0))
 
     def getadjective(self, term):
+        if self.compiled:
+            return self._resolved('a').get(term, (0, 0))
         return self._scan_lexlist_val(self.LLIST, term, "hasadjective", "getadjective", (0, 0))
 
     def hasnoun(self, term):
+        if self.compiled:
+            return term in self._resolved('n')
         return self._scan_lexlist_presence(self.LLIST, term, "hasnoun")
 
     def hasverb(self, term):
+        if self.compiled:
+            return term in self._resolved('v')
         return self._scan_lexlist_presence(self.LLIST, term, "hasverb")
 
     def hasadverb(self, term):
+        if self.compiled:
+            return term in self._resolved('r')
         return self._scan_lexlist_presence(self.LLIST, term, "hasadverb")
 
     def hasadjective(self, term):
+        if self.compiled:
+            return term in self._resolved('a')
         return self._scan_lexlist_presence(self.LLIST, term, "hasadjective")
 
 ##
@@ -486,11 +784,11 @@ class MobyLexicon(ResourceLexicon):
       2011 IEEE Workshops of International Conference on. IEEE, 2011.
     '''
 
-    def __init__(self):
+    def __init__(self, cache_dir=None, compiled=False):
         curpath = os.path.dirname(os.path.abspath(__file__))
         datapath = os.path.join(curpath, 'data/GB1_S.lex')
-        super(MobyLexicon, self).__init__('Moby-GB', sentlexutil.readMoby)
-        self.load(datapath)
+        super(MobyLexicon, self).__init__('Moby-GB', sentlexutil.readMobyAll, compiled)
+        self.load(datapath, cache_dir)
 
 
 class SWN3Lexicon(ResourceLexicon):
@@ -504,11 +802,11 @@ class SWN3Lexicon(ResourceLexicon):
       See further details on file SentiWordNet_3.0.0.lex in the data directory.
     '''
 
-    def __init__(self):
+    def __init__(self, cache_dir=None, compiled=False):
         curpath = os.path.dirname(os.path.abspath(__file__))
         datapath = os.path.join(curpath, 'data/SentiWordNet_3.0.0.lex')
-        super(SWN3Lexicon, self).__init__('SWN3', sentlexutil.readSWN3)
-        self.load(datapath)
+        super(SWN3Lexicon, self).__init__('SWN3', sentlexutil.readSWN3All, compiled)
+        self.load(datapath, cache_dir)
 
 
 class UICLexicon(ResourceLexicon):
@@ -527,8 +825,8 @@ class UICLexicon(ResourceLexicon):
 
     '''
 
-    def __init__(self):
+    def __init__(self, cache_dir=None, compiled=False):
         curpath = os.path.dirname(os.path.abspath(__file__))
         datapath = os.path.join(curpath, 'data/uic.lex')
-        super(UICLexicon, self).__init__('UIC', sentlexutil.readUIC)
-        self.load(datapath)
+        super(UICLexicon, self).__init__('UIC', sentlexutil.readUICAll, compiled)
+        self.load(datapath, cache_dir)
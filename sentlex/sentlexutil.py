@@ -10,6 +10,9 @@ import re
 import os
 import sys
 
+# Parts of speech held by a lexicon, in the order they are loaded
+POS_TAGS = ('a', 'v', 'r', 'n')
+
 ##
 #
 # Reader Functions
@@ -17,6 +20,345 @@ import sys
 # - Note there are reader functions to other resources here - these are not shipped with the package.
 #   (you will have to source those yourself from the appropriate research teams)
 #
+# Readers come in two flavours:
+#
+#   - per-POS readers f(postag, datafile) return a single dictionary for the requested part of speech;
+#   - multi-POS readers f(datafile, terms=None) fill all dictionaries in one pass over the data file, returning
+#     a dictionary keyed by POS tag ('a', 'v', 'r', 'n'). These are flagged with @multi_pos_reader.
+#
+# Data files are opened with openResource(), which accepts gzip/bz2/xz compressed files.
+#
+# Per-POS readers are kept for backwards compatibility and are implemented on top of their multi-POS counterparts.
+#
+##
+
+
+def multi_pos_reader(f_reader):
+    '''
+      Decorator flagging f_reader as a single-pass multi-POS reader, taking the form f(datafile, terms=None).
+    '''
+    f_reader.multi_pos = True
+    return f_reader
+
+
+def per_pos_adapter(f_reader):
+    '''
+      Adapts a legacy per-POS reader f(postag, datafile) to the multi-POS protocol.
+      The data file is read once for each part of speech, as before.
+    '''
+    @multi_pos_reader
+    def f_adapter(datafile, terms=None):
+        D = dict((postag, f_reader(postag, datafile)) for postag in POS_TAGS)
+        if terms is not None:
+            for postag in D:
+                D[postag] = dict((k, v) for (k, v) in D[postag].items() if k in terms)
+        return D
+
+    f_adapter.__name__ = f_reader.__name__
+    f_adapter.__wrapped__ = f_reader
+    return f_adapter
+
+
+def as_multi_pos(f_reader):
+    '''
+      Returns f_reader if already a multi-POS reader, or wraps it with per_pos_adapter() otherwise.
+    '''
+    if getattr(f_reader, 'multi_pos', False):
+        return f_reader
+    return per_pos_adapter(f_reader)
+
+
+def _new_pos_dicts():
+    return dict((postag, {}) for postag in POS_TAGS)
+
+
+def _collect(records):
+    '''
+      Builds multi-POS dictionaries from an iterable of (postag, term, data) records.
+    '''
+    D = _new_pos_dicts()
+    for (postag, term, data) in records:
+        A = D[postag]
+        if term not in A:
+            A[term] = []
+        A[term].append(data)
+    return D
+
+
+# leading bytes identifying compressed files
+_MAGIC_GZIP = b'\x1f\x8b'
+_MAGIC_BZ2 = b'BZh'
+_MAGIC_XZ = b'\xfd7zXZ\x00'
+
+
+def openResource(datafile):
+    '''
+      Opens datafile for reading as text, transparently decompressing gzip, bz2 and xz files
+      (detected from file contents, regardless of file extension). Lines are read as a stream,
+      so memory use is bounded regardless of file size.
+    '''
+    with open(datafile, 'rb') as f:
+        magic = f.read(6)
+
+    if magic.startswith(_MAGIC_GZIP):
+        import gzip
+        return gzip.open(datafile, 'rt')
+    elif magic.startswith(_MAGIC_BZ2):
+        import bz2
+        return bz2.open(datafile, 'rt')
+    elif magic.startswith(_MAGIC_XZ):
+        import lzma
+        return lzma.open(datafile, 'rt')
+    return open(datafile, 'r')
+
+
+##
+# Record generators
+#
+# - Each generator streams a resource file, yielding (postag, term, data) records where data is the tuple stored
+#   in lexicon dictionaries. If terms (a set) is given, records for other terms are skipped.
+##
+
+
+def iterSWN(datafile, terms=None):
+    '''
+      Streams SWN database records (postag, term, (offset, posval, negval))
+    '''
+    with openResource(datafile) as SWNf:
+        # Loop through every line in SWN file
+        for line in SWNf:
+            # Tokenize line.
+            entry = line.split()
+            synset_type = entry[0]
+            if synset_type not in POS_TAGS:
+                continue
+            keys = [k.split('#')[0] for k in entry[4:]]
+            if terms is not None:
+                keys = [k for k in keys if k in terms]
+            if keys:
+                # synset_data is a tuple (offset, posval, negval)
+                synset_data = (entry[1], float(entry[2]), float(entry[3]))
+                for key in keys:
+                    yield (synset_type, key, synset_data)
+
+
+def iterSWN3(datafile, terms=None):
+    '''
+      Streams SWN 3.0 database records (postag, term, (offset, posval, negval))
+    '''
+    with openResource(datafile) as SWNf:
+        # Loop through every line in SWN file
+        for line in SWNf:
+            # Tokenize line. Lines take the form:
+            # # POS   ID        PosScore NegScore SynsetTerms   Gloss
+            # a       00001740  0.125    0        able#1        (usually followed by `to') ...
+            # a       00002098  0        0.75     unable#1      (usually followed by
+            # `to') not having ...
+            entry = line.split()
+            if entry[0] == '#':
+                continue  # skip line w/ comment
+
+            synset_type = entry[0]
+            if synset_type not in POS_TAGS:
+                continue
+            # here we extract all terms with this polarity
+            keys = [token.split('#')[0] for token in entry[4:] if '#' in token]
+            if terms is not None:
+                keys = [k for k in keys if k in terms]
+            if keys:
+                # synset_data is a tuple (offset, posval, negval)
+                synset_data = (entry[1], float(entry[2]), float(entry[3]))
+                for key in keys:
+                    yield (synset_type, key, synset_data)
+
+
+# maps POS names used in the subjectivity clues file to lexicon POS tags
+_CLUES_POS = {'adj': ('a',), 'verb': ('v',), 'noun': ('n',), 'anypos': POS_TAGS}
+
+
+def iterSubjectivityClues(datafile, terms=None):
+    '''
+      Streams Wiebe's subjectivity clues records (postag, term, (term, posval, negval)).
+      Entries marked as 'anypos' are yielded for every part of speech, neutral entries are skipped.
+    '''
+    with openResource(datafile) as Wfile:
+        for line in Wfile:
+            # Tokenize a line
+            entry = line.split()
+
+            term = entry[2].split('=')[1]
+            if terms is not None and term not in terms:
+                continue
+            pos_type = entry[3].split('=')[1]
+            polarity = entry[5].split('=')[1]
+
+            if polarity == 'negative':
+                posval = 0
+                negval = 1
+            elif polarity == 'positive':
+                posval = 1
+                negval = 0
+            elif polarity != 'neutral':
+                # other polarities (eg. both, weakneg) are kept as entries with no sentiment
+                posval = negval = 0
+            else:
+                continue
+
+            for postag in _CLUES_POS.get(pos_type, ()):
+                # a tuple (term, pos val, neg val)
+                yield (postag, term, (term, posval, negval))
+
+
+def iterMoby(datafile, terms=None):
+    """
+      Streams Mobi-derived sentiment lexicon records (postag, term, (term, posval, negval))
+    """
+    with openResource(datafile) as f:
+        for line in f:
+            # Tokenize line.
+            entry = line.split(',')
+            term = entry[0]
+            term_type = entry[1]
+            # POS tags are upper case on file
+            if not term_type.isupper() or term_type.lower() not in POS_TAGS:
+                continue
+            if terms is not None and term not in terms:
+                continue
+            yield (term_type.lower(), term, (term, float(entry[2]), float(entry[3])))
+
+
+def iterGI(datafile, terms=None):
+    """
+      Streams General Enquirer database records (postag, term, (term, posval, negval))
+    """
+    with openResource(datafile) as f:
+        for line in f:
+            # Tokenize line.
+            entry = line.split(',')
+            term = entry[0].split('#')[0].lower()   # Disregard term info past # sign
+            term_type = entry[3][0]                 # POS is on first char - disregard other info
+            term_pos = entry[1]
+            term_neg = entry[2]
+
+            if term_type not in POS_TAGS:
+                continue
+            if terms is not None and term not in terms:
+                continue
+            # - assumes there are no entries with both Positiv or Negativ, but accepts multiple entries for same term in whatever combination
+            if term_pos.upper() == 'POSITIV':
+                yield (term_type, term, (term, 1, 0))
+            elif term_neg.upper() == 'NEGATIV':
+                yield (term_type, term, (term, 0, 1))
+            else:
+                yield (term_type, term, (term, 0, 0))
+
+
+def iterUIC(datafile, terms=None):
+    '''
+      Streams UIC lexicon records (postag, term, (term, posval, negval))
+    '''
+    with openResource(datafile) as f:
+        for line in f:
+            # get tokens
+            # input file is in format:
+            #  [pos|neg],word,pos
+            items = line.replace('\n', '').split(',')
+            termpos = items[2]
+            word = items[1]
+            if termpos not in POS_TAGS:
+                continue
+            if terms is not None and word not in terms:
+                continue
+            if items[0] == 'pos':
+                yield (termpos, word, (word, 1, 0))
+            else:
+                yield (termpos, word, (word, 0, 1))
+
+
+##
+# Multi-POS readers
+#
+# - Optional terms is a set of terms to load (a whitelist); other terms in the resource are skipped.
+##
+
+
+@multi_pos_reader
+def readSWNAll(datafile=None, terms=None):
+    '''
+      Reads SWN database into dictionaries for all parts of speech in a single pass.
+
+       - Return value is a dictionary keyed by POS tag ('a', 'v', 'n', 'r'), where for each POS:
+       - each entry is a array of 1+ tuples corresponding to all synsets of a given term for a given pos
+       - the tuple itself contains the SWN offset, positive value and negative value
+
+    '''
+    if not datafile:
+        return _new_pos_dicts()
+    return _collect(iterSWN(datafile, terms))
+
+
+@multi_pos_reader
+def readSWN3All(datafile=None, terms=None):
+    '''
+      Reads SWN 3.0 database into dictionaries for all parts of speech in a single pass.
+
+       - Return value is a dictionary keyed by POS tag ('a', 'v', 'n', 'r'), where for each POS:
+       - each entry is a array of 1+ tuples corresponding to all synsets of a given term for a given pos
+       - the tuple itself contains the SWN offset, positive value and negative value
+
+    '''
+    if not datafile:
+        return _new_pos_dicts()
+    return _collect(iterSWN3(datafile, terms))
+
+
+@multi_pos_reader
+def readSubjectivityCluesAll(datafile=None, terms=None):
+    '''
+      Reads Wiebe's subjectivity clues into dictionaries for all parts of speech in a single pass.
+      Entries marked as 'anypos' are added to every part of speech.
+
+      Typical line read from file:
+      type=weaksubj len=1 word1=wrestle pos1=verb stemmed1=y priorpolarity=negative
+    '''
+    if not datafile:
+        return _new_pos_dicts()
+    return _collect(iterSubjectivityClues(datafile, terms))
+
+
+@multi_pos_reader
+def readMobyAll(datafile=None, terms=None):
+    """
+      Reads all POS tags from a Mobi-derived sentiment lexicon in a single pass. Returns dictionary of items per POS.
+    """
+    if not datafile:
+        return _new_pos_dicts()
+    return _collect(iterMoby(datafile, terms))
+
+
+@multi_pos_reader
+def readGIAll(datafile=None, terms=None):
+    """
+      Reads term information from General Enquirer database in a single pass. Returns dictionary of items per POS.
+    """
+    if not datafile:
+        return _new_pos_dicts()
+    return _collect(iterGI(datafile, terms))
+
+
+@multi_pos_reader
+def readUICAll(datafile=None, terms=None):
+    '''
+     Reads UIC lexicon words for all parts of speech in a single pass. This lexicon is based on
+     http://www.cs.uic.edu/~liub/FBS/sentiment-analysis.html
+    '''
+    if not datafile:
+        return _new_pos_dicts()
+    return _collect(iterUIC(datafile, terms))
+
+
+##
+# Per-POS readers
 ##
 
 
@@ -30,24 +372,7 @@ def readSWN(postag, datafile=None):
        - the tuple itself contains the SWN offset, positive value and negative value
 
     '''
-    A = {}
-    SWNf = open(datafile, 'r', 1024000)
-    # Loop through every line in SWN file
-    for line in SWNf:
-        # Tokenize line.
-        entry = line.split()
-        synset_type = entry[0]
-        # synset_data is a tuple (offset, posval, negval)
-        synset_data = (entry[1], float(entry[2]), float(entry[3]))
-        # now add this entry to the correct list
-        if synset_type == postag:
-            # here we extract all terms with this polarity
-            for k in entry[4:]:
-                key = k.split('#')[0]
-                if key not in A:
-                    A[key] = []
-                A[key].append(synset_data)
-    return A
+    return readSWNAll(datafile)[postag]
 
 
 def readSWN3(postag, datafile=None):
@@ -60,30 +385,7 @@ def readSWN3(postag, datafile=None):
        - the tuple itself contains the SWN offset, positive value and negative value
 
     '''
-    A = {}
-    SWNf = open(datafile)
-    # Loop through every line in SWN file
-    for line in SWNf:
-        # Tokenize line. Lines take the form:
-        # # POS   ID        PosScore NegScore SynsetTerms   Gloss
-        # a       00001740  0.125    0        able#1        (usually followed by `to') ...
-        # a       00002098  0        0.75     unable#1      (usually followed by
-        # `to') not having ...
-        entry = line.split()
-        if entry[0] == '#':
-            continue  # skip line w/ comment
-
-        synset_type = entry[0]
-        # synset_data is a tuple (offset, posval, negval)
-        synset_data = (entry[1], float(entry[2]), float(entry[3]))
-        # now add this entry to the correct list
-        if synset_type == postag:
-            # here we extract all terms with this polarity
-            for k in [token.split('#')[0] for token in entry[4:] if '#' in token]:
-                if k not in A:
-                    A[k] = []
-                A[k].append(synset_data)
-    return A
+    return readSWN3All(datafile)[postag]
 
 
 def readSubjectivityClues(postag, datafile=None):
@@ -93,129 +395,61 @@ def readSubjectivityClues(postag, datafile=None):
       Typical line read from file:
       type=weaksubj len=1 word1=wrestle pos1=verb stemmed1=y priorpolarity=negative
     '''
-    A = {}
-
     if datafile == None:
         return None
-
-    if postag == 'a':
-        posname = 'adj'
-    elif postag == 'v':
-        posname = 'verb'
-    elif postag == 'n':
-        posname = 'noun'
-    else:
-        posname = 'anypos'
-
-    Wfile = open(datafile, 'r', 1024000)
-
-    for line in Wfile:
-        # Tokenize a line
-        entry = line.split()
-
-        posval = 0
-        negval = 0
-
-        pos_type = entry[3].split('=')[1]
-        polarity = entry[5].split('=')[1]
-        term = entry[2].split('=')[1]
-
-        if polarity == 'negative':
-            posval = 0
-            negval = 1
-        elif polarity == 'positive':
-            posval = 1
-            negval = 0
-
-        if (pos_type == posname or pos_type == 'anypos') and polarity != 'neutral':
-            # Add entry if polarity is non neutral
-            if term not in A:
-                A[term] = []
-            # Append a tuple (term, pos val, neg val)
-            A[term].append((term, posval, negval))
-    return A
+    return readSubjectivityCluesAll(datafile)[postag]
 
 
 def readMoby(postag, datafile=None):
     """
       Reads POS tag from a Mobi-derived sentiment lexicon. Returns dictionary of items
     """
-    A = {}
     if datafile == None:
         return None
-
-    f = open(datafile, 'r', 1024000)
-
-    # Loop through every line in SWN file
-    for line in f:
-        # Tokenize line.
-        entry = line.split(',')
-        term = entry[0]
-        term_type = entry[1]
-        # now add this entry to the correct list
-        if term_type == postag.upper():
-            if term not in A:
-                A[term] = []
-                # Add a tuple (term, pos, neg)
-            A[term].append((term, float(entry[2]), float(entry[3])))
-    return A
+    return readMobyAll(datafile)[postag]
 
 
 def readGI(postag, datafile=None):
     """
       Reads term information from General Enquirer database. Returns dictionary of items
     """
-    A = {}
     if not datafile:
         return None
-    f = open(datafile, 'r', 1024000)
-
-    # Loop through every line in SWN file
-    for line in f:
-        # Tokenize line.
-        entry = line.split(',')
-        term = entry[0].split('#')[0].lower()   # Disregard term info past # sign
-        term_type = entry[3][0]                 # POS is on first char - disregard other info
-        term_pos = entry[1]
-        term_neg = entry[2]
-
-        # now add this entry to the correct list
-        if term_type == postag:
-            if term not in A:
-                A[term] = []
-            # Add a tuple (term, pos, neg)
-            # - assumes there are no entries with both Positiv or Negativ, but accepts multiple entries for same term in whatever combination
-            if term_pos.upper() == 'POSITIV':
-                A[term].append((term, 1, 0))
-            elif term_neg.upper() == 'NEGATIV':
-                A[term].append((term, 0, 1))
-            else:
-                A[term].append((term, 0, 0))
-
-    return A
+    return readGIAll(datafile)[postag]
 
 
 def readUIC(postag, datafile=None):
     '''
      Reads UIC lexicon words for a given part of speech. This lexicon is based on http://www.cs.uic.edu/~liub/FBS/sentiment-analysis.html
     '''
-    A = {}
     if not datafile:
         return None
-    f = open(datafile, 'r')
-    for line in f:
-        # get tokens
-        # input file is in format:
-        #  [pos|neg],word,pos
-        items = line.replace('\n', '').split(',')
-        termpos = items[2]
-        valence = items[0]
-        word = items[1]
-        if termpos == postag:
-            if not word in A:
-                A[word] = []
-            if valence == 'pos':
-                A[word].append((word, 1, 0))
-            else:
-                A[word].append((word, 0, 1))
-    return A
+    return readUICAll(datafile)[postag]
+
+
+# Approximate number of words in the SUBTLEXus corpus
+SUBTLEX_CORPUS_SIZE = 51000000.0
+
+
+def readSUBTLEX(datafile):
+    '''
+     Reads word counts from SUBTLEXus frequency list, returning a dictionary of word probabilities
+     estimated as count(w)/corpus size. Data available from: http://expsy.ugent.be/subtlexus/
+    '''
+    LexFreq = {}
+    # first we read raw counts, then estimate prob. of ocurrences
+    with openResource(datafile) as f:
+        for line in f:
+            rec = line.split('\t')
+            word = rec[0]
+            wordfreq = rec[1]
+            if word and wordfreq.isdigit():
+                if word in LexFreq:
+                    LexFreq[word] += float(wordfreq)
+                else:
+                    LexFreq[word] = float(wordfreq)
+
+    # estimate probabilities
+    for w in LexFreq:
+        LexFreq[w] = LexFreq[w] / SUBTLEX_CORPUS_SIZE
+    return LexFreq
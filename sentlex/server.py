@@ -0,0 +1,270 @@
+'''
+server.py - Local scoring service
+
+Keeps a classifier (and its lexicon, lemmatizer and stopwords) warm in a long-running process, serving JSON scoring
+requests over HTTP on localhost or over a Unix domain socket. See bin/sentserver.
+
+   POST /score   {"doc": "good/JJ movie/NN"}                  -> {"scores": [pos, neg]}
+                 {"docs": ["good/JJ", "bad/JJ"]}              -> {"results": [{"scores": [pos, neg]}, ...]}
+   GET  /health                                               -> {"status": "ok", ...}
+
+Optional request fields: "tagged" (default true), "resultdata" (include result fields in each result, default false)
+and "annotations" (include annotated document in result fields, default false).
+
+Documents from concurrent requests are grouped into micro-batches by a MicroBatcher: a batch is scored once
+max_batch documents are queued, or max_latency seconds after its first document arrived, whichever comes first.
+'''
+
+from __future__ import absolute_import
+import os
+import json
+import stat
+import time
+import threading
+import six
+from concurrent.futures import Future
+from six.moves import queue
+from six.moves import socketserver
+from six.moves.BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_LATENCY = 0.005
+
+
+class MicroBatcher(object):
+    '''
+     Groups items submitted from many threads into batches processed by f_batch, on a dedicated thread.
+     f_batch receives a list of items and returns a list of results (or exceptions) of the same length.
+    '''
+
+    def __init__(self, f_batch, max_batch=DEFAULT_MAX_BATCH, max_latency=DEFAULT_MAX_LATENCY):
+        assert max_batch >= 1, 'max_batch must be a positive integer'
+        self.f_batch = f_batch
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='sentlex-batcher')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, item):
+        '''
+         Queues item for processing. Returns a concurrent.futures.Future with its result.
+        '''
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def submit_many(self, items):
+        return [self.submit(item) for item in items]
+
+    def close(self):
+        '''
+         Processes queued items and stops batcher thread.
+        '''
+        self._queue.put(None)
+        self._thread.join()
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.time() + self.max_latency
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.time()
+            if timeout <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if entry is None:
+                # stop after this batch
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            items = [item for (item, future) in batch]
+            try:
+                results = self.f_batch(items)
+            except Exception as e:
+                results = [e] * len(items)
+            self.batches += 1
+            self.items += len(items)
+            for ((item, future), result) in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+def score_batch(classifier, items):
+    '''
+     Scores a batch of (doc, tagged, resultdata, annotations) items with classifier.
+     Returns list of JSON-ready result dicts, or exceptions for documents that could not be scored.
+    '''
+    # raw documents of the batch are tagged in one call, and their tokens handed to the scorer
+    tokens = [None] * len(items)
+    raw = [i for (i, item) in enumerate(items) if not item[1]]
+    if raw:
+        try:
+            for (i, tagged_tokens) in zip(raw, classifier.tag_documents([items[i][0] for i in raw])):
+                tokens[i] = tagged_tokens
+        except Exception:
+            pass  # tagged (and reported) one by one below
+
+    results = []
+    for ((doc, tagged, resultdata, annotations), tagged_tokens) in zip(items, tokens):
+        try:
+            result = classifier.score_document(doc, tagged=tagged, annotations=annotations, tagged_tokens=tagged_tokens)
+        except Exception as e:
+            results.append(e)
+            continue
+
+        response = {'scores': [result.resultpos, result.resultneg]}
+        if resultdata:
+            fields = result.as_dict()
+            del fields['doc']
+            if not annotations:
+                del fields['annotated_doc']
+            fields['found_list'] = dict(fields['found_list'])
+            response['resultdata'] = fields
+        results.append(response)
+    return results
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    '''
+     Handles scoring requests, forwarding documents to the server batcher.
+    '''
+    protocol_version = 'HTTP/1.1'
+
+    def address_string(self):
+        # Unix socket clients have no address
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def _reply(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/health':
+            return self._reply(404, {'error': 'not found'})
+        batcher = self.server.batcher
+        self._reply(200, {'status': 'ok', 'lexicon': self.server.classifier.L.get_name(),
+                          'batches': batcher.batches, 'documents': batcher.items})
+
+    def do_POST(self):
+        if self.path != '/score':
+            return self._reply(404, {'error': 'not found'})
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            if 'docs' in request:
+                docs = request['docs']
+            else:
+                docs = [request['doc']]
+            if not all(isinstance(doc, six.string_types) for doc in docs):
+                raise ValueError('documents must be strings')
+        except (ValueError, KeyError, TypeError) as e:
+            return self._reply(400, {'error': 'invalid request: %s' % e})
+
+        options = (bool(request.get('tagged', True)), bool(request.get('resultdata', False)),
+                   bool(request.get('annotations', False)))
+        futures = self.server.batcher.submit_many([(doc,) + options for doc in docs])
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({'error': str(e)})
+
+        if 'docs' in request:
+            return self._reply(200, {'results': results})
+        if 'error' in results[0]:
+            return self._reply(400, results[0])
+        self._reply(200, results[0])
+
+
+class _ScoringServerMixin(object):
+
+    def setup_scoring(self, classifier, max_batch, max_latency, verbose):
+        self.classifier = classifier
+        self.verbose = verbose
+        self.batcher = MicroBatcher(lambda items: score_batch(classifier, items), max_batch, max_latency)
+
+    def server_close(self):
+        super(_ScoringServerMixin, self).server_close()
+        self.batcher.close()
+
+
+class ScoringHTTPServer(_ScoringServerMixin, socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class ScoringUnixServer(_ScoringServerMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_close(self):
+        super(ScoringUnixServer, self).server_close()
+        if _is_socket(self.server_address):
+            os.remove(self.server_address)
+
+
+def _is_socket(path):
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except OSError:
+        return False
+
+
+def create_server(classifier, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None,
+                  max_batch=DEFAULT_MAX_BATCH, max_latency=DEFAULT_MAX_LATENCY, verbose=False):
+    '''
+     Returns a scoring server for classifier (a BasicDocSentiScore with lexicon and parameters set), listening on
+     Unix socket socket_path if given, or on host:port otherwise (port 0 picks a free port). A stale socket left
+     at socket_path is replaced; any other file there raises RuntimeError.
+     Call serve_forever() to serve requests, and shutdown()/server_close() to stop.
+
+     If the classifier scores verbs, the lexicon verb table (see Lexicon.compile_verb_forms) and WordNet lemmatizer
+     are loaded here, rather than by the first request.
+    '''
+    if not (classifier.L and classifier.L.is_loaded):
+        raise RuntimeError('Lexicon has not been assigned, or not loaded')
+
+    if classifier.config.v:
+        if classifier.L.verb_forms is None:
+            classifier.L.compile_verb_forms()
+        classifier.wnl.lemmatize('is', pos='v')
+
+    if socket_path:
+        if os.path.lexists(socket_path):
+            if not _is_socket(socket_path):
+                raise RuntimeError('%s exists and is not a socket' % socket_path)
+            os.remove(socket_path)
+        server = ScoringUnixServer(socket_path, ScoringRequestHandler)
+    else:
+        server = ScoringHTTPServer((host, port), ScoringRequestHandler)
+    server.setup_scoring(classifier, max_batch, max_latency, verbose)
+    return server
@@ -0,0 +1,237 @@
+'''
+sharedlex.py - Shared lexicon store for multiprocessing workers
+
+A loaded lexicon is published once into a memory-mapped store, holding the resolved (pos, neg) scores of every
+term and part of speech as compact term tables (see termtable module). Worker processes attach a read-only
+SharedLexicon view over the same pages, supporting the hasX/getX/get_freq API without copying lexicon data.
+
+   L = sentlex.SWN3Lexicon()
+   shared = sentlex.sharedlex.publish(L)
+   pool = multiprocessing.Pool(initializer=..., initargs=(shared,))   # pickles as a reference to the store
+   ...
+   shared.unlink()
+
+Stores are files placed in /dev/shm (POSIX shared memory) when available, or the system temp directory otherwise,
+and can be given an explicit path. Stores are meant to be shared by processes of the same host.
+
+Sharing trades lookup speed for memory: a term table lookup is a binary search in Python, around 5us against
+0.1us for a compiled ResourceLexicon. Each process therefore keeps a small memo of the terms it has looked up
+(memo_size entries per table, see attach()), so repeated lookups of the most frequent terms cost a dictionary
+access. The memo is private to the process and is emptied when full; memo_size=0 disables it.
+
+A frequency table the publishing lexicon had memory-mapped (see Lexicon.compile_frequency) is shared by reference,
+and only attached by workers if its file is trusted (see termtable.attach_trusted_table). Otherwise workers fall
+back to the in-memory frequency dictionary.
+'''
+
+from __future__ import absolute_import
+import os
+import json
+import mmap
+import uuid
+import struct
+import tempfile
+
+from .sentlex import Lexicon
+from . import termtable
+
+STORE_MAGIC = 0x48534c53  # 'SLSH'
+STORE_VERSION = 1
+STORE_EXT = '.slsh'
+
+# per-process memo entries kept for each table of a store
+DEFAULT_MEMO_SIZE = 4096
+
+_HEADER = struct.Struct('=3I')
+
+
+def _align8(n):
+    return (n + 7) & ~7
+
+
+def _default_store_dir():
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+def build_store(L):
+    '''
+      Returns bytes of a lexicon store with resolved scores for all terms in lexicon L.
+    '''
+    sections = []
+    meta = {'name': L.get_name(), 'sections': {}}
+    for (pos, f_checker, f_getter) in L._POS_FUNCS:
+        f_getter = getattr(L, f_getter)
+        sections.append((pos, termtable.build_table(((term, f_getter(term)) for term in L._terms(pos)), ncols=2)))
+
+    if isinstance(L.LexFreq, termtable.TermTable) and L.LexFreq.path:
+        # frequency table is already memory-mapped from file, so we share it by reference
+        meta['freq_path'] = L.LexFreq.path
+    elif L.LexFreq:
+        sections.append(('freq', termtable.build_table(L.LexFreq.items())))
+
+    offset = 0
+    for (section, data) in sections:
+        meta['sections'][section] = offset
+        offset = _align8(offset + len(data))
+
+    metadata = json.dumps(meta).encode('utf-8')
+    header = _HEADER.pack(STORE_MAGIC, STORE_VERSION, len(metadata))
+    buf = bytearray(header + metadata)
+    for (section, data) in sections:
+        buf.extend(b'\0' * (_align8(len(buf)) - len(buf)))
+        buf.extend(data)
+    return bytes(buf)
+
+
+def publish(L, path=None):
+    '''
+      Publishes lexicon L into a shared store at path (a new file under /dev/shm by default), and returns a
+      SharedLexicon attached to it. The caller owns the store and should call unlink() once workers are done.
+    '''
+    assert L.is_loaded, 'Lexicon must be loaded before publishing.'
+    if not path:
+        path = os.path.join(_default_store_dir(), 'sentlex-%s%s' % (uuid.uuid4().hex, STORE_EXT))
+
+    fd, tmppath = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(build_store(L))
+        os.replace(tmppath, path)
+    except Exception:
+        if os.path.exists(tmppath):
+            os.remove(tmppath)
+        raise
+    return attach(path)
+
+
+def attach(path, memo_size=DEFAULT_MEMO_SIZE):
+    '''
+      Returns a read-only SharedLexicon view of store at path, memoising up to memo_size lookups per table.
+    '''
+    return SharedLexicon(path, memo_size)
+
+
+class MemoTable(object):
+    '''
+      Read-only term table (see termtable.TermTable) with a per-process memo of looked up terms, including misses.
+      The memo holds up to maxsize terms and is emptied when full. maxsize 0 disables it.
+    '''
+
+    def __init__(self, table, maxsize=DEFAULT_MEMO_SIZE):
+        self.table = table
+        self.maxsize = maxsize
+        self._memo = {}
+
+    def get(self, term, default=None):
+        try:
+            value = self._memo[term]
+        except KeyError:
+            value = self.table.get(term)
+            if self.maxsize:
+                if len(self._memo) >= self.maxsize:
+                    self._memo.clear()
+                self._memo[term] = value
+        return default if value is None else value
+
+    def __contains__(self, term):
+        return self.get(term) is not None
+
+    def __getitem__(self, term):
+        value = self.get(term)
+        if value is None:
+            raise KeyError(term)
+        return value
+
+    def __len__(self):
+        return len(self.table)
+
+    def __iter__(self):
+        return iter(self.table)
+
+    def keys(self):
+        return self.table.keys()
+
+    def items(self):
+        return self.table.items()
+
+
+class SharedLexicon(Lexicon):
+    '''
+      Read-only lexicon view over a shared store created by publish().
+      Supports hasX/getX/get_freq lookups; scores are the resolved values of the published lexicon.
+      Pickling a SharedLexicon transfers only the store path - the unpickled copy re-attaches the same pages.
+
+      Lookups are memoised per process (see MemoTable) - uncached lookups are much slower than in a compiled
+      ResourceLexicon, so the shared store pays off when many processes would otherwise each hold a copy.
+
+      Like CompositeLexicon, sense lists are not available, so print_info() and get_info() do not apply.
+    '''
+
+    def __init__(self, path, memo_size=DEFAULT_MEMO_SIZE):
+        super(SharedLexicon, self).__init__()
+        self.path = path
+        self.memo_size = memo_size
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, metalen) = _HEADER.unpack_from(self._mm)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            raise ValueError('%s is not a version %d sentlex lexicon store' % (path, STORE_VERSION))
+        meta = json.loads(self._mm[_HEADER.size:_HEADER.size + metalen].decode('utf-8'))
+        datastart = _align8(_HEADER.size + metalen)
+
+        self.LexName = meta['name']
+        self._tables = dict((section, MemoTable(termtable.TermTable(self._mm, datastart + offset), memo_size))
+                            for (section, offset) in meta['sections'].items())
+        self.LexFreq = self._tables.get('freq')
+        if 'freq_path' in meta:
+            table = termtable.attach_trusted_table(meta['freq_path'])
+            if table is not None:
+                self.LexFreq = MemoTable(table, memo_size)
+            else:
+                super(SharedLexicon, self).compile_frequency(shared=False)
+        self._is_compiled = bool(self.LexFreq)
+        self._is_loaded = True
+
+    def __reduce__(self):
+        return (attach, (self.path, self.memo_size))
+
+    def unlink(self):
+        '''
+          Removes the store file. Processes already attached keep their mapping until they exit.
+        '''
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _posdict(self, pos):
+        return self._tables[pos]
+
+    def compile_frequency(self):
+        # frequencies are part of the published store
+        pass
+
+    def hasnoun(self, term):
+        return term in self._tables['n']
+
+    def hasverb(self, term):
+        return term in self._tables['v']
+
+    def hasadverb(self, term):
+        return term in self._tables['r']
+
+    def hasadjective(self, term):
+        return term in self._tables['a']
+
+    def getnoun(self, term):
+        return self._tables['n'].get(term, (0, 0))
+
+    def getverb(self, term):
+        return self._tables['v'].get(term, (0, 0))
+
+    def getadverb(self, term):
+        return self._tables['r'].get(term, (0, 0))
+
+    def getadjective(self, term):
+        return self._tables['a'].get(term, (0, 0))
@@ -0,0 +1,153 @@
+'''
+streaming.py - Chunked document scoring
+
+Scores a POS-tagged document received as a stream of token chunks (eg. a live transcript), without materializing
+the whole document. Negation window state, repeated term counts and running totals are carried across chunks:
+
+    stream = classifier.stream()
+    for chunk in transcript:
+        (pos, neg) = stream.feed(chunk)   # running scores
+    result = stream.close()               # ScoreResult, with final score adjustments
+
+Final scores equal those of BasicDocSentiScore.score_document() on the whole document. Token negation flags depend
+on the following token (bigram markers), so the last token of each chunk is scored when the next chunk arrives.
+
+Memory use does not grow with stream length: of the negation map, only the counts needed by final score adjustments
+are kept (see negdetect.NegationTally), and unscored tokens are only listed if keep_unscored is set. Repeated term
+counts (found_list) grow with the vocabulary of the document.
+
+Position weight functions (score_function) need the document length up front, given as doclen. Only negation
+detection is supported among detectors. Annotations are not recorded.
+'''
+
+from __future__ import absolute_import
+import collections
+
+import six
+
+from . import negdetect
+from .sentanalysis import DocumentState, ScoreResult
+
+# tokens used to detect the tag separator (see DocSentiScore._detect_tag)
+TAGSEP_TOKENS = 3
+
+
+class DocumentStream(object):
+    '''
+      Scores a document fed in chunks of tagged tokens, with the current configuration of classifier.
+      Tokens found in the lexicon with no sentiment are listed in unscored_list only if keep_unscored is set.
+    '''
+
+    def __init__(self, classifier, doclen=None, tagsep=None, verbose=False, keep_unscored=False):
+        if not classifier.L.is_loaded:
+            raise RuntimeError('Lexicon has not been assigned, or not loaded')
+        if set(classifier._detector_map) != set(['NEGATION']):
+            raise RuntimeError('Streaming supports negation detection only.')
+
+        self.classifier = classifier
+        self.plan = classifier.plan
+        if (self.plan.score_function or self.plan.position_weight) and not doclen:
+            raise RuntimeError('Position weight functions require document length (doclen) when streaming.')
+
+        self.doclen = doclen
+        self.tagsep = tagsep
+        self.state = DocumentState(verbose=verbose)
+        self.state.document_maps = {'NEGATION': negdetect.NegationTally()}
+        self.scanner = negdetect.NegationScanner(int(self.plan.config.negation_window))
+        self.postotal = 0.0
+        self.negtotal = 0.0
+        self.position = 0
+        self.tokens_found = 0
+        self.tokens_negated = 0
+        self.unscored = [] if keep_unscored else None
+        self.closed = False
+        self._undetected = []   # tokens received before the tag separator was detected
+        self._pending = collections.deque()  # tokens waiting for their negation flag
+
+    @property
+    def scores(self):
+        '''
+          Running (pos, neg) scores, before final score adjustments.
+        '''
+        return (self.postotal, self.negtotal)
+
+    def feed(self, tokens):
+        '''
+          Scores a chunk of tagged tokens (a list, or a string of tokens separated by whitespace).
+          Returns running (pos, neg) scores.
+        '''
+        assert not self.closed, 'Stream is closed.'
+        if isinstance(tokens, six.string_types):
+            tokens = tokens.split()
+        else:
+            tokens = list(tokens)
+
+        if self.tagsep is None:
+            self._undetected.extend(tokens)
+            if len(self._undetected) < TAGSEP_TOKENS:
+                return self.scores
+            self._detect_tag()
+            (tokens, self._undetected) = (self._undetected, [])
+
+        self._pending.extend(tokens)
+        self._score(self.scanner.feed(tokens))
+        return self.scores
+
+    def close(self):
+        '''
+          Ends the document. Returns ScoreResult with final scores.
+        '''
+        if not self.closed:
+            if self._undetected:
+                self._detect_tag()
+                tokens = self._undetected
+                self._undetected = []
+                self._pending.extend(tokens)
+                self._score(self.scanner.feed(tokens))
+            self._score(self.scanner.close())
+            self.closed = True
+
+        config = self.plan.config
+        (resultpos, resultneg) = self.classifier._doc_score_adjust(self.postotal, self.negtotal, config, self.state)
+        return ScoreResult(resultpos=resultpos,
+                           resultneg=resultneg,
+                           tokens_found=self.tokens_found,
+                           tokens_negated=self.tokens_negated,
+                           found_list=self.state.tag_counter,
+                           unscored_list=list(self.unscored or ()))
+
+    def _detect_tag(self):
+        self.tagsep = self.classifier._detect_tag(' '.join(self._undetected[:TAGSEP_TOKENS]))
+        if not self.tagsep:
+            raise RuntimeError('Unable to detect tag separator in {}'.format(' '.join(self._undetected[:100])))
+
+    def _score(self, flags):
+        '''
+          Scores pending tokens with known negation flags.
+        '''
+        classifier = self.classifier
+        plan = self.plan
+        config = plan.config
+        state = self.state
+        vNEG = state.document_maps['NEGATION']
+        doclen = self.doclen
+        for flag in flags:
+            tagword = self._pending.popleft()
+            self.position += 1
+            i = self.position
+            vNEG.append(flag)
+            self.tokens_negated += flag
+
+            (thisword, scoretuple) = classifier._token_scores(tagword, self.tagsep, config)
+            if thisword is None or scoretuple is None:
+                continue
+            if (plan.score_function or plan.position_weight is not None) and i > doclen:
+                raise RuntimeError('Stream exceeds document length given (doclen=%d).' % doclen)
+
+            state.tag_counter.update([tagword])
+            (posval, negval) = classifier._get_word_contribution(thisword, tagword, scoretuple, i, doclen, plan, state)
+            self.postotal += posval
+            self.negtotal += negval
+            if scoretuple == (0, 0) and self.unscored is not None:
+                self.unscored.append(tagword)
+            self.tokens_found += 1
@@ -0,0 +1,111 @@
+'''
+sweep.py - Parameter sweeps over a corpus
+
+Scores a corpus under every point of a parameter grid. Documents are preprocessed once (tagging, parsing,
+lemmatization, lexicon lookups and negation maps, see docprep module), and only the parameter-dependent stages of
+scoring are run for each grid point, optionally over a pool of worker processes:
+
+    points = sweep.grid(negation_window=[3, 5, 7], backoff_alpha=[0.0, 0.5, 1.0], score_mode=[ds.SCOREBACKOFF])
+    table = sweep.run(ds, docs, points, n_jobs=4)
+
+run() returns a results table: one row (a dict) per grid point and document, with the grid point parameters,
+the document index (doc) and its scores (resultpos, resultneg).
+'''
+
+from __future__ import absolute_import
+import copy
+import itertools
+import multiprocessing
+
+from . import parallel
+from .docprep import PreparedDocument
+
+# classifier and prepared documents of this worker process, set by _init_worker()
+_worker = None
+
+
+def grid(**params):
+    '''
+      Returns list of parameter dicts for all combinations of given parameter value lists.
+    '''
+    names = sorted(params)
+    return [dict(zip(names, values)) for values in itertools.product(*[params[name] for name in names])]
+
+
+def prepare(classifier, docs, tagged=True):
+    '''
+      Returns list of PreparedDocument for documents in iterable docs.
+    '''
+    docs = list(docs)
+    if tagged:
+        return [PreparedDocument.from_document(classifier, doc) for doc in docs]
+    return [PreparedDocument.from_document(classifier, doc, False, tagged_tokens)
+            for (doc, tagged_tokens) in zip(docs, classifier.tag_documents(docs))]
+
+
+def score_point(classifier, prepared, point):
+    '''
+      Scores prepared documents with classifier, under parameters point. Returns list of result rows.
+    '''
+    classifier.set_parameters(**point)
+    rows = []
+    for (index, doc) in enumerate(prepared):
+        result = classifier.score_prepared(doc)
+        row = dict(point)
+        row.update({'doc': index, 'resultpos': result.resultpos, 'resultneg': result.resultneg})
+        rows.append(row)
+    return rows
+
+
+def _init_worker(classifier, prepared):
+    global _worker
+    _worker = (classifier, prepared)
+
+
+def _score_point(point):
+    (classifier, prepared) = _worker
+    return score_point(classifier, prepared, point)
+
+
+def run(classifier, docs, points, n_jobs=1, tagged=True):
+    '''
+      Scores documents docs (strings, or PreparedDocument instances) with classifier under each parameter dict in
+      points. Grid points are spread over n_jobs worker processes (None or -1 uses one process per CPU).
+      The classifier parameters are left unchanged.
+
+      Returns list of result rows, by grid point and document.
+    '''
+    docs = list(docs)
+    prepared = list(docs)
+    pending = [i for (i, doc) in enumerate(docs) if not isinstance(doc, PreparedDocument)]
+    for (i, doc) in zip(pending, prepare(classifier, [docs[i] for i in pending], tagged)):
+        prepared[i] = doc
+
+    # negation maps (once per window size) and frequency multipliers are computed ahead of sending documents
+    # to workers
+    config = classifier.config
+    for size in set(point.get('negation_window', config.negation_window) for point in points):
+        for doc in prepared:
+            doc.negation(size)
+    for freq_weight in set(point.get('freq_weight', config.freq_weight) for point in points
+                           if point.get('score_freq', config.score_freq)):
+        for doc in prepared:
+            doc.freq_factors(classifier.L, freq_weight)
+
+    # grid points are scored with a copy of the classifier, with its own parameters
+    classifier = copy.copy(classifier)
+    classifier._config = dict(classifier._config)
+    classifier._config_changed()
+
+    n_jobs = parallel.cpu_jobs(n_jobs)
+    if n_jobs == 1:
+        return [row for point in points for row in score_point(classifier, prepared, point)]
+
+    pool = multiprocessing.Pool(n_jobs, initializer=_init_worker, initargs=(classifier, prepared))
+    try:
+        table = [row for rows in pool.imap(_score_point, points) for row in rows]
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+    return table
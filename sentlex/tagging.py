@@ -0,0 +1,167 @@
+'''
+tagging.py - POS tagging of raw documents
+
+Tags batches of raw documents with NLTK's recommended tagger (nltk.pos_tag_sents), returning tagged tokens as
+(word, tag) tuples. Identical documents in a batch are tagged once, and results can be kept in a caching.TagCache
+keyed by a hash of document content, so repeated documents are not tagged again:
+
+    cache = caching.TagCache(disk_path='tags.db')
+    tagged = tagging.tag_documents(docs, cache)
+
+Classifiers tag documents given with tagged=False this way (see DocSentiScore.tag_documents), and score the tagged
+tokens without joining them into a tagged document string.
+
+Every document is parsed once into a TaggedDocument - parallel lists of words and tags - read by detectors and the
+token scan. Documents tagged upstream (eg. by another NLP pipeline) can be given to classifiers in this form, or as
+lists of (word, tag) tuples, skipping tag separator detection and token parsing:
+
+    ds.score_document(tagging.TaggedDocument(words, tags))
+    ds.score_document([('good', 'JJ'), ('movie', 'NN')])
+'''
+
+from __future__ import absolute_import
+import hashlib
+import collections
+
+import nltk
+import six
+
+# separator used when rendering tagged tokens as strings
+TAG_SEPARATOR = '/'
+
+# documents tagged per call to the tagger, when classifying document streams
+DEFAULT_BATCH_SIZE = 64
+
+
+class TaggedDocument(object):
+    '''
+      POS-tagged document as parallel lists of words and (uppercase) tags. Corrupt tokens have an empty word, or
+      an empty (or None) tag.
+
+        words     - list of words
+        tags      - list of POS tags
+        separator - tag separator, used to render tagged token strings (eg. good/JJ)
+    '''
+    __slots__ = ('words', 'tags', 'separator', '_tokens')
+
+    def __init__(self, words, tags, separator=TAG_SEPARATOR, tokens=None):
+        assert len(words) == len(tags), 'Words and tags must have the same length'
+        self.words = words
+        self.tags = tags
+        self.separator = separator
+        self._tokens = tokens
+
+    def __getstate__(self):
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for (name, value) in state.items():
+            setattr(self, name, value)
+
+    def __len__(self):
+        return len(self.words)
+
+    @classmethod
+    def from_tuples(cls, tagged):
+        '''
+          Returns TaggedDocument for a list of (word, tag) tuples.
+        '''
+        return cls([word for (word, tag) in tagged], [tag for (word, tag) in tagged])
+
+    @classmethod
+    def from_tokens(cls, tokens, separator):
+        '''
+          Returns TaggedDocument parsed from a list of tagged token strings, same as nltk.tag.str2tuple().
+          Tokens are kept, and rendered as given.
+        '''
+        words = []
+        tags = []
+        for token in tokens:
+            (word, sep, tag) = token.rpartition(separator)
+            if sep:
+                words.append(word)
+                tags.append(tag.upper())
+            else:
+                words.append(token)
+                tags.append(None)
+        return cls(words, tags, separator, tokens)
+
+    def token(self, i):
+        '''
+          Returns i-th (0-based) tagged token string.
+        '''
+        if self._tokens is not None:
+            return self._tokens[i]
+        return self.words[i] + self.separator + self.tags[i]
+
+    def tokens(self):
+        '''
+          Returns list of tagged token strings, rendered once.
+        '''
+        if self._tokens is None:
+            self._tokens = [word + self.separator + (tag or '') for (word, tag) in zip(self.words, self.tags)]
+        return self._tokens
+
+
+def content_key(doc):
+    '''
+      Returns cache key for document doc: hex digest of its content.
+    '''
+    if isinstance(doc, six.text_type):
+        doc = doc.encode('utf-8')
+    return hashlib.sha1(doc).hexdigest()
+
+
+def tag_documents(docs, cache=None):
+    '''
+      Returns list with tagged tokens of each document in docs - a tuple of (word, tag) tuples.
+      Documents not found in cache (a caching.TagCache, optional) are tokenized and tagged in one batch.
+    '''
+    docs = list(docs)
+    results = [None] * len(docs)
+    pending = collections.OrderedDict()  # content key -> indexes of documents to tag
+    for (i, doc) in enumerate(docs):
+        key = content_key(doc)
+        tagged = cache.get(key) if cache is not None else None
+        if tagged is not None:
+            results[i] = tagged
+        else:
+            pending.setdefault(key, []).append(i)
+
+    if pending:
+        sentences = [nltk.word_tokenize(docs[indexes[0]]) for indexes in pending.values()]
+        for ((key, indexes), tagged) in zip(pending.items(), nltk.pos_tag_sents(sentences)):
+            tagged = tuple((word, tag) for (word, tag) in tagged)
+            if cache is not None:
+                cache.put(key, tagged)
+            for i in indexes:
+                results[i] = tagged
+    return results
+
+
+def tag_document(doc, cache=None):
+    '''
+      Returns tagged tokens of document doc (see tag_documents).
+    '''
+    return tag_documents([doc], cache)[0]
+
+
+def tag_strings(tagged):
+    '''
+      Returns list of tagged token strings (eg. good/JJ) for (word, tag) tuples.
+    '''
+    return [word + TAG_SEPARATOR + tag for (word, tag) in tagged]
+
+
+def batches(docs, size=DEFAULT_BATCH_SIZE):
+    '''
+      Yields lists of up to size documents from iterable docs.
+    '''
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,260 @@
+'''
+termtable.py - Compact sorted term tables
+
+A term table maps terms to a fixed number of float values, stored in a single flat binary buffer:
+
+    header  - magic, version, number of terms, number of value columns (4 x uint32)
+    offsets - (n + 1) x uint32, start of each term in the terms blob
+    values  - n x ncols x float64, aligned to 8 bytes
+    blob    - utf-8 encoded terms, sorted bytewise
+
+Lookups are a binary search over the sorted terms, read straight from the buffer, so a table can sit on a
+memory-mapped file (or any shared buffer) and be used by many processes without copying it into the Python heap.
+Tables are written with native byte order, and are meant to be shared between processes of the same host.
+
+Lookups cost a Python-level binary search (several microseconds, against well under one for a dictionary), so term
+tables trade throughput for memory. The SUBTLEXus frequency table used by Lexicon.get_freq() is kept as a
+memory-mapped term table only when requested (see Lexicon.compile_frequency() and shared_frequency_table()).
+'''
+
+from __future__ import absolute_import
+import os
+import mmap
+import stat
+import struct
+import tempfile
+from array import array
+
+from . import lexcache
+from . import sentlexutil
+
+TABLE_MAGIC = 0x54544c53  # 'SLTT'
+TABLE_VERSION = 1
+TABLE_EXT = '.sltt'
+
+_HEADER = struct.Struct('=4I')
+
+# process-wide registry of shared tables, so all lexicons in a process map the same file once
+_SHARED_TABLES = {}
+
+
+def _align8(n):
+    return (n + 7) & ~7
+
+
+def build_table(items, ncols=1):
+    '''
+      Returns bytes of a term table built from items, an iterable of (term, values) pairs.
+      values is a float when ncols is 1, or a sequence of ncols floats otherwise.
+    '''
+    rows = sorted(((term.encode('utf-8'), values) for (term, values) in items), key=lambda r: r[0])
+
+    offsets = array('I', [0])
+    values = array('d')
+    blob = bytearray()
+    for (key, vals) in rows:
+        blob.extend(key)
+        offsets.append(len(blob))
+        if ncols == 1:
+            values.append(float(vals))
+        else:
+            values.extend(float(v) for v in vals)
+
+    header = _HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(rows), ncols)
+    data = bytearray(header)
+    data.extend(offsets.tobytes())
+    data.extend(b'\0' * (_align8(len(data)) - len(data)))
+    data.extend(values.tobytes())
+    data.extend(blob)
+    return bytes(data)
+
+
+def write_table(path, items, ncols=1):
+    '''
+      Writes term table built from items to file at path. The file is replaced atomically.
+    '''
+    dirname = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname, 0o700)
+
+    fd, tmppath = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(build_table(items, ncols))
+        os.replace(tmppath, path)
+    except Exception:
+        if os.path.exists(tmppath):
+            os.remove(tmppath)
+        raise
+
+
+def open_table(path):
+    '''
+      Returns a read-only TermTable backed by a memory map of file at path.
+    '''
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    table = TermTable(mm)
+    table.path = path
+    return table
+
+
+class TermTable(object):
+    '''
+      Read-only view of a term table held in buffer buf (bytes, mmap, shared memory...), starting at offset.
+      Behaves like a read-only dictionary mapping terms to a float (single column tables) or a tuple of floats.
+    '''
+
+    def __init__(self, buf, offset=0):
+        self.path = None
+        self._buf = buf
+        view = memoryview(buf)[offset:]
+        (magic, version, n, ncols) = _HEADER.unpack_from(view)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            raise ValueError('Buffer does not contain a version %d term table' % TABLE_VERSION)
+
+        self._n = n
+        self.ncols = ncols
+        pos = _HEADER.size
+        self._offsets = view[pos:pos + 4 * (n + 1)].cast('I')
+        pos = _align8(pos + 4 * (n + 1))
+        self._values = view[pos:pos + 8 * n * ncols].cast('d')
+        pos += 8 * n * ncols
+        self._blob = view[pos:pos + self._offsets[n]]
+        self.nbytes = pos + self._offsets[n]
+        # slicing bytes/mmap objects directly yields bytes, avoiding a copy via memoryview.tobytes()
+        if isinstance(buf, (bytes, mmap.mmap)):
+            self._keysrc = buf
+            self._keystart = offset + pos
+        else:
+            self._keysrc = None
+
+    def __reduce__(self):
+        # file-backed tables are re-opened (not copied) when pickled
+        if self.path:
+            return (open_table, (self.path,))
+        return (TermTable, (bytes(memoryview(self._buf)[:self.nbytes]),))
+
+    def __len__(self):
+        return self._n
+
+    def _key(self, i):
+        if self._keysrc is not None:
+            return self._keysrc[self._keystart + self._offsets[i]:self._keystart + self._offsets[i + 1]]
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].tobytes()
+
+    def _index(self, term):
+        '''
+          Returns row index for term, or -1 if not found
+        '''
+        key = term.encode('utf-8')
+        offsets = self._offsets
+        if self._keysrc is not None:
+            src = self._keysrc
+            start = self._keystart
+        else:
+            src = self._blob
+            start = 0
+        lo = 0
+        hi = self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if src[start + offsets[mid]:start + offsets[mid + 1]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n and src[start + offsets[lo]:start + offsets[lo + 1]] == key:
+            return lo
+        return -1
+
+    def _row(self, i):
+        if self.ncols == 1:
+            return self._values[i]
+        return tuple(self._values[i * self.ncols:(i + 1) * self.ncols])
+
+    def __contains__(self, term):
+        return self._index(term) >= 0
+
+    def __getitem__(self, term):
+        i = self._index(term)
+        if i < 0:
+            raise KeyError(term)
+        return self._row(i)
+
+    def get(self, term, default=None):
+        i = self._index(term)
+        if i < 0:
+            return default
+        return self._row(i)
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self._key(i).decode('utf-8')
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        for i in range(self._n):
+            yield (self._key(i).decode('utf-8'), self._row(i))
+
+
+def attach_table(path):
+    '''
+      Returns table at path from the process-wide registry, opening it on first use.
+    '''
+    if path not in _SHARED_TABLES:
+        _SHARED_TABLES[path] = open_table(path)
+    return _SHARED_TABLES[path]
+
+
+def _default_table_dir():
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return lexcache.get_cache_dir() or os.path.join(cache_home, 'sentlex')
+
+
+def _is_trusted(path):
+    '''
+      Returns True if file at path may be mapped: owned by the current user, and not writable by others.
+    '''
+    st = os.stat(path)
+    if hasattr(os, 'getuid') and st.st_uid != os.getuid():
+        return False
+    return not (st.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def attach_trusted_table(path):
+    '''
+      Returns table at path (see attach_table) if the file is trusted (see _is_trusted), or None if it is not, or
+      cannot be opened.
+    '''
+    try:
+        if not _is_trusted(path):
+            return None
+        return attach_table(path)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def shared_frequency_table(datafile, cache_dir=None):
+    '''
+      Returns memory-mapped term table with word probabilities from SUBTLEXus file datafile.
+
+      The table is built once per host in cache_dir (defaults to SENTLEX_CACHE_DIR, or sentlex under the user's
+      cache directory, ~/.cache) and mapped once per process; the OS shares its pages between all processes on the
+      host. An existing table file is only mapped if owned by the current user and not writable by others.
+      Returns None if the table cannot be built or is not trusted (eg. unwritable cache directory).
+    '''
+    st = os.stat(datafile)
+    tablename = 'subtlex-%d-%d-v%d%s' % (st.st_size, int(st.st_mtime), TABLE_VERSION, TABLE_EXT)
+    path = os.path.join(cache_dir or _default_table_dir(), tablename)
+
+    if path in _SHARED_TABLES:
+        return _SHARED_TABLES[path]
+
+    try:
+        if not os.path.exists(path):
+            write_table(path, sentlexutil.readSUBTLEX(datafile).items())
+    except (IOError, OSError, ValueError):
+        return None
+    return attach_trusted_table(path)
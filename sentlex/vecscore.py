@@ -0,0 +1,210 @@
+'''
+vecscore.py - NumPy document scoring engine
+
+Alternative implementation of the BasicDocSentiScore token scan, selected with classifier parameter engine='numpy'.
+A tagged document is first turned into parallel arrays, one entry per token found in an enabled part of speech:
+
+    positions  - 1-based position in document
+    categories - index into CATEGORIES of the lexicon part of speech used to score the token
+    pos, neg   - lexicon scores
+    counts     - occurrences of the tagged token so far (for score-once and backoff modes)
+
+Lexicon scores and frequency multipliers are looked up once per distinct term, and gathered into the arrays with
+fancy indexing. Negation flipping, frequency adjustment, backoff and atenuation are then applied to whole arrays.
+Results match the token loop to float tolerance (sums are computed pairwise rather than sequentially).
+
+Position weights (weights.PositionWeight) are gathered from their weight vector, other position weight functions
+(score_function) are applied element-wise. Per-word debug messages are not produced.
+
+Annotations match the token loop exactly: scores that remain Python ints there (eg. (0, 0) misses of unadjusted
+parts of speech) are tracked with boolean masks, and rendered as ints.
+'''
+
+from __future__ import absolute_import
+from .annotations import INT_POS, INT_NEG
+from .docscoreutil import tag_categories
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CATEGORIES = ('a', 'v', 'r', 'n')
+
+
+def _lookup(f_getter, terms, factor=None):
+    '''
+      Looks up each distinct term once, multiplying scores by factor if given. Returns (pos, neg, zero, posint, negint)
+      arrays, zero marking (0, 0) score tuples, and posint/negint scores that are Python ints.
+    '''
+    uniq = {}
+    inverse = np.fromiter([uniq.setdefault(term, len(uniq)) for term in terms], dtype=np.intp, count=len(terms))
+    upos = np.empty(len(uniq))
+    uneg = np.empty(len(uniq))
+    uzero = np.zeros(len(uniq), dtype=bool)
+    uposint = np.zeros(len(uniq), dtype=bool)
+    unegint = np.zeros(len(uniq), dtype=bool)
+    for (term, j) in uniq.items():
+        scoretuple = f_getter(term)
+        if factor is not None:
+            scoretuple = [factor * x for x in scoretuple]
+        else:
+            uzero[j] = (scoretuple == (0, 0))
+        (upos[j], uneg[j]) = scoretuple
+        (uposint[j], unegint[j]) = [isinstance(x, int) for x in scoretuple]
+    return (upos[inverse], uneg[inverse], uzero[inverse], uposint[inverse], unegint[inverse])
+
+
+def _occurrences(keys):
+    '''
+      Returns array with the running count of each key up to (and including) its position.
+    '''
+    uniq = {}
+    ids = np.fromiter([uniq.setdefault(key, len(uniq)) for key in keys], dtype=np.intp, count=len(keys))
+    order = np.argsort(ids, kind='stable')
+    sorted_ids = ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(ids)]))
+    counts = np.empty(len(ids), dtype=np.intp)
+    counts[order] = np.arange(len(ids)) - group_start + 1
+    return counts
+
+
+def scan(classifier, document, plan, state, records):
+    '''
+      Scores parsed document (a tagging.TaggedDocument) with classifier, per scoring plan, filling per-token records
+      (a TokenRecords). Detector maps must already be in state. Returns tuple (postotal, negtotal, foundcounter).
+    '''
+    if np is None:
+        raise RuntimeError('The numpy engine requires numpy.')
+
+    config = plan.config
+    L = classifier.L
+    enabled = dict(zip(CATEGORIES, (config.a, config.v, config.r, config.n)))
+    getters = (L.getadjective, L.getverb, L.getadverb, L.getnoun)
+    # adjective and verb scores are adjusted (as lists, never equal to (0, 0)), others used as found
+    factors = (config.a_adjust, config.v_adjust, None, None)
+    doclen = len(document)
+
+    # resolve token categories - the last enabled matching category scores a token (-1 if none)
+    tag_category = {}
+    positions = []
+    categories = []
+    words = []
+    tagwords = []
+    skipped = []
+    for (i, (thisword, thistag)) in enumerate(zip(document.words, document.tags), 1):
+        if (not thistag) or (not thisword):
+            skipped.append(i)  # discard corrupt data
+            continue
+        category = tag_category.get(thistag)
+        if category is None:
+            category = -1
+            for c in tag_categories(thistag):
+                if enabled[c]:
+                    category = CATEGORIES.index(c)
+            tag_category[thistag] = category
+        if category < 0:
+            continue
+        positions.append(i)
+        categories.append(category)
+        words.append(thisword.lower())
+        tagwords.append(document.token(i - 1))
+
+    nfound = len(positions)
+    positions = np.array(positions, dtype=np.intp)
+    categories = np.array(categories, dtype=np.intp)
+    pos = np.zeros(nfound)
+    neg = np.zeros(nfound)
+    zero = np.zeros(nfound, dtype=bool)
+    posint = np.zeros(nfound, dtype=bool)
+    negint = np.zeros(nfound, dtype=bool)
+
+    # gather lexicon scores per part of speech
+    for (c, f_getter) in enumerate(getters):
+        idx = np.flatnonzero(categories == c)
+        if not len(idx):
+            continue
+        terms = [words[k] for k in idx]
+        if CATEGORIES[c] == 'v':
+            lemmas = {}
+            terms = [lemmas[t] if t in lemmas else lemmas.setdefault(t, classifier._lemmatize_verb(t)) for t in terms]
+        (pos[idx], neg[idx], zero[idx], posint[idx], negint[idx]) = _lookup(f_getter, terms, factors[c])
+
+    posvals = np.zeros(nfound)
+    negvals = np.zeros(nfound)
+    if not plan.score_enabled:
+        posint[:] = negint[:] = False
+    elif nfound:
+        counts = _occurrences(tagwords)
+        eligible = np.ones(nfound, dtype=bool)
+        if plan.score_once:
+            eligible &= (counts == 1)
+        if plan.score_stop:
+            is_stop = classifier.objectiveWords.is_stop
+            eligible &= ~np.fromiter([is_stop(w) for w in words], dtype=bool, count=nfound)
+
+        # flip pos/neg values of negated words if atenuation is disabled (negation maps only)
+        if plan.flip_negation:
+            negated = np.asarray(state.document_maps['NEGATION'])[positions - 1] == 1
+            (posvals, negvals) = (np.where(negated, neg, pos), np.where(negated, pos, neg))
+            (posint, negint) = (np.where(negated, negint, posint), np.where(negated, posint, negint))
+        else:
+            (posvals, negvals) = (pos.copy(), neg.copy())
+
+        if plan.position_weight is not None:
+            w = np.asarray(plan.position_weight.vector(doclen))[positions - 1]
+            posvals = posvals * w
+            negvals = negvals * w
+            posint[:] = negint[:] = False
+        elif plan.score_function:
+            f = plan.score_function
+            index = positions.tolist()
+            # scores are passed as the token loop would, ints included
+            posres = [f(int(s) if isint else s, i, doclen) for (s, isint, i) in zip(posvals.tolist(), posint, index)]
+            negres = [f(int(s) if isint else s, i, doclen) for (s, isint, i) in zip(negvals.tolist(), negint, index)]
+            (posvals, negvals) = (np.array(posres, dtype=float), np.array(negres, dtype=float))
+            posint = np.array([isinstance(r, int) for r in posres], dtype=bool)
+            negint = np.array([isinstance(r, int) for r in negres], dtype=bool)
+
+        if plan.score_freq or plan.score_backoff:
+            posint[:] = negint[:] = False
+
+        if plan.score_freq:
+            uniq = {}
+            inverse = np.fromiter([uniq.setdefault(w, len(uniq)) for w in words], dtype=np.intp, count=nfound)
+            factor = np.fromiter([L.get_freq_factor(w, plan.freq_weight) for w in uniq], dtype=float,
+                                 count=len(uniq))[inverse]
+            posvals = posvals * factor
+            negvals = negvals * factor
+
+        if plan.score_backoff:
+            backoff = 1.0 / np.power(2.0, plan.backoff_alpha * (counts - 1))
+            posvals = posvals * backoff
+            negvals = negvals * backoff
+
+        for (map_type, at_pos, at_neg) in plan.detectors:
+            # adjust score val when inside an active window and atenuation is enabled
+            active = np.asarray(state.document_maps[map_type])[positions - 1] != 0
+            posvals = np.where(active, posvals * at_pos, posvals)
+            negvals = np.where(active, negvals * at_neg, negvals)
+            if not isinstance(at_pos, int):
+                posint &= ~active
+            if not isinstance(at_neg, int):
+                negint &= ~active
+
+        posvals = np.where(eligible, posvals, 0.0)
+        negvals = np.where(eligible, negvals, 0.0)
+        posint &= eligible
+        negint &= eligible
+
+    # adjective/verb scores are adjusted into lists by the token loop, which never compare equal to (0, 0)
+    records.unscored.extend(positions[zero].tolist())
+    records.skipped.extend(skipped)
+    records.found.extend(positions.tolist())
+    if records.annotations:
+        records.posvals.extend(posvals.tolist())
+        records.negvals.extend(negvals.tolist())
+        records.intflags.extend((posint * INT_POS | negint * INT_NEG).astype(np.uint8).tobytes())
+
+    return (float(posvals.sum()), float(negvals.sum()), nfound)
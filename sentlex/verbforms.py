@@ -0,0 +1,224 @@
+'''
+verbforms.py - Verb inflection tables
+
+Sentiment lexicons list verbs in canonical form, so inflected verbs found in documents are lemmatized before lookup.
+WordNet lemmatization is costly (and loads the WordNet corpus on first use), so this module expands the verbs of
+a lexicon into their inflected surface forms ahead of time:
+
+    walk -> walk, walks, walked, walking
+
+Regular inflections are generated by English spelling rules, and a list of common irregular verbs is included.
+
+The table stands in for WordNet, so it only holds entries known to agree with WordNetLemmatizer, which returns the
+shortest verb lemma WordNet knows for a word (eg. hopes -> hop, wound -> wind): every generated form is mapped to
+the lemma WordNet returns for it (see build_inflection_table). Without WordNet installed, the table only holds
+lemmas certain to lemmatize to themselves. Anything else goes through WordNet as before.
+
+Building the table costs the WordNet load and one lemmatization per generated form, so verified tables are kept
+with lexicon artifacts, keyed by the installed WordNet data (see wordnet_version and Lexicon.compile_verb_forms).
+'''
+
+from __future__ import absolute_import
+import re
+import hashlib
+
+import nltk
+
+from . import lexcache
+
+# common irregular verbs: lemma -> inflected forms
+IRREGULAR_VERBS = {
+    'be': ('am', 'is', 'are', 'was', 'were', 'been', 'being'),
+    'have': ('has', 'had', 'having'),
+    'do': ('does', 'did', 'done', 'doing'),
+    'go': ('goes', 'went', 'gone', 'going'),
+    'bear': ('bore', 'borne'),
+    'begin': ('began', 'begun'),
+    'bind': ('bound',),
+    'break': ('broke', 'broken'),
+    'bring': ('brought',),
+    'build': ('built',),
+    'buy': ('bought',),
+    'catch': ('caught',),
+    'choose': ('chose', 'chosen'),
+    'come': ('came',),
+    'drink': ('drank', 'drunk'),
+    'drive': ('drove', 'driven'),
+    'eat': ('ate', 'eaten'),
+    'fall': ('fell', 'fallen'),
+    'feed': ('fed',),
+    'feel': ('felt',),
+    'fight': ('fought',),
+    'find': ('found',),
+    'fly': ('flew', 'flown'),
+    'forget': ('forgot', 'forgotten'),
+    'forgive': ('forgave', 'forgiven'),
+    'get': ('got', 'gotten'),
+    'give': ('gave', 'given'),
+    'grind': ('ground',),
+    'grow': ('grew', 'grown'),
+    'hang': ('hung',),
+    'hear': ('heard',),
+    'hide': ('hid', 'hidden'),
+    'hold': ('held',),
+    'keep': ('kept',),
+    'know': ('knew', 'known'),
+    'lead': ('led',),
+    'leave': ('left',),
+    'lend': ('lent',),
+    'lie': ('lay', 'lain', 'lying'),
+    'lose': ('lost',),
+    'make': ('made',),
+    'mean': ('meant',),
+    'meet': ('met',),
+    'pay': ('paid',),
+    'ride': ('rode', 'ridden'),
+    'ring': ('rang', 'rung'),
+    'rise': ('rose', 'risen'),
+    'run': ('ran',),
+    'say': ('said',),
+    'see': ('saw', 'seen'),
+    'sell': ('sold',),
+    'send': ('sent',),
+    'shake': ('shook', 'shaken'),
+    'shine': ('shone',),
+    'shoot': ('shot',),
+    'sing': ('sang', 'sung'),
+    'sink': ('sank', 'sunk'),
+    'sit': ('sat',),
+    'sleep': ('slept',),
+    'speak': ('spoke', 'spoken'),
+    'spend': ('spent',),
+    'stand': ('stood',),
+    'steal': ('stole', 'stolen'),
+    'stick': ('stuck',),
+    'sting': ('stung',),
+    'strike': ('struck', 'stricken'),
+    'swear': ('swore', 'sworn'),
+    'swim': ('swam', 'swum'),
+    'take': ('took', 'taken'),
+    'teach': ('taught',),
+    'tear': ('tore', 'torn'),
+    'tell': ('told',),
+    'think': ('thought',),
+    'throw': ('threw', 'thrown'),
+    'understand': ('understood',),
+    'wake': ('woke', 'woken'),
+    'wear': ('wore', 'worn'),
+    'win': ('won',),
+    'wind': ('wound',),
+    'write': ('wrote', 'written'),
+}
+
+# all irregular forms
+IRREGULAR_FORMS = frozenset(form for forms in IRREGULAR_VERBS.values() for form in forms)
+
+# verb endings undone by WordNet's morphological rules (-s, -ies, -es, -ed, -ing)
+RULE_SUFFIXES = ('s', 'ed', 'ing')
+
+_VOWELS = 'aeiou'
+# consonant-vowel-consonant endings, where the final consonant may be doubled (stop -> stopped)
+_CVC = re.compile('[^aeiou][aeiou][bdfgklmnprtvz]$')
+
+
+def inflections(lemma):
+    '''
+      Returns set of inflected forms for verb lemma (3rd person singular, past tense, participles).
+      For consonant-vowel-consonant endings both plain and doubled final consonant forms are generated.
+    '''
+    forms = set()
+
+    # 3rd person singular
+    if lemma.endswith(('s', 'x', 'z', 'ch', 'sh', 'o')):
+        forms.add(lemma + 'es')
+    elif len(lemma) > 1 and lemma.endswith('y') and lemma[-2] not in _VOWELS:
+        forms.add(lemma[:-1] + 'ies')
+    else:
+        forms.add(lemma + 's')
+
+    # past tense and past participle
+    if lemma.endswith('e'):
+        forms.add(lemma + 'd')
+    elif len(lemma) > 1 and lemma.endswith('y') and lemma[-2] not in _VOWELS:
+        forms.add(lemma[:-1] + 'ied')
+    else:
+        forms.add(lemma + 'ed')
+
+    # present participle
+    if lemma.endswith('ie'):
+        forms.add(lemma[:-2] + 'ying')
+    elif lemma.endswith('e') and not lemma.endswith(('ee', 'ye', 'oe')) and len(lemma) > 2:
+        forms.add(lemma[:-1] + 'ing')
+    else:
+        forms.add(lemma + 'ing')
+
+    if _CVC.search(lemma):
+        forms.add(lemma + lemma[-1] + 'ed')
+        forms.add(lemma + lemma[-1] + 'ing')
+
+    forms.update(IRREGULAR_VERBS.get(lemma, ()))
+    return forms
+
+
+def wordnet_verb_exceptions():
+    '''
+      Returns set of forms on WordNet's verb exception list (eg. wound, fell), or None if WordNet is not installed.
+    '''
+    from nltk.corpus import wordnet
+    try:
+        wordnet.ensure_loaded()
+    except LookupError:
+        return None
+    return set(wordnet._exception_map['v'])
+
+
+def wordnet_version():
+    '''
+      Returns digest identifying the installed WordNet verb data (index and exception list) and NLTK version, read
+      without loading WordNet, or None if WordNet is not installed.
+    '''
+    h = hashlib.sha1(nltk.__version__.encode('utf-8'))
+    try:
+        for name in ('index.verb', 'verb.exc'):
+            f = nltk.data.find('corpora/wordnet/%s' % name).open()
+            try:
+                h.update(f.read())
+            finally:
+                f.close()
+    except LookupError:
+        return None
+    return h.hexdigest()
+
+
+def table_fingerprint(lemmas, version):
+    '''
+      Returns digest of a collection of verb lemmas, WordNet version (see wordnet_version) and the inflection rules
+      of this module, keying their inflection table.
+    '''
+    h = hashlib.sha1(version.encode('utf-8'))
+    h.update(lexcache.loader_fingerprint(inflections).encode('utf-8'))
+    for lemma in sorted(lemmas):
+        h.update(b'\n' + lemma.encode('utf-8'))
+    return h.hexdigest()
+
+
+def build_inflection_table(lemmas, exceptions=(), lemmatize=None):
+    '''
+      Returns dictionary mapping inflected forms (and lemmas themselves) to lemmas, for a collection of verb lemmas.
+
+      With lemmatize (a function form -> lemma, eg. WordNet's), every lemma and each of its forms (see inflections)
+      is mapped to the lemma lemmatize returns for it, which may be a verb missing from the lexicon (hopes -> hop,
+      not hope). Without it, only lemmas certain to map to themselves are included: those not in IRREGULAR_FORMS
+      or exceptions (eg. WordNet's verb exception list), and not ending with one of RULE_SUFFIXES.
+
+      Multi-word lemmas are skipped.
+    '''
+    lemmas = set(lemma for lemma in lemmas if lemma and '_' not in lemma and ' ' not in lemma)
+    if lemmatize is None:
+        excluded = IRREGULAR_FORMS.union(exceptions or ())
+        return dict((lemma, lemma) for lemma in lemmas if lemma not in excluded and not lemma.endswith(RULE_SUFFIXES))
+
+    forms = set(lemmas)
+    for lemma in lemmas:
+        forms.update(inflections(lemma))
+    return dict((form, lemmatize(form)) for form in forms)
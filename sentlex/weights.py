@@ -0,0 +1,142 @@
+'''
+weights.py - Position weights
+
+Declarative alternative to position weight functions (score_function parameter, eg. docscoreutil.scoreAdjLinear).
+A PositionWeight computes the weights of all positions of a document at once, as a vector indexed by position - 1,
+and keeps vectors in an LRU cache keyed by document length. Classifiers fetch the vector once per document and
+multiply token scores by its entries, rather than calling a function twice per token:
+
+    ds.set_parameters(score_function=weights.LinearWeight())
+    ds.set_parameters(score_function='linear')      # built-in weights by name, see WEIGHTS
+
+Weights of position i (1-based) in a document of N tokens:
+
+    LinearWeight(C)                 - i * C / N, as scoreAdjLinear
+    ModularWeight(factor, split)    - factor in positions before split * N, 1.0 afterwards, as scoreAdjModular
+    ExpDecayWeight(rate)            - exp(-rate * (N - i) / N), decaying with distance to the end of the document
+    PiecewiseWeight(segments)       - weight of the first (upto, weight) segment with i / N <= upto
+    ArrayWeight(f)                  - user-supplied f(N), returning a sequence of N weights
+
+Position weights are also callable as score functions, f(score, i, N).
+'''
+
+from __future__ import absolute_import
+import math
+
+from .caching import LRUCache
+
+# weight vectors cached per PositionWeight instance
+DEFAULT_CACHE_SIZE = 256
+
+
+class PositionWeight(object):
+    '''
+     Base class of position weights. Subclasses implement _weights(doclen), returning the weights of positions
+     1..doclen.
+    '''
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self._cache = LRUCache(maxsize)
+
+    def __call__(self, score, i, doclen):
+        return score * self.vector(doclen)[i - 1]
+
+    def vector(self, doclen):
+        '''
+         Returns tuple with weights of positions 1..doclen, computed once per document length.
+        '''
+        weights = self._cache.get(doclen)
+        if weights is None:
+            weights = tuple(float(w) for w in self._weights(doclen))
+            assert len(weights) == doclen, 'Position weights must have one entry per position'
+            self._cache.put(doclen, weights)
+        return weights
+
+    def cache_stats(self):
+        return self._cache.stats()
+
+    def _weights(self, doclen):
+        raise NotImplementedError
+
+
+class LinearWeight(PositionWeight):
+    '''
+     Weights grow linearly with position, from C / N at the start to C at the end of the document.
+    '''
+
+    def __init__(self, C=1.0, maxsize=DEFAULT_CACHE_SIZE):
+        super(LinearWeight, self).__init__(maxsize)
+        self.C = C
+
+    def _weights(self, doclen):
+        return [(i * self.C) / doclen for i in range(1, doclen + 1)]
+
+
+class ModularWeight(PositionWeight):
+    '''
+     Weight factor in the first part of the document (positions before split * N), 1.0 in the rest.
+    '''
+
+    def __init__(self, factor=0.5, split=0.5, maxsize=DEFAULT_CACHE_SIZE):
+        super(ModularWeight, self).__init__(maxsize)
+        self.factor = factor
+        self.split = split
+
+    def _weights(self, doclen):
+        start = doclen * self.split
+        return [1.0 if i >= start else self.factor for i in range(1, doclen + 1)]
+
+
+class ExpDecayWeight(PositionWeight):
+    '''
+     Weights decay exponentially with relative distance to the end of the document, from exp(-rate) to 1.0.
+    '''
+
+    def __init__(self, rate=1.0, maxsize=DEFAULT_CACHE_SIZE):
+        super(ExpDecayWeight, self).__init__(maxsize)
+        self.rate = rate
+
+    def _weights(self, doclen):
+        return [math.exp(-self.rate * (doclen - i) / float(doclen)) for i in range(1, doclen + 1)]
+
+
+class PiecewiseWeight(PositionWeight):
+    '''
+     Constant weights over segments of the document. segments is a list of (upto, weight) tuples in increasing
+     order of upto, a relative position in (0, 1]: positions past the last segment get weight 1.0.
+    '''
+
+    def __init__(self, segments, maxsize=DEFAULT_CACHE_SIZE):
+        super(PiecewiseWeight, self).__init__(maxsize)
+        self.segments = tuple(segments)
+
+    def _weights(self, doclen):
+        weights = []
+        for i in range(1, doclen + 1):
+            position = i / float(doclen)
+            weight = 1.0
+            for (upto, segment_weight) in self.segments:
+                if position <= upto:
+                    weight = segment_weight
+                    break
+            weights.append(weight)
+        return weights
+
+
+class ArrayWeight(PositionWeight):
+    '''
+     Weights computed by user function f(doclen), returning a sequence (eg. a list or numpy array) of doclen weights.
+    '''
+
+    def __init__(self, f, maxsize=DEFAULT_CACHE_SIZE):
+        super(ArrayWeight, self).__init__(maxsize)
+        self.f = f
+
+    def _weights(self, doclen):
+        return self.f(doclen)
+
+
+# built-in weights, selectable by name in classifier parameters
+WEIGHTS = {'linear': LinearWeight(),
+           'modular': ModularWeight(),
+           'expdecay': ExpDecayWeight()}
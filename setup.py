@@ -8,7 +8,7 @@ setup(
     author_email='bohana@gmail.com',
     packages=['sentlex'],
     package_data={'sentlex': ['data/*.dat', 'data/*.lex', 'data/*.txt']},
-    scripts=['bin/sentutil', 'bin/negutil'],
+    scripts=['bin/sentutil', 'bin/negutil', 'bin/sentserver'],
     url='https://github.com/bohana/sentlex',
     license='MIT',
     description='Tools and library for lexicon-based sentiment analysis.',
@@ -17,4 +17,7 @@ setup(
         'nltk >= 2.0.4',
         'six'
     ],
+    extras_require={
+        'numpy': ['numpy']
+    },
 )
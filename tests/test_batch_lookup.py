@@ -0,0 +1,36 @@
+import pytest
+
+import sentlex
+
+np = pytest.importorskip('numpy')
+
+TERMS = ['good', 'bad', 'notaword', 'good', 'excellent', 'bad']
+
+
+@pytest.fixture(scope='module')
+def moby():
+    return sentlex.MobyLexicon()
+
+
+@pytest.fixture(scope='module')
+def comp(moby):
+    L = sentlex.CompositeLexicon()
+    L.add_lexicon(sentlex.UICLexicon())
+    L.add_lexicon(moby)
+    L.set_factor(0.5)
+    return L
+
+
+@pytest.mark.parametrize('lexicon', ['moby', 'comp'])
+def test_getadjective_many(lexicon, request):
+    L = request.getfixturevalue(lexicon)
+    (pos, neg, found) = L.getadjective_many(TERMS)
+    assert pos.shape == neg.shape == found.shape == (len(TERMS),)
+    for (i, term) in enumerate(TERMS):
+        assert found[i] == L.hasadjective(term)
+        assert (pos[i], neg[i]) == tuple(L.getadjective(term))
+
+
+def test_get_many_empty(moby):
+    (pos, neg, found) = moby.get_many([], 'v')
+    assert len(pos) == len(neg) == len(found) == 0
@@ -0,0 +1,46 @@
+import sentlex
+import sentlex.sentanalysis as sentdoc
+from sentlex import caching
+
+
+def test_lru_eviction():
+    cache = caching.LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    assert cache.get('b') is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['size'] == 2
+
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / 'lemmas.json')
+    cache = caching.LemmaCache(path=path)
+    cache.put('walked', 'walk')
+    cache.save()
+
+    warm = caching.LemmaCache(path=path)
+    assert warm.get('walked') == 'walk'
+
+
+def test_shared_cache():
+    try:
+        shared = caching.share_lemma_cache()
+        moby = sentlex.MobyLexicon()
+        c1 = sentdoc.AV_AllWordsDocSentiScore(moby)
+        c2 = sentdoc.A_OnceWordsDocSentiScore(moby)
+        assert c1.lemma_cache is c2.lemma_cache is shared
+    finally:
+        caching.share_lemma_cache(False)
+    assert sentdoc.BasicDocSentiScore().lemma_cache is not shared
+
+
+def test_lemmatize_uses_cache():
+    ds = sentdoc.BasicDocSentiScore(lemma_cache=caching.LemmaCache(maxsize=10))
+    ds.lemma_cache.put('walked', 'walk')
+    assert ds._lemmatize_verb('walked') == 'walk'
+    assert ds.lemma_cache.stats()['hits'] == 1
@@ -0,0 +1,37 @@
+import pytest
+
+import sentlex
+import sentlex.sentanalysis as sentdoc
+
+DOCS = ['good/JJ movie/NN', 'bad/JJ acting/NN', 'not/DT bad/JJ ./.', 'this/DT is/VBZ great/JJ'] * 5
+
+
+@pytest.fixture(scope='module')
+def moby():
+    return sentlex.MobyLexicon()
+
+
+@pytest.fixture
+def ds(moby):
+    ds = sentdoc.BasicDocSentiScore()
+    ds.set_parameters(L=moby, a=True, v=False, negation=True)
+    return ds
+
+
+def test_classify_documents_sequential(ds):
+    expected = [ds.classify_document(doc) for doc in DOCS]
+    assert list(ds.classify_documents(DOCS)) == expected
+    assert list(ds.classify_documents(iter(DOCS), ordered=False)) == list(enumerate(expected))
+
+
+def test_classify_documents_pool(ds):
+    expected = [ds.classify_document(doc) for doc in DOCS]
+    assert list(ds.classify_documents(iter(DOCS), n_jobs=2, chunksize=3)) == expected
+
+    unordered = dict(ds.classify_documents(DOCS, n_jobs=2, ordered=False))
+    assert [unordered[i] for i in range(len(DOCS))] == expected
+
+
+def test_classify_documents_lexicon_factory(ds):
+    expected = [ds.classify_document(doc) for doc in DOCS]
+    assert list(ds.classify_documents(DOCS, n_jobs=2, chunksize=4, lexicon_factory=sentlex.MobyLexicon)) == expected
@@ -34,3 +34,29 @@ def test_factor(comp):
     nval = comp.getadjective('undeniable')[1]
     comp.set_factor(0.25)
     assert comp.getadjective('undeniable')[1] < nval
+
+
+def _build_composite(compiled):
+    L = sentlex.CompositeLexicon(compiled=compiled)
+    L.add_lexicon(sentlex.UICLexicon())
+    L.add_lexicon(sentlex.MobyLexicon())
+    return L
+
+
+def test_compiled_index():
+    plain = _build_composite(False)
+    comp = _build_composite(True)
+    plain.set_factor(0.5)
+    comp.set_factor(0.5)
+    comp.set_bias(1.0, 0.8)
+    plain.set_bias(1.0, 0.8)
+
+    terms = list(plain._terms('a')) + ['notaword']
+    for term in terms:
+        assert comp.hasadjective(term) == plain.hasadjective(term)
+        assert comp.getadjective(term) == plain.getadjective(term)
+
+    # changes to factor rebuild the index
+    comp.set_factor(0.25)
+    plain.set_factor(0.25)
+    assert all(comp.getadjective(t) == plain.getadjective(t) for t in terms)
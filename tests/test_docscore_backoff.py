@@ -30,3 +30,15 @@ def test_backoff(ds):
 def test_backoff_badinput(ds):
     # finally check for bad input
     assert ds._repeated_backoff(1.0, 0.0, 1.0) == 0.0
+
+
+def test_backoff_table(ds):
+    ds.set_parameters(score_mode=ds.SCOREBACKOFF, backoff_alpha=0.5)
+    table = ds.plan.backoff_table
+    assert table is sentdoc.backoff_table(0.5)
+    assert (table[0], table[1], table[3]) == (0.0, 1.0, 0.5)
+
+    # repeat counts past the table, and multipliers too small to represent
+    repeat = sentdoc.BACKOFF_TABLE_SIZE + 10
+    assert ds._repeated_backoff(1.0, repeat, 0.5) == 1.0 / (2 ** (0.5 * (repeat - 1)))
+    assert ds._repeated_backoff(1.0, 10 ** 6, 4.0) == 0.0
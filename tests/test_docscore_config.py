@@ -10,3 +10,36 @@ def basic_docscore():
 
 def test_default_config(basic_docscore):
     assert basic_docscore.config.negation
+
+
+@pytest.fixture
+def basic():
+    from sentlex.sentanalysis import BasicDocSentiScore
+    return BasicDocSentiScore()
+
+
+def test_config_cached(basic):
+    assert basic.config is basic.config
+    plan = basic.plan
+    assert basic.plan is plan
+    basic.set_parameters(score_freq=True)
+    assert basic.plan is not plan
+    assert basic.plan.score_freq
+
+
+def test_plan(basic):
+    from sentlex.docscoreutil import scoreAdjLinear
+    basic.set_parameters(score_mode=basic.SCOREONCE, negation=True, atenuation=False)
+    assert basic.plan.score_once and basic.plan.flip_negation
+    assert basic.plan.score_function is None
+    assert basic.plan.detectors == ()
+
+    basic.set_parameters(atenuation=True, at_pos=0.5, at_neg=2.0, score_function=scoreAdjLinear)
+    assert not basic.plan.flip_negation
+    assert basic.plan.detectors == (('NEGATION', 0.5, 2.0),)
+    assert basic.plan.score_function is scoreAdjLinear
+
+
+def test_plan_score_function_name(basic):
+    basic.set_parameters(score_function='noop')
+    assert basic.plan.score_function is None
@@ -0,0 +1,61 @@
+import pytest
+
+import sentlex
+import sentlex.sentanalysis_potts as sentpotts
+from sentlex import caching
+from sentlex import docscoreutil
+from sentlex.sentanalysis_ensemble import EnsembleDocSentiScore
+
+DOCS = ['this/DT is/VBZ not/RB a/DT good/JJ movie/NN ./.',
+        'a/DT great/JJ and/CC nice/JJ plot/NN ,/, but/CC awful/JJ acting/NN',
+        'I/PRP hated/VBD it/PRP ,/, a/DT bad/JJ bad/JJ movie/NN']
+
+
+@pytest.fixture(scope='module')
+def lexicons():
+    return (sentlex.MobyLexicon(), sentlex.UICLexicon())
+
+
+@pytest.fixture
+def lemmas():
+    lemma_cache = caching.LemmaCache()
+    lemma_cache.put('is', 'be')
+    lemma_cache.put('hated', 'hate')
+    return lemma_cache
+
+
+@pytest.fixture
+def ensemble(lexicons, lemmas):
+    (moby, uic) = lexicons
+    potts = sentpotts.PottsDocSentiScore(lemma_cache=lemmas)
+    potts.set_parameters(L=moby, a=True, v=True, negation=True, negation_window=3)
+    return EnsembleDocSentiScore([(moby, {'a': True, 'v': False, 'negation': True}),
+                                  (uic, {'a': True, 'v': True, 'negation': True, 'score_mode': 1}),
+                                  potts], lemma_cache=lemmas)
+
+
+def test_member_scores(ensemble):
+    for doc in DOCS:
+        results = ensemble.score_document(doc, annotations=True)
+        assert len(results) == 3
+        for (member, result) in zip(ensemble.members, results):
+            assert result.as_dict() == member.score_document(doc, annotations=True).as_dict()
+
+
+def test_voting(ensemble):
+    expected = [docscoreutil.majorityVote([m.score_document(doc).scores for m in ensemble.members], 0.0, 0.0)
+                for doc in DOCS]
+    assert [ensemble.classify_document(doc) for doc in DOCS] == expected
+    assert list(ensemble.classify_documents(iter(DOCS))) == expected
+
+    ensemble.vote = docscoreutil.sumVote
+    assert ensemble.classify_document(DOCS[0]) == docscoreutil.sumVote(
+        [m.score_document(DOCS[0]).scores for m in ensemble.members], 0.0, 0.0)
+
+
+def test_shared_negation(ensemble):
+    (tagged_doc, document) = ensemble.members[0]._parse(DOCS[0])
+    map_cache = {}
+    maps = [m._run_detectors(document, m.config, map_cache) for m in ensemble.members]
+    assert len(map_cache) == 2
+    assert maps[0]['NEGATION'] is maps[1]['NEGATION']
@@ -0,0 +1,40 @@
+import math
+
+import pytest
+
+import sentlex
+import sentlex.sentanalysis as sentdoc
+
+DOC = 'a/DT good/JJ movie/NN ,/, not/RB bad/JJ ,/, good/JJ and/CC xyzzyish/JJ'
+
+
+@pytest.fixture(scope='module')
+def moby():
+    return sentlex.MobyLexicon()
+
+
+def test_freq_factor(moby):
+    p = moby.get_freq('good')
+    assert moby.get_freq_factor('good') == -math.log(p, 2)
+    assert moby.get_freq_factor('good', 0.5) == 0.5 + 0.5 * -math.log(p, 2)
+    assert moby.get_freq_factor('xyzzyish') == sentlex.freq_factor(sentlex.UNKNOWN_FREQ)
+    assert 'good' in moby._freq_factors[0.5]
+    assert 'xyzzyish' not in moby._freq_factors[1.0]
+
+
+@pytest.mark.parametrize('freq_weight', [1.0, 0.5, 0.0])
+def test_freq_weight(moby, freq_weight):
+    ds = sentdoc.BasicDocSentiScore()
+    ds.set_parameters(L=moby, a=True, v=False, negation=True, score_freq=True, freq_weight=freq_weight)
+    expected = [0.0, 0.0]
+    for (tagword, flag) in zip(DOC.split(), ds._run_detectors(DOC.split())['NEGATION']):
+        (word, tag) = tagword.split('/')
+        if tag == 'JJ':
+            scores = moby.getadjective(word)
+            scores = scores[::-1] if flag else scores
+            for k in (0, 1):
+                expected[k] += ds._freq_adjust(scores[k], moby.get_freq(word), freq_weight)
+
+    assert ds.score_document(DOC).scores == pytest.approx(expected)
+    ds.set_parameters(engine='numpy')
+    assert ds.score_document(DOC).scores == pytest.approx(expected)
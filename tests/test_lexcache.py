@@ -0,0 +1,84 @@
+import os
+import shutil
+
+import pytest
+
+import sentlex
+import sentlex.sentlexutil as util
+from sentlex import lexcache
+
+
+DATADIR = os.path.join(os.path.dirname(os.path.abspath(sentlex.__file__)), 'data')
+
+
+def test_cached_load(tmp_path):
+    L1 = sentlex.MobyLexicon(cache_dir=str(tmp_path))
+    assert len(list(tmp_path.glob('*' + lexcache.ARTIFACT_EXT))) == 1
+
+    L2 = sentlex.MobyLexicon(cache_dir=str(tmp_path))
+    assert L2.is_loaded and L2.is_compiled
+    assert L2.A == L1.A and L2.N == L1.N
+    assert L2.getadjective('good') == L1.getadjective('good')
+    assert L2.get_freq('good') == L1.get_freq('good')
+
+
+def test_cached_frequency(tmp_path, monkeypatch):
+    L1 = sentlex.MobyLexicon(cache_dir=str(tmp_path))
+
+    # a cached load takes the frequency table from the artifact, without reading SUBTLEXus
+    def readSUBTLEX(datafile):
+        raise AssertionError('SUBTLEXus read on cached load')
+    monkeypatch.setattr(sentlex.sentlex, '_FREQUENCY_DICTS', {})
+    monkeypatch.setattr(util, 'readSUBTLEX', readSUBTLEX)
+    L2 = sentlex.MobyLexicon(cache_dir=str(tmp_path))
+    assert L2.is_compiled
+    assert L2.get_freq('good') == L1.get_freq('good')
+    assert L2.LexFreq == L1.LexFreq
+
+
+def test_rebuild_on_source_change(tmp_path):
+    datafile = str(tmp_path / 'uic.lex')
+    shutil.copy(os.path.join(DATADIR, 'uic.lex'), datafile)
+    L = sentlex.ResourceLexicon('UIC', util.readUICAll)
+    L.load(datafile, cache_dir=str(tmp_path))
+    assert not L.hasadjective('sentlexy')
+
+    with open(datafile, 'a') as f:
+        f.write('pos,sentlexy,a\n')
+    L = sentlex.ResourceLexicon('UIC', util.readUICAll)
+    L.load(datafile, cache_dir=str(tmp_path))
+    assert L.hasadjective('sentlexy')
+
+
+def test_loader_fingerprint():
+    assert lexcache.loader_fingerprint(util.readUICAll) != lexcache.loader_fingerprint(util.readMobyAll)
+    assert lexcache.loader_fingerprint(util.readUIC) != lexcache.loader_fingerprint(util.as_multi_pos(util.readUIC))
+
+
+def test_save_load_artifact(tmp_path):
+    path = str(tmp_path / 'uic.lexc')
+    L = sentlex.UICLexicon()
+    L.save_artifact(path)
+
+    L2 = sentlex.ResourceLexicon('UIC')
+    L2.load_artifact(path)
+    assert L2.is_loaded
+    assert L2.getverb('abolish') == L.getverb('abolish')
+
+
+@pytest.mark.parametrize('corrupt', [lambda data: data[:len(data) // 2], lambda data: b'garbage' * 100])
+def test_corrupt_artifact(tmp_path, corrupt):
+    L1 = sentlex.MobyLexicon(cache_dir=str(tmp_path))
+    (artifact,) = tmp_path.glob('*' + lexcache.ARTIFACT_EXT)
+    data = artifact.read_bytes()
+    artifact.write_bytes(corrupt(data))
+    assert lexcache.load_artifact(str(artifact)) is None
+
+    # a bad artifact is a cache miss: the lexicon is parsed again and the artifact rewritten
+    L2 = sentlex.MobyLexicon(cache_dir=str(tmp_path))
+    assert L2.is_loaded and L2.A == L1.A
+    assert artifact.read_bytes() == data
+
+    artifact.write_bytes(corrupt(data))
+    with pytest.raises(RuntimeError):
+        sentlex.ResourceLexicon('Moby-GB').load_artifact(str(artifact))
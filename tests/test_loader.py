@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+import sentlex
+import sentlex.sentlexutil as util
+
+
+DATADIR = os.path.join(os.path.dirname(os.path.abspath(sentlex.__file__)), 'data')
+
+
+@pytest.mark.parametrize('reader, reader_all, datafile', [
+    (util.readMoby, util.readMobyAll, 'GB1_S.lex'),
+    (util.readUIC, util.readUICAll, 'uic.lex')])
+def test_single_pass_reader(reader, reader_all, datafile):
+    datapath = os.path.join(DATADIR, datafile)
+    D = reader_all(datapath)
+    for postag in util.POS_TAGS:
+        assert D[postag] == reader(postag, datapath)
+
+
+def test_legacy_loader():
+    L = sentlex.ResourceLexicon('legacy', util.readUIC)
+    L.load(os.path.join(DATADIR, 'uic.lex'))
+    assert L.getadjective('good') == sentlex.UICLexicon().getadjective('good')
+
+
+def test_adapter():
+    assert util.as_multi_pos(util.readUICAll) is util.readUICAll
+    assert util.as_multi_pos(util.readUIC).multi_pos
+
+
+@pytest.mark.parametrize('compress', ['gzip', 'bz2'])
+def test_compressed_input(tmp_path, compress):
+    module = __import__(compress)
+    datafile = str(tmp_path / 'uic.lex.z')
+    with open(os.path.join(DATADIR, 'uic.lex'), 'rb') as fin:
+        with module.open(datafile, 'wb') as fout:
+            fout.write(fin.read())
+    assert util.readUICAll(datafile) == util.readUICAll(os.path.join(DATADIR, 'uic.lex'))
+
+
+def test_whitelist():
+    L = sentlex.ResourceLexicon('UIC', util.readUICAll)
+    L.load(os.path.join(DATADIR, 'uic.lex'), terms=['good', 'abolish'])
+    assert L.hasadjective('good')
+    assert L.hasverb('abolish')
+    assert not L.hasadjective('bad')
+
+    L = sentlex.ResourceLexicon('legacy', util.readUIC)
+    L.load(os.path.join(DATADIR, 'uic.lex'), terms=['good'])
+    assert L.hasadjective('good') and not L.hasadjective('bad')
+
+
+def test_subjectivity_clues(tmp_path):
+    datafile = str(tmp_path / 'clues.tff')
+    with open(datafile, 'w') as f:
+        f.write('type=strongsubj len=1 word1=good pos1=adj stemmed1=n priorpolarity=positive\n'
+                'type=weaksubj len=1 word1=good pos1=adj stemmed1=n priorpolarity=both\n'
+                'type=weaksubj len=1 word1=fair pos1=anypos stemmed1=n priorpolarity=weakneg\n'
+                'type=weaksubj len=1 word1=plain pos1=adj stemmed1=n priorpolarity=neutral\n')
+    D = util.readSubjectivityCluesAll(datafile)
+    # only neutral entries are skipped
+    assert D['a']['good'] == [('good', 1, 0), ('good', 0, 0)]
+    assert all(D[postag]['fair'] == [('fair', 0, 0)] for postag in util.POS_TAGS)
+    assert 'plain' not in D['a']
+    assert D['a'] == util.readSubjectivityClues('a', datafile)
+
+
+@pytest.mark.parametrize('reader_all', [util.readSWNAll, util.readSWN3All, util.readSubjectivityCluesAll,
+                                        util.readMobyAll, util.readGIAll, util.readUICAll])
+def test_no_datafile(reader_all):
+    assert reader_all(None) == dict((postag, {}) for postag in util.POS_TAGS)
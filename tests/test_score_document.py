@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+import sentlex
+import sentlex.sentanalysis_potts as sentpotts
+
+DOCS = ['good/JJ movie/NN', 'not/DT bad/JJ ./. awful/JJ', 'this/DT is/VBZ great/JJ and/CC nice/JJ'] * 10
+
+
+@pytest.fixture(scope='module')
+def moby():
+    return sentlex.MobyLexicon()
+
+
+@pytest.fixture
+def ds(moby):
+    ds = sentpotts.PottsDocSentiScore()
+    ds.set_parameters(L=moby, a=True, v=False, negation=True, score_mode=ds.SCOREBACKOFF, backoff_alpha=1.0)
+    return ds
+
+
+def test_score_document(ds):
+    doc = 'good/JJ good/JJ not/DT bad/JJ ./.'
+    result = ds.score_document(doc, annotations=True)
+    assert result.scores == ds.classify_document(doc, annotations=True)
+    assert result.doc is None
+    assert ds.score_document(doc).annotated_doc is None
+    assert ds.score_document(doc, keep_doc=True).as_dict() == dict(ds.resultdata, annotated_doc=None)
+    assert result.annotated_doc == ds.resultdata['annotated_doc']
+
+    with pytest.raises(AttributeError):
+        result.resultpos = 1.0
+
+
+def test_score_document_threads(ds):
+    expected = [ds.classify_document(doc) for doc in DOCS]
+    results = [None] * len(DOCS)
+
+    def worker(offset):
+        for i in range(offset, len(DOCS), 4):
+            results[i] = ds.score_document(DOCS[i]).scores
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == expected
+
+
+def test_lazy_annotations(ds, tmpdir):
+    doc = 'good/JJ good/JJ not/DT bad/JJ ./. broken/ movie/NN'
+    ds.classify_document(doc, annotations=True)
+    result = ds.score_document(doc, annotations=True)
+    assert result._annotated_doc is None
+    assert result.annotated_doc == ds.resultdata['annotated_doc']
+    assert result.found_list == ds.resultdata['found_list']
+    assert result.unscored_list == ds.resultdata['unscored_list']
+
+    path = str(tmpdir.join('annotations.txt'))
+    with open(path, 'w') as f:
+        ds.score_document(doc, annotations=True).write_annotations(f)
+    with open(path) as f:
+        assert f.read() == ds.resultdata['annotated_doc']
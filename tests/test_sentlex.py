@@ -44,3 +44,12 @@ def swn3():
     ('want', 0.0027591764705882354)])
 def test_frequency(swn3, word, freq):
     assert swn3.get_freq(word) == freq
+
+
+def test_compiled_scores(moby):
+    L = sentlex.MobyLexicon(compiled=True)
+    for pos, getter in [('a', 'getadjective'), ('v', 'getverb'), ('r', 'getadverb'), ('n', 'getnoun')]:
+        for term in list(L._posdict(pos))[:50] + ['notaword']:
+            assert getattr(L, getter)(term) == getattr(moby, getter)(term)
+    assert L.get_senses('good', 'a') == moby.A['good']
+    assert L.get_senses('notaword', 'a') == []
@@ -0,0 +1,96 @@
+import os
+import json
+import socket
+import threading
+
+import pytest
+from six.moves import http_client
+
+import sentlex
+import sentlex.sentanalysis as sentdoc
+from sentlex import server as sentserver
+
+
+@pytest.fixture(scope='module')
+def ds():
+    ds = sentdoc.BasicDocSentiScore()
+    ds.set_parameters(L=sentlex.MobyLexicon(), a=True, v=False, negation=True)
+    return ds
+
+
+@pytest.fixture
+def http_server(ds):
+    server = sentserver.create_server(ds, port=0, max_latency=0.01)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def post(server, request):
+    conn = http_client.HTTPConnection(*server.server_address[:2])
+    conn.request('POST', '/score', json.dumps(request), {'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    data = json.loads(response.read().decode('utf-8'))
+    conn.close()
+    return (response.status, data)
+
+
+def test_score(ds, http_server):
+    (status, data) = post(http_server, {'doc': 'good/JJ movie/NN'})
+    assert status == 200
+    assert tuple(data['scores']) == ds.score_document('good/JJ movie/NN').scores
+
+    (status, data) = post(http_server, {'docs': ['good/JJ', 'not/DT bad/JJ'], 'resultdata': True})
+    assert status == 200
+    assert [tuple(r['scores']) for r in data['results']] == [ds.score_document(d).scores for d in ['good/JJ', 'not/DT bad/JJ']]
+    assert data['results'][1]['resultdata']['tokens_negated'] == ds.score_document('not/DT bad/JJ').tokens_negated
+
+    (status, data) = post(http_server, {'text': 'good'})
+    assert status == 400
+
+
+def test_warm_lemmatizer():
+    ds = sentdoc.BasicDocSentiScore()
+    ds.set_parameters(L=sentlex.MobyLexicon(), a=True, v=True)
+    lemmatized = []
+    ds.wnl.lemmatize = lambda word, pos='n': lemmatized.append(word) or word
+    server = sentserver.create_server(ds, port=0)
+    server.server_close()
+    assert lemmatized
+    assert ds.L.verb_forms is not None
+
+
+def test_socket_path(ds, tmp_path):
+    path = tmp_path / 'notasocket'
+    path.write_text(u'data')
+    with pytest.raises(RuntimeError):
+        sentserver.create_server(ds, socket_path=str(path))
+    assert path.read_text() == u'data'
+
+    # a stale socket is replaced
+    path = str(tmp_path / 'sentlex.sock')
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+    server = sentserver.create_server(ds, socket_path=path)
+    server.server_close()
+    assert not os.path.exists(path)
+
+
+def test_micro_batching():
+    batches = []
+
+    def f_batch(items):
+        batches.append(len(items))
+        return [2 * x for x in items]
+
+    batcher = sentserver.MicroBatcher(f_batch, max_batch=8, max_latency=0.2)
+    futures = batcher.submit_many(range(20))
+    assert [f.result() for f in futures] == [2 * x for x in range(20)]
+    batcher.close()
+    assert sum(batches) == 20
+    assert max(batches) <= 8
+    assert len(batches) < 20
@@ -0,0 +1,98 @@
+import os
+import pickle
+import multiprocessing
+
+import pytest
+
+import sentlex
+from sentlex import sharedlex
+
+
+@pytest.fixture(scope='module')
+def moby():
+    return sentlex.MobyLexicon()
+
+
+@pytest.fixture
+def shared(moby, tmp_path):
+    S = sharedlex.publish(moby, str(tmp_path / 'moby.slsh'))
+    yield S
+    S.unlink()
+
+
+def test_shared_lookups(moby, shared):
+    assert shared.is_loaded and shared.is_compiled
+    assert shared.get_name() == moby.get_name()
+    for (pos, f_checker, f_getter) in moby._POS_FUNCS:
+        for term in list(moby._terms(pos)) + ['notaword']:
+            assert getattr(shared, f_checker)(term) == getattr(moby, f_checker)(term)
+            assert getattr(shared, f_getter)(term) == getattr(moby, f_getter)(term)
+    assert shared.get_freq('good') == moby.get_freq('good')
+
+
+def test_shared_composite(tmp_path):
+    L = sentlex.CompositeLexicon()
+    L.add_lexicon(sentlex.UICLexicon())
+    L.add_lexicon(sentlex.MobyLexicon())
+    L.set_factor(0.5)
+    L.compile_frequency()
+    S = sharedlex.publish(L, str(tmp_path / 'comp.slsh'))
+    assert S.getadjective('bad') == L.getadjective('bad')
+    assert S.hasverb('abolish')
+
+
+def _worker_lookup(L):
+    return L.getadjective('good')
+
+
+def test_pickle_attach(shared, moby):
+    S = pickle.loads(pickle.dumps(shared))
+    assert S.path == shared.path
+    assert S.getadjective('good') == moby.getadjective('good')
+
+    pool = multiprocessing.Pool(2)
+    try:
+        assert pool.map(_worker_lookup, [shared] * 4) == [moby.getadjective('good')] * 4
+    finally:
+        pool.close()
+        pool.join()
+
+
+def test_memo(moby, tmp_path):
+    S = sharedlex.publish(moby, str(tmp_path / 'memo.slsh'))
+    S = sharedlex.attach(S.path, memo_size=2)
+    table = S._tables['a']
+    assert S.getadjective('good') == moby.getadjective('good')
+    assert S.getadjective('good') == moby.getadjective('good')
+    assert not S.hasadjective('notaword') and not S.hasadjective('notaword')
+    assert len(table._memo) == 2
+
+    # a full memo is emptied, lookups stay correct
+    assert S.getadjective('bad') == moby.getadjective('bad')
+    assert len(table._memo) == 1
+    assert pickle.loads(pickle.dumps(S)).memo_size == 2
+    S.unlink()
+
+
+def test_shared_frequency_table(moby, tmp_path, monkeypatch):
+    monkeypatch.setenv('SENTLEX_CACHE_DIR', str(tmp_path))
+    L = sentlex.UICLexicon()
+    L.compile_frequency(shared=True)
+    S = sharedlex.publish(L, str(tmp_path / 'uic.slsh'))
+    assert S.LexFreq.table is L.LexFreq
+    assert S.get_freq('good') == moby.get_freq('good')
+
+    # a frequency table file writable by others is not mapped, workers use the frequency dictionary instead
+    os.chmod(L.LexFreq.path, 0o666)
+    S = sharedlex.attach(S.path)
+    assert isinstance(S.LexFreq, dict)
+    assert S.is_compiled and S.get_freq('good') == moby.get_freq('good')
+    S.unlink()
+
+
+def test_no_memo(moby, tmp_path):
+    S = sharedlex.publish(moby, str(tmp_path / 'nomemo.slsh'))
+    S = sharedlex.attach(S.path, memo_size=0)
+    assert S.getadjective('good') == moby.getadjective('good')
+    assert not S._tables['a']._memo
+    S.unlink()
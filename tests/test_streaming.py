@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+import sentlex
+import sentlex.sentanalysis as sentdoc
+import sentlex.sentanalysis_potts as sentpotts
+from sentlex.docscoreutil import scoreAdjLinear
+from sentlex import negdetect
+
+DOC = ('this/DT is/VBZ not/RB a/DT good/JJ movie/NN ,/, it/PRP was/VBD bad/JJ and/CC awful/JJ but/CC good/JJ '
+       'good/JJ nice/JJ ./. no/DT excellent/JJ terrible/JJ acting/NN here/RB well/RB not/RB only/RB good/JJ')
+
+
+@pytest.fixture(scope='module')
+def moby():
+    return sentlex.MobyLexicon()
+
+
+def chunks(tokens, seed):
+    rnd = random.Random(seed)
+    k = 0
+    while k < len(tokens):
+        n = rnd.randint(0, 4)
+        yield tokens[k:k + n]
+        k += n
+
+
+def test_negation_scanner():
+    tokens = DOC.split()
+    for window in (1, 3, 5):
+        scanner = negdetect.NegationScanner(window)
+        flags = []
+        for chunk in chunks(tokens, window):
+            flags.extend(scanner.feed(chunk))
+        assert flags + scanner.close() == negdetect.getNegationArray(tokens, window)
+
+
+@pytest.mark.parametrize('cls', [sentdoc.BasicDocSentiScore, sentpotts.PottsDocSentiScore])
+@pytest.mark.parametrize('mode', [0, 1, 2])
+def test_stream_matches_document(moby, cls, mode):
+    ds = cls()
+    ds.set_parameters(L=moby, a=True, v=False, r=True, n=True, score_mode=mode, backoff_alpha=0.5, score_stop=True)
+    expected = ds.score_document(DOC)
+
+    stream = ds.stream(keep_unscored=True)
+    for chunk in chunks(DOC.split(), mode):
+        stream.feed(chunk)
+    result = stream.close()
+    assert result.scores == expected.scores
+    assert result.tokens_found == expected.tokens_found
+    assert result.tokens_negated == expected.tokens_negated
+    assert result.found_list == expected.found_list
+    assert result.unscored_list == expected.unscored_list
+
+
+def test_stream_memory(moby):
+    ds = sentpotts.PottsDocSentiScore()
+    ds.set_parameters(L=moby, a=True, v=False, r=True, n=True)
+    stream = ds.stream()
+    for _ in range(50):
+        stream.feed(DOC)
+    result = stream.close()
+    assert result.scores == ds.score_document(' '.join([DOC] * 50)).scores
+    # only negation counts are kept, and unscored tokens are not listed by default
+    vNEG = stream.state.document_maps['NEGATION']
+    assert len(vNEG) == 50 * len(DOC.split())
+    assert vNEG.transitions == negdetect.negated_instances(negdetect.getNegationArray(' '.join([DOC] * 50).split(), 5))
+    assert result.unscored_list == []
+
+
+def test_negation_tally():
+    flags = [0, 1, 1, 0, 0, 1, 0, 1]
+    tally = negdetect.NegationTally()
+    for flag in flags:
+        tally.append(flag)
+    assert len(tally) == len(flags)
+    assert tally[len(flags) - 1] == 1
+    assert negdetect.negated_instances(tally) == negdetect.negated_instances(flags) == 3
+    with pytest.raises(IndexError):
+        tally[0]
+
+
+def test_stream_position_weights(moby):
+    ds = sentdoc.BasicDocSentiScore()
+    ds.set_parameters(L=moby, a=True, v=False, score_function=scoreAdjLinear)
+    with pytest.raises(RuntimeError):
+        ds.stream()
+
+    stream = ds.stream(doclen=len(DOC.split()))
+    stream.feed(DOC)
+    assert stream.close().scores == ds.score_document(DOC).scores
+
+    # positions past doclen are rejected for plain score functions too
+    stream = ds.stream(doclen=len(DOC.split()) - 5)
+    with pytest.raises(RuntimeError):
+        stream.feed(DOC)
+        stream.close()
@@ -0,0 +1,53 @@
+import pytest
+
+import sentlex
+import sentlex.sentanalysis_potts as sentpotts
+from sentlex import caching
+from sentlex import sweep
+from sentlex.docprep import PreparedDocument
+
+DOCS = ['this/DT is/VBZ not/RB a/DT good/JJ movie/NN ,/, it/PRP was/VBD bad/JJ and/CC awful/JJ',
+        'good/JJ good/JJ nice/JJ ./. no/DT excellent/JJ terrible/JJ acting/NN here/RB well/RB broken/',
+        'not/RB only/RB good/JJ but/CC great/JJ']
+
+
+@pytest.fixture(scope='module')
+def moby():
+    return sentlex.MobyLexicon()
+
+
+@pytest.fixture
+def ds(moby):
+    lemmas = caching.LemmaCache()
+    for (word, lemma) in [('is', 'be'), ('was', 'be')]:
+        lemmas.put(word, lemma)
+    ds = sentpotts.PottsDocSentiScore(lemma_cache=lemmas)
+    ds.set_parameters(L=moby, a=True, v=False, r=True, n=True, negation=True)
+    return ds
+
+
+def test_score_prepared(ds):
+    for doc in DOCS:
+        prepared = PreparedDocument.from_document(ds, doc)
+        for (window, mode, at, a, v) in [(1, 0, False, True, True), (5, 1, True, True, False), (3, 2, False, False, True)]:
+            ds.set_parameters(negation_window=window, score_mode=mode, atenuation=at, a=a, v=v, at_neg=1.5,
+                              backoff_alpha=0.5, v_adjust=0.5, score_freq=(mode == 2))
+            expected = ds.score_document(doc, annotations=True)
+            result = ds.score_prepared(prepared, annotations=True)
+            assert result.as_dict() == expected.as_dict()
+
+
+def test_sweep(ds):
+    points = sweep.grid(negation_window=[2, 5], backoff_alpha=[0.0, 1.0], score_mode=[ds.SCOREBACKOFF])
+    assert len(points) == 4
+    config = ds.config
+
+    table = sweep.run(ds, DOCS, points)
+    assert ds.config == config
+    assert len(table) == len(points) * len(DOCS)
+    assert sweep.run(ds, DOCS, points, n_jobs=2) == table
+
+    for row in table:
+        ds.set_parameters(negation_window=row['negation_window'], backoff_alpha=row['backoff_alpha'],
+                          score_mode=row['score_mode'])
+        assert (row['resultpos'], row['resultneg']) == ds.score_document(DOCS[row['doc']]).scores
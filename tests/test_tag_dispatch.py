@@ -0,0 +1,30 @@
+import re
+
+from sentlex import docscoreutil
+
+
+def test_tag_categories_match_patterns():
+    for tag in docscoreutil.PENN_TAGS + ('XJJ', 'NNPX', 'FOO'):
+        expected = tuple(c for (c, p) in docscoreutil.TAG_PATTERNS if re.search(p, tag))
+        assert docscoreutil.tag_categories(tag) == expected
+
+    assert docscoreutil.tag_categories('JJR') == ('a',)
+    assert docscoreutil.tag_categories('WRB') == ('r',)
+    assert docscoreutil.tag_categories('NNS') == ()
+
+
+def test_legacy_tag_categories():
+    assert docscoreutil.legacy_tag_categories('good/JJ') == {'a': -3}
+    assert docscoreutil.legacy_tag_categories('better_JJR') == {'a': -4}
+    assert docscoreutil.legacy_tag_categories('where/WRB') == {}
+    assert docscoreutil.legacy_tag_categories('a/b/NN') == {'n': -3}
+
+
+def test_tag_memo_bounded():
+    penn = dict(docscoreutil.TAG_CATEGORIES)
+    for i in range(docscoreutil.TAG_MEMO_SIZE + 10):
+        assert docscoreutil.tag_categories('X%dJJ' % i) == ('a',)
+        docscoreutil.legacy_tag_categories('w/%04d' % i)
+    assert docscoreutil.TAG_CATEGORIES == penn
+    assert len(docscoreutil._OTHER_TAG_CATEGORIES) == docscoreutil.TAG_MEMO_SIZE
+    assert len(docscoreutil._LEGACY_CATEGORIES) <= docscoreutil.TAG_MEMO_SIZE
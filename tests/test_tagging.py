@@ -0,0 +1,117 @@
+import pickle
+
+import pytest
+
+import sentlex
+import sentlex.sentanalysis as sentdoc
+from sentlex import caching
+from sentlex import tagging
+from sentlex import docprep
+from sentlex import negdetect
+from sentlex import server
+from sentlex import sweep
+
+DOCS = ['not a good movie', 'a bad movie', 'not a good movie', 'nice and good']
+
+
+@pytest.fixture(scope='module')
+def moby():
+    return sentlex.MobyLexicon()
+
+
+@pytest.fixture
+def tagger(monkeypatch):
+    # stand-in for NLTK's tokenizer and tagger, counting tagger calls
+    calls = []
+
+    def pos_tag_sents(sentences):
+        calls.append(len(sentences))
+        return [[(w, 'JJ' if w in ('good', 'bad', 'nice') else 'NN') for w in sentence] for sentence in sentences]
+
+    monkeypatch.setattr(tagging.nltk, 'word_tokenize', lambda doc: doc.split())
+    monkeypatch.setattr(tagging.nltk, 'pos_tag_sents', pos_tag_sents)
+    return calls
+
+
+def test_tag_documents(tagger):
+    cache = caching.TagCache(maxsize=10)
+    tagged = tagging.tag_documents(DOCS, cache)
+    assert tagger == [3]
+    assert tagged[0] == (('not', 'NN'), ('a', 'NN'), ('good', 'JJ'), ('movie', 'NN'))
+    assert tagged[0] is tagged[2]
+
+    assert tagging.tag_documents(DOCS, cache) == tagged
+    assert tagger == [3]
+    assert cache.stats()['hits'] == 4
+
+    copy = pickle.loads(pickle.dumps(cache))
+    assert copy.get(tagging.content_key(DOCS[1])) == tagged[1]
+
+
+def test_disk_tier(tagger, tmp_path):
+    path = str(tmp_path / 'tags')
+    cache = caching.TagCache(disk_path=path)
+    tagged = tagging.tag_documents(DOCS, cache)
+    cache.close()
+
+    warm = caching.TagCache(disk_path=path)
+    assert tagging.tag_documents(DOCS, warm) == tagged
+    assert tagger == [3]
+    assert warm.stats()['disk_hits'] == 3
+    warm.close()
+
+
+def test_untagged_scoring(tagger, moby):
+    ds = sentdoc.BasicDocSentiScore()
+    ds.set_parameters(L=moby, a=True, v=False, negation=True)
+    expected = [ds.classify_document(' '.join(tagging.tag_strings(t)), annotations=True)
+                for t in tagging.tag_documents(DOCS)]
+
+    ds.set_tag_cache(caching.TagCache())
+    del tagger[:]
+    assert list(ds.classify_documents(DOCS, tagged=False)) == expected
+    assert tagger == [3]
+    assert ds.classify_document(DOCS[0], tagged=False, annotations=True) == expected[0]
+    assert ds.resultdata['annotated_doc'].startswith('not/NN a/NN good/JJ##NEGAT:1')
+    assert ds.pos_tag(DOCS[1]) == 'a/NN bad/JJ movie/NN'
+    assert tagger == [3]
+
+
+def test_pretagged_input(moby):
+    lemmas = caching.LemmaCache()
+    lemmas.put('is', 'be')
+    ds = sentdoc.BasicDocSentiScore(lemma_cache=lemmas)
+    ds.set_parameters(L=moby, a=True, v=False, negation=True, score_mode=ds.SCOREBACKOFF)
+    doc = 'this/DT is/VBZ not/RB a/DT good/JJ movie/NN ,/, good/JJ acting/NN'
+    tuples = [tuple(token.split('/')) for token in doc.split()]
+    words = [word for (word, tag) in tuples]
+    tags = [tag for (word, tag) in tuples]
+    expected = ds.score_document(doc, annotations=True).as_dict()
+
+    for pretagged in (tuples, tagging.TaggedDocument(words, tags)):
+        assert ds.score_document(pretagged, annotations=True).as_dict() == expected
+        ds.set_parameters(engine='numpy')
+        assert ds.score_document(pretagged).scores == (expected['resultpos'], expected['resultneg'])
+        ds.set_parameters(engine='python')
+
+    prepared = docprep.PreparedDocument.from_arrays(ds, words, tags)
+    assert ds.score_prepared(prepared).scores == (expected['resultpos'], expected['resultneg'])
+    assert negdetect.getNegationArray(tuples, 5) == negdetect.getNegationArray(doc.split(), 5)
+
+
+def test_batch_beyond_tag_cache(tagger, moby):
+    # batches larger than the tag cache are tagged once, not again document by document
+    ds = sentdoc.BasicDocSentiScore()
+    ds.set_parameters(L=moby, a=True, v=False, negation=True)
+    expected = [result.scores for result in ds.score_documents(DOCS, tagged=False)]
+
+    ds.set_tag_cache(caching.TagCache(maxsize=1))
+    del tagger[:]
+    assert [ds.score_prepared(doc).scores for doc in sweep.prepare(ds, DOCS, tagged=False)] == expected
+    assert len(tagger) == 1
+    rows = sweep.run(ds, DOCS, [{}], tagged=False)
+    assert [(row['resultpos'], row['resultneg']) for row in rows] == expected
+    assert len(tagger) == 2
+    results = server.score_batch(ds, [(doc, False, False, False) for doc in DOCS])
+    assert [tuple(result['scores']) for result in results] == expected
+    assert len(tagger) == 3
@@ -0,0 +1,66 @@
+import os
+import pickle
+
+import pytest
+
+import sentlex
+from sentlex import termtable
+
+
+ITEMS = [('good', 0.5), ('bad', 0.25), ('café', 0.125), ('', 1.0)]
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = str(tmp_path / 'test.sltt')
+    termtable.write_table(path, ITEMS)
+    return termtable.open_table(path)
+
+
+def test_lookup(table):
+    assert len(table) == len(ITEMS)
+    for (term, val) in ITEMS:
+        assert term in table
+        assert table[term] == val
+    assert 'notaword' not in table
+    assert table.get('notaword', 0.0) == 0.0
+    assert sorted(table) == sorted(t for (t, v) in ITEMS)
+
+
+def test_multi_column():
+    table = termtable.TermTable(termtable.build_table([('good', (1.0, 0.0)), ('bad', (0.0, 1.0))], ncols=2))
+    assert table['good'] == (1.0, 0.0)
+    assert table.get('bad') == (0.0, 1.0)
+
+
+def test_pickle(table):
+    assert dict(pickle.loads(pickle.dumps(table)).items()) == dict(ITEMS)
+
+
+def test_shared_frequency():
+    L1 = sentlex.MobyLexicon()
+    L2 = sentlex.UICLexicon()
+    assert L1.LexFreq is L2.LexFreq
+    assert L1.get_freq('the') == 0.029449176470588236
+    assert L1.get_freq('notaword') == 0.0
+
+
+def test_frequency_modes(tmp_path, monkeypatch):
+    L = sentlex.MobyLexicon()
+    assert isinstance(L.LexFreq, dict)
+
+    monkeypatch.setenv('SENTLEX_CACHE_DIR', str(tmp_path))
+    L.compile_frequency(shared=True)
+    assert isinstance(L.LexFreq, termtable.TermTable)
+    assert L.get_freq('the') == 0.029449176470588236
+
+
+def test_untrusted_table(tmp_path):
+    datafile = os.path.join(os.path.dirname(os.path.abspath(sentlex.__file__)), 'data', 'SUBTLEXus.txt')
+    table = termtable.shared_frequency_table(datafile, cache_dir=str(tmp_path))
+    assert table is not None and os.stat(table.path).st_mode & 0o077 == 0
+
+    # a table file writable by others is not mapped
+    termtable._SHARED_TABLES.pop(table.path)
+    os.chmod(table.path, 0o666)
+    assert termtable.shared_frequency_table(datafile, cache_dir=str(tmp_path)) is None
@@ -0,0 +1,64 @@
+import itertools
+
+import pytest
+
+import sentlex
+import sentlex.sentanalysis as sentdoc
+import sentlex.sentanalysis_potts as sentpotts
+from sentlex import caching
+from sentlex.docscoreutil import scoreAdjLinear
+
+pytest.importorskip('numpy')
+
+DOC = ('this/DT is/VBZ not/RB a/DT good/JJ movie/NN ,/, it/PRP was/VBD bad/JJ and/CC awful/JJ but/CC good/JJ '
+       'good/JJ nice/JJ ./. no/DT excellent/JJ terrible/JJ acting/NN here/RB well/RB corrupt/ liked/VBD '
+       'movie/NN')
+
+
+@pytest.fixture(scope='module')
+def moby():
+    return sentlex.MobyLexicon()
+
+
+def classifier(cls, L, **kwargs):
+    lemmas = caching.LemmaCache()
+    for (word, lemma) in [('is', 'be'), ('was', 'be'), ('liked', 'like')]:
+        lemmas.put(word, lemma)
+    ds = cls(lemma_cache=lemmas)
+    ds.set_parameters(L=L, a=True, v=True, n=True, r=True, at_pos=0.5, at_neg=1.5, backoff_alpha=0.7, **kwargs)
+    return ds
+
+
+@pytest.mark.parametrize('cls', [sentdoc.BasicDocSentiScore, sentpotts.PottsDocSentiScore])
+def test_numpy_engine_matches(moby, cls):
+    for (mode, freq, stop, neg, at, f) in itertools.product([0, 1, 2], [True, False], [True, False], [True, False],
+                                                            [True, False], ['noop', scoreAdjLinear]):
+        ds = classifier(cls, moby, score_mode=mode, score_freq=freq, score_stop=stop, atenuation=at, score_function=f)
+        ds.set_config('negation', neg)
+        expected = ds.score_document(DOC, annotations=True)
+        ds.set_parameters(engine='numpy')
+        result = ds.score_document(DOC, annotations=True)
+
+        assert result.resultpos == pytest.approx(expected.resultpos)
+        assert result.resultneg == pytest.approx(expected.resultneg)
+        assert result.tokens_found == expected.tokens_found
+        assert result.tokens_negated == expected.tokens_negated
+        assert result.found_list == expected.found_list
+        assert result.unscored_list == expected.unscored_list
+        assert_same_annotations(result.annotated_doc, expected.annotated_doc)
+
+
+def assert_same_annotations(doc, expected):
+    # ints are rendered exactly as by the token loop, floats match to tolerance
+    tokens = doc.split()
+    assert len(tokens) == len(expected.split())
+    for (token, other) in zip(tokens, expected.split()):
+        fields = token.split('##')
+        other_fields = other.split('##')
+        assert fields[:2] == other_fields[:2]
+        for (field, other_field) in zip(fields[2:], other_fields[2:]):
+            (name, value) = field.split(':')
+            (other_name, other_value) = other_field.split(':')
+            assert name == other_name
+            assert ('.' in value) == ('.' in other_value), (token, other)
+            assert float(value) == pytest.approx(float(other_value))
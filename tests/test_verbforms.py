@@ -0,0 +1,103 @@
+import pytest
+
+import sentlex
+import sentlex.sentanalysis as sentdoc
+from sentlex import verbforms
+
+
+@pytest.mark.parametrize('lemma, forms', [
+    ('walk', ['walks', 'walked', 'walking']),
+    ('hate', ['hates', 'hated', 'hating']),
+    ('cry', ['cries', 'cried', 'crying']),
+    ('stop', ['stops', 'stopped', 'stopping']),
+    ('die', ['dies', 'died', 'dying']),
+    ('go', ['goes', 'went', 'gone', 'going'])])
+def test_inflections(lemma, forms):
+    assert set(forms) <= verbforms.inflections(lemma)
+
+
+# stands in for WordNet, which returns the shortest lemma it knows
+WORDNET = {'walked': 'walk', 'hopping': 'hop', 'hopes': 'hop', 'hated': 'hate', 'was': 'be'}
+
+
+def fake_lemmatize(form):
+    return WORDNET.get(form, form)
+
+
+def test_inflection_table():
+    table = verbforms.build_inflection_table(['hope', 'hop', 'need', 'walk', 'give_up', 'hate', 'be'],
+                                             lemmatize=fake_lemmatize)
+    assert table['walked'] == 'walk'
+    assert table['need'] == 'need'
+    # forms map to the lemma WordNet finds, not to the lemma they were generated from
+    assert table['hopes'] == 'hop'
+    assert table['hopping'] == 'hop'
+    assert table['hated'] == 'hate'
+    assert table['was'] == 'be'
+    assert 'give_up' not in table
+    assert all(table[form] == fake_lemmatize(form) for form in table)
+
+
+def test_inflection_table_without_wordnet():
+    table = verbforms.build_inflection_table(['walk', 'wound', 'fell', 'ground', 'needs', 'hop'], exceptions=['hop'])
+    # only lemmas no WordNet rule or exception applies to
+    assert table == {'walk': 'walk'}
+
+
+def _wordnet_lemmatizer():
+    from nltk.stem import WordNetLemmatizer
+    if verbforms.wordnet_verb_exceptions() is None:
+        pytest.skip('WordNet is not installed')
+    return WordNetLemmatizer()
+
+
+def test_wordnet_parity():
+    wnl = _wordnet_lemmatizer()
+    L = sentlex.UICLexicon()
+    table = L.compile_verb_forms()
+    assert table.get('wound') != 'wound'
+    for verb in L._terms('v'):
+        for form in [verb] + sorted(verbforms.inflections(verb)):
+            if form in table:
+                assert table[form] == wnl.lemmatize(form, 'v')
+
+
+def test_classify_with_verb_forms():
+    L = sentlex.UICLexicon()
+    L.verb_forms = verbforms.build_inflection_table(L._terms('v'), lemmatize=fake_lemmatize)
+    ds = sentdoc.BasicDocSentiScore()
+    ds.set_lexicon(L)
+    ds.set_parameters(a=False, v=True, negation=False)
+
+    def no_wordnet(word, pos):
+        raise AssertionError('WordNet called for %s' % word)
+    ds.wnl.lemmatize = no_wordnet
+
+    (dpos, dneg) = ds.classify_document('she/PRP hate/VBP and/CC hated/VBD it/PRP')
+    assert dneg == 2 * L.getverb('hate')[1]
+
+
+class FakeLemmatizer(object):
+    def lemmatize(self, word, pos='n'):
+        return fake_lemmatize(word)
+
+
+def test_persisted_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(verbforms, 'wordnet_version', lambda: 'wordnet-test')
+    monkeypatch.setattr(verbforms, 'wordnet_verb_exceptions', lambda: set())
+    monkeypatch.setattr(sentlex.sentlex.nltk.stem, 'WordNetLemmatizer', FakeLemmatizer)
+    table = sentlex.UICLexicon().compile_verb_forms(cache_dir=str(tmp_path))
+    assert table['hated'] == 'hate'
+
+    # later processes load the verified table, without WordNet
+    def no_wordnet():
+        raise AssertionError('WordNet loaded')
+    monkeypatch.setattr(verbforms, 'wordnet_verb_exceptions', no_wordnet)
+    L = sentlex.UICLexicon()
+    assert L.compile_verb_forms(cache_dir=str(tmp_path)) == table
+    assert L.verb_forms == table
+
+    # the table is built again for other WordNet data
+    monkeypatch.setattr(verbforms, 'wordnet_version', lambda: 'wordnet-other')
+    with pytest.raises(AssertionError):
+        L.compile_verb_forms(cache_dir=str(tmp_path))
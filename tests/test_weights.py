@@ -0,0 +1,70 @@
+import pytest
+
+import sentlex
+import sentlex.sentanalysis as sentdoc
+from sentlex import docscoreutil
+from sentlex import weights
+
+DOC = 'this/DT good/JJ movie/NN is/VBZ not/RB bad/JJ ,/, a/DT great/JJ and/CC nice/JJ but/CC awful/JJ plot/NN ./.'
+
+
+@pytest.fixture(scope='module')
+def moby():
+    return sentlex.MobyLexicon()
+
+
+@pytest.fixture
+def ds(moby):
+    ds = sentdoc.BasicDocSentiScore()
+    ds.set_parameters(L=moby, a=True, v=False, negation=True)
+    return ds
+
+
+def test_weight_vectors():
+    assert weights.LinearWeight().vector(4) == (0.25, 0.5, 0.75, 1.0)
+    assert weights.ModularWeight().vector(5) == (0.5, 0.5, 1.0, 1.0, 1.0)
+    assert weights.ExpDecayWeight(rate=2.0).vector(2) == pytest.approx((0.36787944, 1.0))
+    assert weights.PiecewiseWeight([(0.25, 0.0), (0.5, 0.5)]).vector(8) == (0, 0, 0.5, 0.5, 1, 1, 1, 1)
+    assert weights.ArrayWeight(lambda n: [2.0] * n).vector(3) == (2.0, 2.0, 2.0)
+
+    linear = weights.LinearWeight(C=2.0)
+    linear.vector(10)
+    linear.vector(10)
+    assert linear.cache_stats()['hits'] == 1
+    assert linear(3.0, 5, 10) == 3.0
+
+    with pytest.raises(AssertionError):
+        weights.ArrayWeight(lambda n: [1.0]).vector(2)
+
+
+def test_plan(ds):
+    ds.set_parameters(score_function='linear')
+    assert ds.plan.position_weight is weights.WEIGHTS['linear']
+    assert ds.plan.score_function is None
+    ds.set_parameters(score_function=docscoreutil.scoreAdjLinear)
+    assert ds.plan.position_weight is None
+
+
+@pytest.mark.parametrize('weight,f', [(weights.LinearWeight(), docscoreutil.scoreAdjLinear),
+                                      (weights.ModularWeight(), docscoreutil.scoreAdjModular)])
+def test_matches_score_functions(ds, weight, f):
+    ds.set_parameters(score_function=f)
+    expected = ds.score_document(DOC).scores
+
+    ds.set_parameters(score_function=weight)
+    assert ds.score_document(DOC).scores == pytest.approx(expected)
+    ds.set_parameters(engine='numpy')
+    assert ds.score_document(DOC).scores == pytest.approx(expected)
+
+    stream = ds.stream(doclen=len(DOC.split()))
+    for token in DOC.split():
+        stream.feed([token])
+    ds.set_parameters(engine='python')
+    assert stream.close().scores == pytest.approx(expected)
+
+
+def test_legacy_weights(moby):
+    expected = docscoreutil.docSentiScore(moby, DOC, True, False, False, False, True,
+                                          w=docscoreutil.scoreAdjModular)
+    assert docscoreutil.docSentiScore(moby, DOC, True, False, False, False, True,
+                                      w=weights.ModularWeight()) == expected